@@ -0,0 +1,106 @@
+"""
+Etat partage entre les workers d'une meme machine.
+
+`uvicorn main:app --workers N` (ou gunicorn et ses workers uvicorn) lance N
+processus qui ne partagent rien. Trois morceaux de l'authentification doivent
+pourtant etre les memes pour tous, faute de quoi une requete reussit ou
+echoue selon le worker qui la recoit :
+
+* le secret des jetons en developpement (`auth/security.py`) : un jeton signe
+  par un worker serait refuse par les autres ;
+* le quota de tentatives de connexion (`auth/rate_limit.py`) : N workers
+  accorderaient N fois le quota ;
+* le depot de comptes sans MongoDB (`auth/repository.py`) : un compte cree
+  sur un worker serait inconnu des autres.
+
+En production, le secret vient de l'environnement et les comptes d'Atlas ;
+seul le quota a besoin d'un support local. Ce module le fournit : un
+repertoire d'etat, et des bases SQLite qui y vivent (SQLite arbitre lui-meme
+les ecritures concurrentes de plusieurs processus).
+
+Configuration (environnement) :
+
+    WEB_CONCURRENCY       nombre de workers ; lu aussi par uvicorn
+                          (`--workers`) et gunicorn (1)
+    CRYPTOLAB_STATE_DIR   repertoire des fichiers partages
+                          (defaut : <repertoire temporaire>/cryptolab-<uid>)
+
+Le repertoire d'etat garde le secret des jetons de developpement : qui peut y
+ecrire peut forger des jetons. Il doit donc appartenir a l'utilisateur du
+serveur et n'etre ouvert a personne d'autre (mode 0700). Un repertoire
+existant qui ne l'est pas (cree d'avance par un autre compte dans /tmp, lien
+symbolique...) est refuse au demarrage plutot qu'utilise.
+"""
+
+from __future__ import annotations
+
+import getpass
+import os
+import sqlite3
+import stat
+import tempfile
+from pathlib import Path
+
+
+def worker_count() -> int:
+    try:
+        return max(1, int(os.getenv("WEB_CONCURRENCY", "").strip() or 1))
+    except ValueError:
+        return 1
+
+
+def multi_worker() -> bool:
+    """Plusieurs processus servent-ils l'application ?"""
+    return worker_count() > 1
+
+
+class StateDirError(RuntimeError):
+    """Le repertoire d'etat n'est pas prive : l'utiliser exposerait le secret."""
+
+
+def _default_dir() -> Path:
+    # Un repertoire par utilisateur : deux comptes d'une meme machine ne se
+    # disputent pas le meme nom dans le repertoire temporaire commun.
+    owner = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    return Path(tempfile.gettempdir()) / f"cryptolab-{owner}"
+
+
+def _check_private(path: Path) -> None:
+    info = path.lstat()
+    if not stat.S_ISDIR(info.st_mode):
+        raise StateDirError(f"{path} n'est pas un repertoire (lien symbolique ?).")
+    if not hasattr(os, "getuid"):
+        # Windows : ni proprietaire POSIX ni bits de mode a verifier.
+        return
+    if info.st_uid != os.getuid():
+        raise StateDirError(f"{path} appartient a un autre utilisateur (uid {info.st_uid}).")
+    if info.st_mode & 0o077:
+        raise StateDirError(
+            f"{path} est ouvert aux autres utilisateurs (mode {stat.S_IMODE(info.st_mode):o}) : "
+            "attendu 0700."
+        )
+
+
+def state_dir() -> Path:
+    """
+    Le repertoire d'etat partage, cree au besoin. Leve `StateDirError` s'il
+    n'appartient pas au seul utilisateur du serveur.
+    """
+    configured = os.getenv("CRYPTOLAB_STATE_DIR", "").strip()
+    path = Path(configured) if configured else _default_dir()
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    _check_private(path)
+    return path
+
+
+def connect(path: str | Path) -> sqlite3.Connection:
+    """
+    Connexion SQLite partageable entre threads (l'appelant la protege par un
+    verrou) et tolerante aux ecritures concurrentes des autres workers.
+    """
+    connection = sqlite3.connect(
+        str(path), timeout=10.0, isolation_level=None, check_same_thread=False
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
@@ -0,0 +1,138 @@
+"""
+Quota de tentatives de connexion, par e-mail, sur une fenetre glissante.
+
+Deux supports derriere la meme interface :
+
+* `MemoryAttempts` — en memoire du processus. Suffit a un seul worker ;
+* `SqliteAttempts` — un fichier SQLite partage par tous les workers de la
+  machine, pour que N workers n'accordent pas N fois le quota.
+
+C'est un ralentisseur pedagogique, pas une defense anti-DDoS : une vraie
+protection vit devant l'application, et plusieurs machines ne partagent pas
+ce fichier.
+
+Configuration (environnement) :
+
+    CRYPTOLAB_RATE_LIMIT_DB   "memory", ou chemin d'un fichier SQLite. Vide :
+                              memoire avec un seul worker, fichier
+                              `rate_limit.sqlite3` du repertoire d'etat sinon
+                              (voir auth/local_state.py)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol
+
+from auth import local_state
+
+
+class AttemptStore(Protocol):
+    """Interface des quotas de tentatives."""
+
+    def hit(self, key: str) -> bool:
+        """Compte une tentative. False si le quota est deja atteint (non comptee)."""
+        ...
+
+    def reset(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryAttempts:
+    """Quota tenu en memoire du processus."""
+
+    def __init__(
+        self, window: float, limit: int, *, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.window = window
+        self.limit = limit
+        self._clock = clock
+        self._attempts: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            attempts = self._attempts[key]
+            while attempts and now - attempts[0] > self.window:
+                attempts.popleft()
+            if len(attempts) >= self.limit:
+                return False
+            attempts.append(now)
+            return True
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._attempts.clear()
+
+
+class SqliteAttempts:
+    """Quota tenu dans un fichier SQLite, partage par les workers de la machine."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        window: float,
+        limit: int,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        # Horloge murale : les instants sont compares entre processus.
+        self.window = window
+        self.limit = limit
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = local_state.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS attempts (key TEXT NOT NULL, at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS attempts_key ON attempts (key, at)")
+
+    def hit(self, key: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            # BEGIN IMMEDIATE : lecture du compte et insertion sous le meme
+            # verrou d'ecriture, sinon deux workers passeraient ensemble.
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "DELETE FROM attempts WHERE key = ? AND at <= ?", (key, now - self.window)
+                )
+                (count,) = self._db.execute(
+                    "SELECT COUNT(*) FROM attempts WHERE key = ?", (key,)
+                ).fetchone()
+                allowed = count < self.limit
+                if allowed:
+                    self._db.execute("INSERT INTO attempts (key, at) VALUES (?, ?)", (key, now))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return allowed
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM attempts WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM attempts")
+
+
+def build_store(window: float, limit: int) -> AttemptStore:
+    """Le support designe par `CRYPTOLAB_RATE_LIMIT_DB` (voir la docstring du module)."""
+    configured = os.getenv("CRYPTOLAB_RATE_LIMIT_DB", "").strip()
+    if configured == "memory" or (not configured and not local_state.multi_worker()):
+        return MemoryAttempts(window, limit)
+    path = configured or local_state.state_dir() / "rate_limit.sqlite3"
+    return SqliteAttempts(path, window, limit)
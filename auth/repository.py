@@ -6,18 +6,28 @@ Deux implementations derriere la meme interface :
 * `MongoUserRepository` — la base `cryptolab_auth` du cluster Atlas. Utilisee
   des que `MONGO_URI` est renseigne.
 * `MemoryUserRepository` — un dictionnaire en memoire, pour le developpement
-  local et la suite de tests. Aucune dependance, aucun reseau.
+  local et la suite de tests. Aucune dependance, aucun reseau. Propre a
+  chaque processus : avec plusieurs workers, un compte cree sur l'un serait
+  inconnu des autres ;
+* `SqliteUserRepository` — sa remplacante en developpement multi-workers : un
+  fichier SQLite du repertoire d'etat (`auth/local_state.py`), partage par les
+  workers de la machine.
 
 L'interface est volontairement minuscule : trouver par e-mail, trouver par id,
 creer. Tout le reste (validation, hachage, jetons) vit ailleurs.
 """
 
+import json
 import logging
 import os
+import sqlite3
+import threading
 import uuid
 from datetime import datetime, timezone
 from typing import Protocol
 
+from auth import local_state
+
 logger = logging.getLogger(__name__)
 
 AUTH_DB_NAME = os.getenv("CRYPTOLAB_AUTH_DB", "cryptolab_auth")
@@ -105,6 +115,52 @@ class MemoryUserRepository:
         self._id_by_email.clear()
 
 
+# --- Implementation SQLite ----------------------------------------------------
+
+class SqliteUserRepository:
+    """Comptes dans un fichier SQLite partage par les workers d'une machine (developpement)."""
+
+    def __init__(self, path) -> None:  # noqa: ANN001 - str ou Path
+        self._lock = threading.Lock()
+        self._db = local_state.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            " id TEXT PRIMARY KEY, email TEXT NOT NULL UNIQUE, document TEXT NOT NULL)"
+        )
+
+    @staticmethod
+    def _load(row: tuple | None) -> dict | None:
+        if row is None:
+            return None
+        document = json.loads(row[0])
+        document["created_at"] = datetime.fromisoformat(document["created_at"])
+        return document
+
+    def find_by_email(self, email: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT document FROM users WHERE email = ?", (normalise_email(email),)
+            ).fetchone()
+        return self._load(row)
+
+    def find_by_id(self, user_id: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute("SELECT document FROM users WHERE id = ?", (user_id,)).fetchone()
+        return self._load(row)
+
+    def create(self, document: dict) -> dict:
+        stored = {**document, "created_at": document["created_at"].isoformat()}
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT INTO users (id, email, document) VALUES (?, ?, ?)",
+                    (document["_id"], document["email"], json.dumps(stored)),
+                )
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateEmailError(document["email"]) from exc
+        return dict(document)
+
+
 # --- Implementation MongoDB ---------------------------------------------------
 
 class MongoUserRepository:
@@ -169,11 +225,7 @@ def get_repository() -> UserRepository:
             raise RepositoryUnavailableError(
                 "MONGO_URI est absent : impossible de gerer des comptes en production."
             )
-        logger.warning(
-            "MONGO_URI absent : comptes stockes en memoire. "
-            "Ils disparaitront a l'arret du serveur."
-        )
-        _repository = MemoryUserRepository()
+        _repository = _local_repository()
         return _repository
 
     try:
@@ -182,13 +234,26 @@ def get_repository() -> UserRepository:
         _resolved = False
         if in_production:
             raise RepositoryUnavailableError(f"Connexion a MongoDB impossible : {exc}") from exc
-        logger.warning("MongoDB injoignable (%s) : repli sur le stockage memoire.", exc)
+        logger.warning("MongoDB injoignable (%s) : repli sur le stockage local.", exc)
         _resolved = True
-        _repository = MemoryUserRepository()
+        _repository = _local_repository()
 
     return _repository
 
 
+def _local_repository() -> UserRepository:
+    """Le depot de developpement : memoire avec un worker, SQLite partage avec plusieurs."""
+    if local_state.multi_worker():
+        path = local_state.state_dir() / "users.sqlite3"
+        logger.warning("MONGO_URI absent : comptes stockes dans %s, partage par les workers.", path)
+        return SqliteUserRepository(path)
+    logger.warning(
+        "MONGO_URI absent : comptes stockes en memoire. "
+        "Ils disparaitront a l'arret du serveur."
+    )
+    return MemoryUserRepository()
+
+
 def reset_repository(repository: UserRepository | None = None) -> None:
     """Remplace le depot. Reserve aux tests et au demarrage."""
     global _repository, _resolved
@@ -10,9 +10,9 @@ import logging
 import os
 import secrets
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
-import bcrypt
-import jwt
+from auth import local_state
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,9 @@ ALGORITHM = "HS256"
 # utilisateur qui revient chaque jour sans jamais voir d'expiration.
 TOKEN_TTL = timedelta(hours=int(os.getenv("CRYPTOLAB_JWT_TTL_HOURS", "24")))
 
+# Cout bcrypt des mots de passe (2^12 iterations, le defaut de la bibliotheque).
+BCRYPT_ROUNDS = 12
+
 # bcrypt tronque silencieusement au-dela de 72 octets : on refuse plutot que de
 # laisser croire qu'un mot de passe de 200 caracteres est integralement pris en
 # compte.
@@ -41,7 +44,8 @@ def _load_secret() -> str:
     En production (CRYPTOLAB_ENV=production) son absence est une erreur fatale :
     un secret genere au demarrage invaliderait tous les jetons a chaque
     redemarrage, et differerait entre deux instances. En developpement, on en
-    genere un ephemere pour que `uvicorn main:app` fonctionne sans configuration.
+    genere un ephemere pour que `uvicorn main:app` fonctionne sans configuration ;
+    avec plusieurs workers, il est partage par un fichier du repertoire d'etat.
     """
     secret = os.getenv("CRYPTOLAB_JWT_SECRET", "").strip()
     if secret:
@@ -53,6 +57,16 @@ def _load_secret() -> str:
             "Generez-le avec : python -c \"import secrets; print(secrets.token_urlsafe(64))\""
         )
 
+    if local_state.multi_worker():
+        # Chaque worker tirerait son propre secret, et refuserait les jetons
+        # signes par les autres : le premier l'ecrit, tous le lisent.
+        path = local_state.state_dir() / "jwt_dev_secret"
+        logger.warning(
+            "CRYPTOLAB_JWT_SECRET absent : secret de developpement partage par "
+            "les workers via %s.", path
+        )
+        return _shared_secret(path)
+
     logger.warning(
         "CRYPTOLAB_JWT_SECRET absent : secret ephemere genere pour le "
         "developpement. Les sessions seront perdues au redemarrage."
@@ -60,10 +74,42 @@ def _load_secret() -> str:
     return secrets.token_urlsafe(64)
 
 
+#: Ne suit pas un lien symbolique plante a la place du fichier (0 sous Windows).
+_NOFOLLOW = getattr(os, "O_NOFOLLOW", 0)
+
+
+def _shared_secret(path: Path) -> str:
+    """
+    Lit le secret de `path`, apres l'avoir cree s'il n'existe pas encore.
+    `path` vit dans le repertoire d'etat, verifie prive par `state_dir`.
+    """
+    if not path.exists():
+        # Ecrit a cote, puis lie sous le nom definitif : `os.link` echoue si
+        # un autre worker est passe avant, et personne ne lit un fichier a
+        # moitie ecrit. O_EXCL : le brouillon est toujours un fichier neuf.
+        draft = path.with_name(f"{path.name}.{os.getpid()}")
+        draft.unlink(missing_ok=True)
+        descriptor = os.open(draft, os.O_WRONLY | os.O_CREAT | os.O_EXCL | _NOFOLLOW, 0o600)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            handle.write(secrets.token_urlsafe(64))
+        try:
+            os.link(draft, path)
+        except FileExistsError:
+            pass
+        finally:
+            draft.unlink()
+    descriptor = os.open(path, os.O_RDONLY | _NOFOLLOW)
+    with os.fdopen(descriptor, encoding="utf-8") as handle:
+        return handle.read().strip()
+
+
 _SECRET = _load_secret()
 
 
 # --- Mots de passe ------------------------------------------------------------
+#
+# bcrypt est importe au premier mot de passe : `import main` n'a pas a charger
+# son extension compilee pour servir les routes qui n'authentifient personne.
 
 def hash_password(password: str) -> str:
     """Hache un mot de passe avec bcrypt (sel aleatoire inclus dans le hash)."""
@@ -73,7 +119,9 @@ def hash_password(password: str) -> str:
             f"Le mot de passe depasse {MAX_PASSWORD_BYTES} octets, "
             "limite de bcrypt."
         )
-    return bcrypt.hashpw(raw, bcrypt.gensalt()).decode("utf-8")
+    import bcrypt
+
+    return bcrypt.hashpw(raw, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
 
 
 def verify_password(password: str, hashed: str) -> bool:
@@ -81,6 +129,8 @@ def verify_password(password: str, hashed: str) -> bool:
     Compare un mot de passe a son hash. Ne leve jamais : un hash corrompu en
     base doit se traduire par un refus, pas par une erreur 500.
     """
+    import bcrypt
+
     try:
         return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
     except (ValueError, TypeError):
@@ -88,6 +138,9 @@ def verify_password(password: str, hashed: str) -> bool:
 
 
 # --- Jetons -------------------------------------------------------------------
+#
+# PyJWT est importe au premier jeton : il charge `cryptography` (pour les
+# algorithmes asymetriques, que HS256 n'utilise pas), ~40 ms de demarrage.
 
 def create_token(subject: str, email: str) -> tuple[str, int]:
     """
@@ -96,6 +149,8 @@ def create_token(subject: str, email: str) -> tuple[str, int]:
     Returns:
         (jeton, duree de vie en secondes)
     """
+    import jwt
+
     now = datetime.now(timezone.utc)
     expires = now + TOKEN_TTL
     payload = {
@@ -110,6 +165,8 @@ def create_token(subject: str, email: str) -> tuple[str, int]:
 
 def decode_token(token: str) -> dict | None:
     """Retourne la charge utile du jeton, ou None s'il est invalide ou expire."""
+    import jwt
+
     try:
         return jwt.decode(token, _SECRET, algorithms=[ALGORITHM])
     except jwt.PyJWTError:
@@ -5,13 +5,15 @@ porteur d'un jeton.
 Le routeur se contente de traduire ces fonctions en HTTP.
 """
 
+import functools
 import logging
-import time
-from collections import defaultdict, deque
+import os
+import re
 
+from auth import rate_limit
 from auth import repository as repo
 from auth.models import RegisterInput, UserPublic
-from auth.security import create_token, hash_password, verify_password
+from auth.security import BCRYPT_ROUNDS, create_token, hash_password, verify_password
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +21,32 @@ logger = logging.getLogger(__name__)
 # correspond a l'e-mail donne. Sans lui, une connexion sur un e-mail inconnu
 # repondrait nettement plus vite que sur un e-mail connu, et le temps de reponse
 # suffirait a enumerer les comptes.
-_DUMMY_HASH = hash_password("cryptolab-dummy-password")
+#
+# Il etait calcule a l'import : un hash de cout 12, ~250 ms ajoutes a chaque
+# demarrage d'instance. Il est desormais calcule a la premiere connexion sur un
+# e-mail inconnu, ou lu dans CRYPTOLAB_DUMMY_HASH (un hash bcrypt quelconque,
+# du meme cout que les mots de passe : il n'a rien de secret).
+_BCRYPT_HASH = re.compile(rf"^\$2[aby]\${BCRYPT_ROUNDS:02d}\$[./A-Za-z0-9]{{53}}$")
+
+
+@functools.cache
+def _dummy_hash() -> str:
+    configured = os.getenv("CRYPTOLAB_DUMMY_HASH", "").strip()
+    if _BCRYPT_HASH.match(configured):
+        return configured
+    if configured:
+        logger.warning(
+            "CRYPTOLAB_DUMMY_HASH ignore : ce n'est pas un hash bcrypt de cout %d.", BCRYPT_ROUNDS
+        )
+    return hash_password("cryptolab-dummy-password")
 
 # Limitation de debit des connexions : 10 tentatives par e-mail sur 5 minutes.
-# Volontairement en memoire du processus — c'est un ralentisseur pedagogique,
-# pas une defense anti-DDoS. Une vraie protection vit devant l'application.
+# C'est un ralentisseur pedagogique, pas une defense anti-DDoS. En memoire du
+# processus avec un seul worker, dans un fichier SQLite partage avec plusieurs
+# (voir auth/rate_limit.py).
 _ATTEMPT_WINDOW = 300.0
 _ATTEMPT_LIMIT = 10
-_attempts: dict[str, deque[float]] = defaultdict(deque)
+_attempts = rate_limit.build_store(_ATTEMPT_WINDOW, _ATTEMPT_LIMIT)
 
 
 class AuthError(Exception):
@@ -60,14 +80,9 @@ def _store() -> repo.UserRepository:
 
 
 def _rate_limit(email: str) -> None:
-    """Refuse les tentatives au-dela du quota, et purge la fenetre glissante."""
-    now = time.monotonic()
-    window = _attempts[email]
-    while window and now - window[0] > _ATTEMPT_WINDOW:
-        window.popleft()
-    if len(window) >= _ATTEMPT_LIMIT:
+    """Refuse les tentatives au-dela du quota."""
+    if not _attempts.hit(email):
         raise AuthError(429, "Trop de tentatives de connexion. Reessayez dans quelques minutes.")
-    window.append(now)
 
 
 def reset_rate_limits() -> None:
@@ -113,14 +128,14 @@ def login(email: str, password: str) -> tuple[str, int, UserPublic]:
     document = store.find_by_email(normalised)
 
     if document is None:
-        verify_password(password, _DUMMY_HASH)
+        verify_password(password, _dummy_hash())
         raise AuthError(401, "E-mail ou mot de passe incorrect.")
 
     if not verify_password(password, document["password_hash"]):
         raise AuthError(401, "E-mail ou mot de passe incorrect.")
 
     # Connexion reussie : le compteur repart de zero pour cet e-mail.
-    _attempts.pop(normalised, None)
+    _attempts.reset(normalised)
 
     user = to_public(document)
     token, expires_in = create_token(user.id, user.email)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark : encodage de l'enveloppe `{ok, data, error}`.
+
+Compare, sur de vraies sorties de simulateurs, l'ancien chemin
+(`jsonable_encoder` puis `JSONResponse`, deux parcours) au nouveau
+(`registry.envelope.encode_success`, orjson si installe). Verifie au passage
+que les deux produisent le meme JSON.
+
+Usage :
+    python benchmarks/envelope_encoding.py [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Permet `from utils import ...` sans installer le paquet.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from registry import envelope  # noqa: E402
+from utils import aes_simulator, des_simulator, step_visualizer  # noqa: E402
+
+KEY = "cle-de-test-16oc"
+
+
+def _cases() -> list[tuple[str, dict]]:
+    """(nom, donnees) : des charges de la taille de celles servies en classe."""
+    return [
+        ("sha256 / 2 Ko", step_visualizer.simulate_sha256("a" * 2_000)),
+        ("sha256 / 20 Ko", step_visualizer.simulate_sha256("a" * 20_000)),
+        ("sha1 / 20 Ko", step_visualizer.simulate_sha1("a" * 20_000)),
+        ("aes-multiblock / 1 Ko", aes_simulator.simulate_aes_encrypt_multiblock("x" * 1_000, KEY)),
+        ("des-multiblock / 1 Ko", des_simulator.simulate_des_encrypt_multiblock("x" * 1_000, KEY)),
+    ]
+
+
+def _old(data: dict) -> bytes:
+    content = {"ok": True, "data": jsonable_encoder(data), "error": None}
+    return JSONResponse(content=content).body
+
+
+def _new(data: dict) -> bytes:
+    return envelope.encode_success(data)
+
+
+def _time(fn, data: dict, repeat: int) -> float:
+    """Mediane, en millisecondes."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    backend = "orjson" if envelope.orjson is not None else "json (stdlib)"
+    print(f"Backend : {backend}, {args.repeat} repetitions, mediane en ms\n")
+    print(f"{'charge':<24}{'taille':>10}{'ancien':>10}{'nouveau':>10}{'gain':>8}")
+
+    for name, data in _cases():
+        old_bytes, new_bytes = _old(data), _new(data)
+        if json.loads(old_bytes) != json.loads(new_bytes):
+            print(f"{name} : les deux encodages different !", file=sys.stderr)
+            return 1
+
+        old_ms = _time(_old, data, args.repeat)
+        new_ms = _time(_new, data, args.repeat)
+        size = f"{len(new_bytes) / 1024:.0f} Ko"
+        print(f"{name:<24}{size:>10}{old_ms:>10.2f}{new_ms:>10.2f}{old_ms / new_ms:>7.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
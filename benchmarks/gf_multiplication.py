@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark : multiplication dans GF(2^8) et bloc AES trace.
+
+Compare `aes_math.gmul_peasant` (boucle de 8 iterations, l'ancien `gmul`) aux
+tables EXP/LOG et MUL*, puis mesure un bloc AES-128 trace (chiffrement et
+dechiffrement) avec les tables, contre le meme bloc ou MixColumns et
+InvMixColumns repassent par la boucle.
+
+Usage :
+    python benchmarks/gf_multiplication.py [--repeat 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+# Permet `from utils import ...` sans installer le paquet.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import aes_math, aes_simulator  # noqa: E402
+
+KEY = "Thats my Kung Fu"
+BLOCK = b"Two One Nine Two"
+
+
+def _time(fn, repeat: int) -> float:
+    """Mediane, en microsecondes."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def _all_products(gmul) -> None:
+    for a in range(0, 256, 4):
+        for b in range(0, 256, 4):
+            gmul(a, b)
+
+
+def _mix_peasant(column: list) -> list:
+    return [
+        aes_math.gmul_peasant(2, column[0]) ^ aes_math.gmul_peasant(3, column[1]) ^ column[2] ^ column[3],
+        column[0] ^ aes_math.gmul_peasant(2, column[1]) ^ aes_math.gmul_peasant(3, column[2]) ^ column[3],
+        column[0] ^ column[1] ^ aes_math.gmul_peasant(2, column[2]) ^ aes_math.gmul_peasant(3, column[3]),
+        aes_math.gmul_peasant(3, column[0]) ^ column[1] ^ column[2] ^ aes_math.gmul_peasant(2, column[3]),
+    ]
+
+
+def _inv_mix_peasant(column: list) -> list:
+    matrix = [[14, 11, 13, 9], [9, 14, 11, 13], [13, 9, 14, 11], [11, 13, 9, 14]]
+    return [
+        aes_math.gmul_peasant(row[0], column[0]) ^ aes_math.gmul_peasant(row[1], column[1])
+        ^ aes_math.gmul_peasant(row[2], column[2]) ^ aes_math.gmul_peasant(row[3], column[3])
+        for row in matrix
+    ]
+
+
+def _traced_block(schedule) -> None:
+    words, _ = aes_simulator.key_to_words(KEY)
+    cipher, _ = aes_simulator.encrypt_block(BLOCK, words, schedule)
+    aes_simulator.decrypt_block(cipher, words, schedule)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    words, _ = aes_simulator.key_to_words(KEY)
+    schedule = aes_simulator.expand_key(words)
+
+    print(f"{args.repeat} repetitions, mediane en microsecondes\n")
+    print(f"{'charge':<34}{'boucle':>10}{'tables':>10}{'gain':>8}")
+
+    loop = _time(lambda: _all_products(aes_math.gmul_peasant), args.repeat)
+    table = _time(lambda: _all_products(aes_math.gmul), args.repeat)
+    print(f"{'4 096 produits gmul(a, b)':<34}{loop:>10.0f}{table:>10.0f}{loop / table:>7.1f}x")
+
+    with (
+        mock.patch.object(aes_simulator, "mix_single_column", _mix_peasant),
+        mock.patch.object(aes_simulator, "inv_mix_single_column", _inv_mix_peasant),
+    ):
+        loop = _time(lambda: _traced_block(schedule), args.repeat)
+    table = _time(lambda: _traced_block(schedule), args.repeat)
+    print(f"{'bloc trace (chiffre + dechiffre)':<34}{loop:>10.0f}{table:>10.0f}{loop / table:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai de toutes les operations du registre et de tous les simulateurs.
+
+Chaque cas passe par l'application elle-meme, en memoire, via `TestClient` :
+validation, dispatcher, handler et encodage de l'enveloppe compris, sans
+serveur ni reseau.
+
+* **registre** : une operation par vecteur officiel (`registry.vectors()`, le
+  premier vecteur de chaque operation), rejouee telle quelle puis avec son
+  champ de longueur (`Operation.length_field`) etire a plusieurs tailles,
+  jusqu'a la borne du modele (`MAX_TEXT`, `MAX_HEX`). Une taille que
+  l'operation refuse (un chiffre hexadecimal rallonge n'est plus un chiffre
+  valide) est notee `skipped`, avec le code d'erreur ;
+* **simulateurs** : chaque entree de `SIMULATORS`, aux memes tailles. Les
+  simulateurs de dechiffrement recoivent un vrai chiffre, produit d'abord par
+  leur simulateur de chiffrement.
+
+Pour chaque cas : debit (operations par seconde), latences p50/p95 et pic
+d'allocation (une execution de plus, sous `tracemalloc`). Le pool de
+processus est desactive : tout tourne dans ce processus, ou `tracemalloc` le
+voit.
+
+Les resultats sont ecrits en JSON ; deux executions se comparent, et une
+latence p95 degradee au-dela du seuil est signalee (code de sortie 1).
+
+Usage :
+    python benchmarks/suite.py run [--out bench.json] [--sizes 64,1024,max]
+                                   [--only aes] [--budget 0.5] [--baseline old.json]
+    python benchmarks/suite.py compare old.json new.json [--threshold 0.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# Permet `from registry import ...` sans installer le paquet.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from annotated_types import MaxLen  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from db.models import MAX_TEXT  # noqa: E402
+from main import app  # noqa: E402
+from registry import execution, registry  # noqa: E402
+from routers.simulate import SIMULATORS  # noqa: E402
+
+KEY = "cle-de-test-16oc"
+MIN_RUNS = 3
+MAX_RUNS = 200
+
+#: Simulateur de dechiffrement -> simulateur qui fabrique son chiffre.
+CIPHER_SOURCES = {"aes-decrypt": "aes-multiblock", "des-decrypt": "des-multiblock"}
+
+
+# --- Cas ---
+
+def _max_length(model: Any, field: str) -> int | None:
+    info = model.model_fields.get(field)
+    if info is None:
+        return None
+    return next((m.max_length for m in info.metadata if isinstance(m, MaxLen)), None)
+
+
+def _sizes(requested: list[str], maximum: int | None) -> list[int]:
+    sizes = set()
+    for size in requested:
+        if size == "max":
+            if maximum is not None:
+                sizes.add(maximum)
+        elif maximum is None or int(size) <= maximum:
+            sizes.add(int(size))
+    return sorted(sizes)
+
+
+def _stretch(value: str, size: int) -> str:
+    return (value * math.ceil(size / len(value)))[:size]
+
+
+def registry_cases(requested: list[str]) -> list[dict[str, Any]]:
+    cases, seen = [], set()
+    for algorithm, vector in registry.vectors():
+        if (algorithm.slug, vector.operation) in seen:
+            continue
+        seen.add((algorithm.slug, vector.operation))
+        operation = algorithm.operation(vector.operation)
+        url = f"{algorithm.family.prefix}{operation.resolved_path(algorithm.slug)}"
+        base = {
+            "name": f"registry/{algorithm.slug}/{vector.operation}",
+            "method": operation.method,
+            "url": url,
+        }
+        field = operation.length_field
+        value = vector.inputs.get(field)
+        cases.append({**base, "size": len(value) if isinstance(value, str) else None,
+                      "body": vector.inputs})
+        if not isinstance(value, str) or not value or operation.input_model is None:
+            continue
+        for size in _sizes(requested, _max_length(operation.input_model, field)):
+            if size != len(value):
+                cases.append({**base, "size": size,
+                              "body": {**vector.inputs, field: _stretch(value, size)}})
+    return cases
+
+
+def _simulation_body(model: Any, text: str) -> dict[str, Any]:
+    fields = model.model_fields
+    body: dict[str, Any] = {"text": text}
+    if "key" in fields:
+        body["key"] = KEY
+    if "shift" in fields:
+        body["shift"] = 3
+    return body
+
+
+def _cipher_hex(client: TestClient, source: str, text: str) -> str:
+    response = client.post(f"/api/simulate/{source}?detail=summary", json={"text": text, "key": KEY})
+    return response.json()["data"]["final_result_hex"]
+
+
+def simulator_cases(client: TestClient, requested: list[str]) -> list[dict[str, Any]]:
+    cases = []
+    for algo, (model, _, _) in sorted(SIMULATORS.items()):
+        base = {"name": f"simulate/{algo}", "method": "POST", "url": f"/api/simulate/{algo}"}
+        source = CIPHER_SOURCES.get(algo)
+        if source is None:
+            for size in _sizes(requested, _max_length(model, "text")):
+                cases.append({**base, "size": size,
+                              "body": _simulation_body(model, _stretch("CryptoLab ", size))})
+            continue
+        # Taille = longueur du clair chiffre ; le chiffre hexadecimal doit
+        # tenir dans MAX_HEX, bourrage compris.
+        limit = (_max_length(model, "cipher_hex") or 0) // 2 - 16
+        for size in _sizes(requested, min(MAX_TEXT, limit)):
+            cipher = _cipher_hex(client, source, _stretch("CryptoLab ", size))
+            cases.append({**base, "size": size, "body": {"cipher_hex": cipher, "key": KEY}})
+    return cases
+
+
+# --- Mesure ---
+
+def _call(client: TestClient, case: dict[str, Any]) -> Any:
+    return client.request(case["method"], case["url"], json=case["body"])
+
+
+def measure(client: TestClient, case: dict[str, Any], budget: float) -> dict[str, Any]:
+    result = {"name": case["name"], "size": case["size"]}
+    response = _call(client, case)  # Echauffement, et verification.
+    if response.status_code != 200:
+        error = response.json().get("error") or {}
+        return {**result, "status": "skipped", "reason": error.get("code", str(response.status_code))}
+
+    samples: list[float] = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < MIN_RUNS or (len(samples) < MAX_RUNS and time.perf_counter() < deadline):
+        start = time.perf_counter()
+        _call(client, case)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    _call(client, case)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    ordered = sorted(samples)
+    return {
+        **result,
+        "status": "ok",
+        "runs": len(samples),
+        "ops_per_s": round(len(samples) / sum(samples), 2),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)] * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    execution.PROCESS_WORKERS = 0
+    requested = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    client = TestClient(app)
+    cases = registry_cases(requested) + simulator_cases(client, requested)
+    if args.only:
+        cases = [case for case in cases if args.only in case["name"]]
+
+    results = []
+    for case in cases:
+        result = measure(client, case, args.budget)
+        results.append(result)
+        if result["status"] == "ok":
+            print(f"{result['name']:<44} {str(result['size']):>6}  "
+                  f"{result['ops_per_s']:>9.1f} op/s  p95 {result['p95_ms']:>9.3f} ms  "
+                  f"{result['peak_kib']:>9.1f} Kio")
+        else:
+            print(f"{result['name']:<44} {str(result['size']):>6}  ignore ({result['reason']})")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": requested,
+            "budget_seconds": args.budget,
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n{len(results)} cas ecrits dans {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        return _report_regressions(compare(baseline, report, args.threshold), args.threshold)
+    return 0
+
+
+# --- Comparaison ---
+
+def compare(old: dict[str, Any], new: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """Les cas mesures des deux cotes dont la latence p95 a augmente de plus de `threshold`."""
+    before = {(r["name"], r["size"]): r for r in old["results"] if r["status"] == "ok"}
+    regressions = []
+    for result in new["results"]:
+        previous = before.get((result["name"], result["size"]))
+        if previous is None or result["status"] != "ok" or previous["p95_ms"] == 0:
+            continue
+        ratio = result["p95_ms"] / previous["p95_ms"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "name": result["name"],
+                "size": result["size"],
+                "before_p95_ms": previous["p95_ms"],
+                "after_p95_ms": result["p95_ms"],
+                "ratio": round(ratio, 2),
+            })
+    return regressions
+
+
+def _report_regressions(regressions: list[dict[str, Any]], threshold: float) -> int:
+    if not regressions:
+        print(f"Aucune regression au-dela de {threshold:.0%}.")
+        return 0
+    print(f"{len(regressions)} regression(s) au-dela de {threshold:.0%} :")
+    for r in regressions:
+        print(f"  {r['name']:<44} {str(r['size']):>6}  "
+              f"p95 {r['before_p95_ms']:.3f} -> {r['after_p95_ms']:.3f} ms  (x{r['ratio']})")
+    return 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="mesurer et ecrire le JSON")
+    run_parser.add_argument("--out", default="bench.json")
+    run_parser.add_argument("--sizes", default="64,1024,max",
+                            help="tailles d'entree, `max` = borne du modele")
+    run_parser.add_argument("--only", help="ne garder que les cas dont le nom contient ce texte")
+    run_parser.add_argument("--budget", type=float, default=0.5,
+                            help="secondes de mesure par cas (au moins 3 executions)")
+    run_parser.add_argument("--baseline", help="JSON d'une execution precedente a comparer")
+    run_parser.add_argument("--threshold", type=float, default=0.25)
+
+    compare_parser = commands.add_parser("compare", help="comparer deux executions")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.25,
+                                help="hausse relative de p95 toleree (0.25 = +25 %%)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        return run(args)
+    old, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in (args.old, args.new))
+    return _report_regressions(compare(old, new, args.threshold), args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,10 @@ anonymes (voir db/crud.py). Aucun texte clair, aucune cle et aucun resultat
 de chiffrement n'est jamais ecrit sur disque.
 
 Pour l'activer : CRYPTOLAB_ENABLE_STATS=true + MONGO_URI dans l'environnement.
+
+Par worker : le client est cree a la premiere utilisation, dans le processus
+qui s'en sert. Un `MongoClient` ne survit pas a un fork ; avec plusieurs
+workers, chacun ouvre donc le sien.
 """
 
 import logging
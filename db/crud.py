@@ -7,36 +7,109 @@ resultat de chaque operation dans MongoDB — y compris pour RSA et AES.
 Regle absolue : rien de ce qu'un utilisateur saisit ne quitte la memoire du
 processus. On n'enregistre que le nom de l'algorithme, l'action demandee et la
 taille de l'entree, afin de savoir quels chapitres sont les plus utilises.
+
+Les evenements vont au backend choisi par `CRYPTOLAB_STATS_BACKEND`
+(`db.stats`) : compteurs en memoire, exposes sur `/metrics`, et, avec MongoDB,
+agregats horaires de `usage_hourly` ecrits par lots en arriere-plan
+(`db.usage_writer`, `db.usage_rollup`) — jamais un document par evenement.
 """
 
 import logging
+import os
+import threading
 
+from . import usage_rollup
 from .connection import get_db
-from .models import UsageEvent
+from .stats import MemoryStats, MongoStats, NullStats, StatsBackend
 
 logger = logging.getLogger(__name__)
 
+_backend: StatsBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def _select_backend() -> StatsBackend:
+    choice = os.getenv("CRYPTOLAB_STATS_BACKEND", "").strip().lower()
+    if choice == "none":
+        return NullStats()
+    if choice in ("", "mongo"):
+        db = get_db()
+        if db is not None:
+            return MongoStats(db)
+        if choice == "mongo":
+            logger.warning(
+                "CRYPTOLAB_STATS_BACKEND=mongo sans base joignable : compteurs en memoire."
+            )
+    elif choice != "memory":
+        logger.warning("CRYPTOLAB_STATS_BACKEND='%s' inconnu : compteurs en memoire.", choice)
+    return MemoryStats()
+
+
+def get_backend() -> StatsBackend:
+    """Le backend des statistiques, choisi a la premiere utilisation."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _select_backend()
+                logger.info("Statistiques anonymes : backend '%s'.", _backend.name)
+    return _backend
+
 
 def record_usage(algorithm: str, action: str, input_length: int = 0) -> None:
     """
     Enregistre un evenement d'usage anonyme. Silencieux et non bloquant :
-    une panne de base ne doit jamais faire echouer une requete utilisateur.
+    une panne de base ne doit jamais faire echouer une requete utilisateur,
+    ni la ralentir — l'evenement est compte ou mis en tampon, pas ecrit.
 
     Args:
         algorithm: identifiant de l'algorithme (ex: "aes-gcm").
         action: "encrypt" | "decrypt" | "hash" | "verify" | "simulate".
         input_length: longueur de l'entree, en caracteres. JAMAIS le contenu.
     """
-    db = get_db()
-    if db is None:
-        return
-
     try:
-        event = UsageEvent(
-            algorithm=algorithm,
-            action=action,
-            input_length=max(0, int(input_length)),
-        )
-        db.usage_events.insert_one(event.model_dump())
+        get_backend().record_usage(algorithm, action, max(0, int(input_length)))
     except Exception as exc:  # pragma: no cover - depend de l'environnement
         logger.warning("Echec de l'enregistrement des statistiques : %s", exc)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    """Compte une requete HTTP (gabarit de route, statut, duree)."""
+    try:
+        get_backend().observe_request(method, route, status, seconds)
+    except Exception as exc:  # pragma: no cover - defensif
+        logger.warning("Echec de la mesure de la requete : %s", exc)
+
+
+def render_prometheus() -> str:
+    return get_backend().render_prometheus()
+
+
+# --- Lectures (agregats) ---
+
+def top_algorithms(limit: int = 10, hours: int = 24 * 7) -> list[dict] | None:
+    """Algorithmes les plus utilises, depuis les agregats. None sans base."""
+    db = get_db()
+    if db is None:
+        return None
+    return usage_rollup.top_algorithms(db[usage_rollup.COLLECTION], limit, hours)
+
+
+def length_distribution(algorithm: str | None = None, hours: int = 24 * 7) -> dict | None:
+    """Histogramme des longueurs d'entree, depuis les agregats. None sans base."""
+    db = get_db()
+    if db is None:
+        return None
+    return usage_rollup.length_distribution(db[usage_rollup.COLLECTION], algorithm, hours)
+
+
+def writer_stats() -> dict[str, int] | None:
+    """Etat du tampon d'ecriture MongoDB, ou None avec un autre backend."""
+    backend = _backend
+    return backend.writer.stats() if isinstance(backend, MongoStats) else None
+
+
+def shutdown() -> None:
+    """Ecrit les evenements en attente. Appele a l'arret de l'application."""
+    if _backend is not None:
+        _backend.shutdown()
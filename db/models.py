@@ -3,6 +3,7 @@ Modeles Pydantic : validation des entrees de l'API et evenements de statistiques
 """
 
 from datetime import datetime, timezone
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -277,6 +278,10 @@ class PaddingOracleAttackInput(BaseModel):
     key_hex: str = Field(..., max_length=64)
     iv_hex: str = Field(..., max_length=32)
     cipher_hex: str = Field(..., max_length=MAX_HEX)
+    strategy: Literal["frequency", "numeric"] = Field(
+        "frequency",
+        description="Ordre des essais : clairs probables d'abord, ou 0 a 255 (comparaison).",
+    )
 
 
 # --- Sprint 6 : cle publique ---------------------------------------------------
@@ -479,3 +484,32 @@ class EnigmaInput(BaseModel):
         max_length=100,
         description="Paires separees par des espaces, ex. 'AB CD EF'.",
     )
+
+
+# --- Lot d'operations du registre ---------------------------------------------
+
+# Une page de laboratoire enchaine chiffrer, dechiffrer, hacher et comparer sur
+# plusieurs algorithmes : un lot les regroupe en un seul aller-retour HTTP. Les
+# bornes evitent qu'un lot unique ne monopolise le serveur.
+MAX_BATCH_ITEMS = 50
+MAX_BATCH_CONCURRENCY = 8
+
+
+class BatchItem(BaseModel):
+    """Une operation du lot. `input` est valide par le modele de l'operation visee."""
+
+    algorithm: str = Field(..., min_length=1, max_length=64)
+    operation: str = Field(..., min_length=1, max_length=64)
+    input: dict[str, Any] | None = None
+
+
+class BatchInput(BaseModel):
+    """
+    Lot d'operations du registre, executees dans l'ordre de la liste.
+
+    `concurrency` borne le nombre d'operations executees en parallele ; absent,
+    le lot est execute sequentiellement.
+    """
+
+    items: list[BatchItem] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+    concurrency: int | None = Field(default=None, ge=1, le=MAX_BATCH_CONCURRENCY)
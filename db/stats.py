@@ -0,0 +1,198 @@
+"""
+Destinations des statistiques anonymes : MongoDB, memoire, ou nulle part.
+
+`CRYPTOLAB_ENABLE_STATS=false` (le reglage de production) ne laissait aucune
+visibilite sur les algorithmes sollicites ou lents. Les statistiques passent
+desormais par un « backend » interchangeable :
+
+* `memory` : compteurs du processus — requetes par route et par statut,
+  histogrammes de latence, usage et longueurs d'entree par algorithme. Rien
+  n'est ecrit nulle part ; `/metrics` les expose au format texte Prometheus ;
+* `mongo` : les memes compteurs, plus les agregats horaires ecrits dans
+  MongoDB (`db.usage_rollup`, via le tampon de `db.usage_writer`) ;
+* `none` : rien du tout.
+
+Aucun ne voit jamais le contenu d'une requete : un nom d'algorithme, une
+action, une longueur, une route (son gabarit, pas l'URL), un statut, une duree.
+
+Configuration (environnement) :
+
+    CRYPTOLAB_STATS_BACKEND   mongo | memory | none. Vide : mongo si les
+                              statistiques MongoDB sont actives et joignables,
+                              memory sinon.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from collections import defaultdict
+from typing import Protocol
+
+from . import usage_rollup
+from .models import UsageEvent
+from .usage_writer import UsageWriter
+
+#: Bornes (secondes) de l'histogramme de latence.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class StatsBackend(Protocol):
+    name: str
+
+    def record_usage(self, algorithm: str, action: str, input_length: int) -> None: ...
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None: ...
+
+    def render_prometheus(self) -> str: ...
+
+    def shutdown(self) -> None: ...
+
+
+class NullStats:
+    """Ne garde rien."""
+
+    name = "none"
+
+    def record_usage(self, algorithm: str, action: str, input_length: int) -> None:
+        pass
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        pass
+
+    def render_prometheus(self) -> str:
+        return ""
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _Histogram:
+    """Histogramme cumulatif a bornes fixes, au sens de Prometheus."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        running, out = 0, []
+        for bound, n in zip((*self.bounds, None), self.counts, strict=True):
+            running += n
+            out.append(("+Inf" if bound is None else _number(bound), running))
+        return out
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: object) -> str:
+    """Etiquettes Prometheus, sans les accolades : `a="1",b="2"`."""
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+class MemoryStats:
+    """Compteurs et histogrammes du processus, rendus au format Prometheus."""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: dict[tuple[str, str, int], int] = defaultdict(int)
+        self._latency: dict[tuple[str, str], _Histogram] = {}
+        self._usage: dict[tuple[str, str], int] = defaultdict(int)
+        self._lengths: dict[tuple[str, str], _Histogram] = {}
+
+    def record_usage(self, algorithm: str, action: str, input_length: int) -> None:
+        key = (algorithm, action)
+        with self._lock:
+            self._usage[key] += 1
+            histogram = self._lengths.get(key)
+            if histogram is None:
+                histogram = self._lengths[key] = _Histogram(usage_rollup.LENGTH_BUCKETS)
+            histogram.observe(input_length)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self._requests[(method, route, status)] += 1
+            histogram = self._latency.get((method, route))
+            if histogram is None:
+                histogram = self._latency[(method, route)] = _Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            lines += [
+                "# HELP cryptolab_http_requests_total Requetes HTTP par route et statut.",
+                "# TYPE cryptolab_http_requests_total counter",
+            ]
+            for (method, route, status), n in sorted(self._requests.items()):
+                labels = _labels(method=method, route=route, status=status)
+                lines.append(f"cryptolab_http_requests_total{{{labels}}} {n}")
+            _render_histograms(
+                lines,
+                "cryptolab_http_request_duration_seconds",
+                "Duree des requetes HTTP, en secondes.",
+                {_labels(method=m, route=r): h for (m, r), h in sorted(self._latency.items())},
+            )
+            lines += [
+                "# HELP cryptolab_usage_total Operations par algorithme et action.",
+                "# TYPE cryptolab_usage_total counter",
+            ]
+            for (algorithm, action), n in sorted(self._usage.items()):
+                labels = _labels(algorithm=algorithm, action=action)
+                lines.append(f"cryptolab_usage_total{{{labels}}} {n}")
+            _render_histograms(
+                lines,
+                "cryptolab_input_length",
+                "Longueur des entrees, en caracteres.",
+                {_labels(algorithm=a, action=x): h for (a, x), h in sorted(self._lengths.items())},
+            )
+        return "\n".join(lines) + "\n"
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _render_histograms(
+    lines: list[str], name: str, help_text: str, histograms: dict[str, _Histogram]
+) -> None:
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in histograms.items():
+        for le, n in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {n}')
+        lines.append(f"{name}_sum{{{labels}}} {_number(histogram.total)}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+class MongoStats(MemoryStats):
+    """Compteurs locaux, plus les agregats horaires ecrits dans MongoDB."""
+
+    name = "mongo"
+
+    def __init__(self, db) -> None:
+        super().__init__()
+        collection = db[usage_rollup.COLLECTION]
+        self.writer = UsageWriter(lambda docs: usage_rollup.write(collection, docs))
+
+    def record_usage(self, algorithm: str, action: str, input_length: int) -> None:
+        super().record_usage(algorithm, action, input_length)
+        event = UsageEvent(algorithm=algorithm, action=action, input_length=input_length)
+        self.writer.submit(event.model_dump())
+
+    def shutdown(self) -> None:
+        self.writer.shutdown()
@@ -0,0 +1,131 @@
+"""
+Agregats horaires des statistiques d'usage.
+
+Un document par evenement faisait grossir `usage_events` sans limite, et la
+question « quels chapitres servent le plus ? » devait parcourir toute la
+collection. Les evenements sont desormais comptes en memoire, par
+(algorithme, action, heure), avec un histogramme des longueurs d'entree, puis
+ajoutes par `$inc` a un document par cle dans `usage_hourly` :
+
+    {
+      "_id": {"algorithm": "aes", "action": "encrypt", "hour": <datetime>},
+      "count": 42,
+      "lengths": {"le_16": 30, "le_64": 12}
+    }
+
+La collection grossit avec le nombre d'heures et d'algorithmes, plus avec le
+trafic. Les lectures (`top_algorithms`, `length_distribution`) agregent ces
+documents-la, jamais les evenements.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+COLLECTION = "usage_hourly"
+
+#: Bornes superieures (incluses) des tranches de longueur d'entree.
+LENGTH_BUCKETS = (16, 64, 256, 1024, 4096)
+LENGTH_LABELS = tuple(f"le_{bound}" for bound in LENGTH_BUCKETS) + (f"gt_{LENGTH_BUCKETS[-1]}",)
+
+#: (algorithme, action, heure)
+RollupKey = tuple[str, str, datetime]
+
+
+def length_bucket(length: int) -> str:
+    """Tranche d'une longueur d'entree : « le_16 », « le_64 »… « gt_4096 »."""
+    for bound, label in zip(LENGTH_BUCKETS, LENGTH_LABELS, strict=False):
+        if length <= bound:
+            return label
+    return LENGTH_LABELS[-1]
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    """L'heure pleine (UTC) qui contient `timestamp`."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def rollup(events: list[dict]) -> dict[RollupKey, Counter]:
+    """
+    Compte des evenements `UsageEvent` par cle. Chaque compteur porte `count`
+    et une entree par tranche de longueur rencontree.
+    """
+    counters: dict[RollupKey, Counter] = {}
+    for event in events:
+        key = (event["algorithm"], event["action"], hour_bucket(event["timestamp"]))
+        counter = counters.setdefault(key, Counter())
+        counter["count"] += 1
+        counter[length_bucket(event.get("input_length", 0))] += 1
+    return counters
+
+
+def upserts(counters: dict[RollupKey, Counter]) -> list[Any]:
+    """Une operation `$inc` par cle, a passer a `bulk_write`."""
+    from pymongo import UpdateOne
+
+    operations = []
+    for (algorithm, action, hour), counter in counters.items():
+        increments = {"count": counter["count"]}
+        increments.update(
+            {f"lengths.{label}": n for label, n in counter.items() if label != "count"}
+        )
+        operations.append(
+            UpdateOne(
+                {"_id": {"algorithm": algorithm, "action": action, "hour": hour}},
+                {"$inc": increments},
+                upsert=True,
+            )
+        )
+    return operations
+
+
+def write(collection, events: list[dict]) -> None:
+    """Ajoute un lot d'evenements aux agregats (un seul aller-retour)."""
+    operations = upserts(rollup(events))
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+
+# --- Lectures ---
+
+def _since(hours: int) -> dict:
+    start = hour_bucket(datetime.now(timezone.utc) - timedelta(hours=hours))
+    return {"$match": {"_id.hour": {"$gte": start}}}
+
+
+def top_algorithms(collection, limit: int = 10, hours: int = 24 * 7) -> list[dict]:
+    """Les `limit` algorithmes les plus utilises sur les `hours` dernieres heures."""
+    pipeline = [
+        _since(hours),
+        {"$group": {"_id": "$_id.algorithm", "count": {"$sum": "$count"}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": limit},
+    ]
+    return [
+        {"algorithm": row["_id"], "count": row["count"]}
+        for row in collection.aggregate(pipeline)
+    ]
+
+
+def length_distribution(
+    collection, algorithm: str | None = None, hours: int = 24 * 7
+) -> dict[str, int]:
+    """Histogramme des longueurs d'entree, tous algorithmes ou un seul."""
+    match = _since(hours)
+    if algorithm is not None:
+        match["$match"]["_id.algorithm"] = algorithm
+    pipeline = [
+        match,
+        {
+            "$group": {
+                "_id": None,
+                **{label: {"$sum": f"$lengths.{label}"} for label in LENGTH_LABELS},
+            }
+        },
+    ]
+    rows = list(collection.aggregate(pipeline))
+    return {label: (rows[0][label] if rows else 0) for label in LENGTH_LABELS}
@@ -0,0 +1,136 @@
+"""
+Ecriture differee et groupee des statistiques d'usage.
+
+`record_usage` faisait un `insert_one` synchrone dans le chemin de chaque
+requete : avec les statistiques actives, chaque chiffrement attendait un
+aller-retour vers Atlas. Les evenements passent desormais par un tampon
+circulaire en memoire ; un thread d'arriere-plan les ecrit par lots (un seul
+aller-retour par lot), des qu'un lot est plein ou qu'un delai est ecoule. La
+latence d'une requete ne depend plus de celle de la base.
+
+Le tampon est borne : s'il est plein (base lente ou injoignable), les
+nouveaux evenements sont abandonnes et comptes, jamais attendus. Des
+statistiques incompletes valent mieux qu'une API qui ralentit avec sa base.
+
+Configuration (environnement) :
+
+    CRYPTOLAB_STATS_BUFFER          evenements en attente au plus (10 000)
+    CRYPTOLAB_STATS_BATCH           evenements par lot ecrit (500)
+    CRYPTOLAB_STATS_FLUSH_SECONDS   delai maximal avant ecriture (2)
+"""
+
+import logging
+import threading
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+BUFFER_CAPACITY = env_int("CRYPTOLAB_STATS_BUFFER", 10_000)
+BATCH_SIZE = env_int("CRYPTOLAB_STATS_BATCH", 500, minimum=1)
+FLUSH_INTERVAL = env_float("CRYPTOLAB_STATS_FLUSH_SECONDS", 2.0)
+
+
+class UsageWriter:
+    """
+    Tampon borne + thread d'ecriture. `write_batch` est la fonction qui ecrit
+    un lot de documents (en production : `usage_rollup.write`).
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[list[dict]], Any],
+        *,
+        capacity: int = BUFFER_CAPACITY,
+        batch_size: int = BATCH_SIZE,
+        interval: float = FLUSH_INTERVAL,
+    ) -> None:
+        self._write_batch = write_batch
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.interval = interval
+        self._buffer: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    # --- Cote requete ---
+
+    def submit(self, document: dict) -> bool:
+        """Met un evenement en attente, sans jamais bloquer. False s'il est abandonne."""
+        with self._lock:
+            if self._stopping or len(self._buffer) >= self.capacity:
+                self.dropped += 1
+                return False
+            self._buffer.append(document)
+            full_batch = len(self._buffer) >= self.batch_size
+            if self._thread is None:
+                self._start()
+        if full_batch:
+            self._wake.set()
+        return True
+
+    # --- Cote ecriture ---
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="cryptolab-usage-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def _take(self) -> list[dict]:
+        with self._lock:
+            count = min(len(self._buffer), self.batch_size)
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def flush(self) -> int:
+        """Ecrit tout ce qui attend, lot par lot. Retourne le nombre ecrit."""
+        written = 0
+        while batch := self._take():
+            try:
+                self._write_batch(batch)
+            except Exception as exc:  # pragma: no cover - depend de l'environnement
+                self.failed += len(batch)
+                logger.warning("Echec de l'ecriture de %d evenements d'usage : %s", len(batch), exc)
+                continue
+            self.batches += 1
+            self.written += len(batch)
+            written += len(batch)
+        return written
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Arrete le thread et ecrit ce qui reste. Les evenements suivants sont abandonnes."""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            pending = len(self._buffer)
+        return {
+            "pending": pending,
+            "capacity": self.capacity,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
@@ -1,18 +1,39 @@
 import logging
 import os
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from auth import local_state
+from db import crud
 from db.connection import stats_enabled
-from registry import build_catalog_router, build_routers, registry
+from registry import (
+    build_batch_router,
+    build_catalog_router,
+    build_routers,
+    execution,
+    profiling,
+    registry,
+)
 from registry.envelope import install_handlers
-from routers import auth, simulate
+from routers import attacks, auth, binary, metrics, simulate
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    # Le pool de processus des operations lourdes n'est cree qu'au premier
+    # besoin ; s'il existe, on l'arrete proprement avec l'application.
+    execution.shutdown()
+    # Les statistiques d'usage en tampon sont ecrites avant de partir.
+    crud.shutdown()
+
+
 app = FastAPI(
     title="CryptoLab API",
     version="2.0.0-dev",
@@ -24,6 +45,7 @@ app = FastAPI(
         "vraies donnees.\n\n"
         "Aucune donnee saisie par l'utilisateur n'est enregistree."
     ),
+    lifespan=lifespan,
 )
 
 # --- CORS ---
@@ -41,9 +63,20 @@ app.add_middleware(
     # L'API n'utilise ni cookie ni session : les identifiants sont inutiles.
     allow_credentials=False,
     allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["Content-Type"],
+    # Les routes binaires recoivent cle, IV et nonce en en-tetes.
+    allow_headers=["Content-Type", *binary.HEADERS],
 )
 
+# --- Mesure des requetes ---
+# Compteurs et latences par gabarit de route, exposes sur /metrics. Aucune
+# donnee de requete n'est lue : seulement la route, le statut et la duree.
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+# --- Profilage a la demande ---
+# Inerte tant que CRYPTOLAB_ADMIN_TOKEN et CRYPTOLAB_PROFILE_SAMPLE_RATE sont
+# vides (voir registry/profiling.py).
+app.add_middleware(profiling.ProfilingMiddleware)
+
 # --- Enveloppe de reponse ---
 # Branche avant les routeurs : toute sortie de l'API, y compris les erreurs de
 # validation que nous n'ecrivons pas nous-memes, respecte {ok, data, error}.
@@ -55,12 +88,18 @@ install_handlers(app)
 for algorithm_router in build_routers(registry):
     app.include_router(algorithm_router)
 app.include_router(build_catalog_router(registry))
+app.include_router(build_batch_router(registry))
 
 # --- Routeurs ecrits a la main ---
-# La simulation pas a pas et l'authentification ne sont pas des algorithmes du
+# La simulation pas a pas, les variantes binaires, les attaques diffusees,
+# l'authentification et les metriques ne sont pas des algorithmes du
 # catalogue : elles gardent leurs routeurs propres.
 app.include_router(simulate.router)
+app.include_router(binary.router)
+app.include_router(attacks.router)
 app.include_router(auth.router)
+app.include_router(metrics.router)
+app.include_router(metrics.prometheus_router)
 
 
 @app.get("/", tags=["Meta"], summary="Health check")
@@ -81,15 +120,23 @@ def health():
     # deploiement : un repli silencieux sur la memoire ferait disparaitre les
     # inscriptions au premier redemarrage.
     try:
-        from auth.repository import MongoUserRepository, get_repository
+        from auth.repository import MongoUserRepository, SqliteUserRepository, get_repository
 
-        accounts = "mongodb" if isinstance(get_repository(), MongoUserRepository) else "memory"
+        repository = get_repository()
+        if isinstance(repository, MongoUserRepository):
+            accounts = "mongodb"
+        elif isinstance(repository, SqliteUserRepository):
+            accounts = "sqlite"
+        else:
+            accounts = "memory"
     except Exception:
         accounts = "unavailable"
 
     return {
         "status": "ok",
         "anonymous_stats": stats_enabled(),
+        "anonymous_stats_writer": crud.writer_stats(),
         "accounts_backend": accounts,
+        "workers": local_state.worker_count(),
         "allowed_origins": origins,
     }
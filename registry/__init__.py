@@ -12,25 +12,29 @@ from .errors import (
     DecryptionFailed,
     InvalidInput,
     InvalidKey,
+    ServerBusy,
     UnknownAlgorithm,
     UnsupportedOperation,
 )
-from .routes import build_catalog_router, build_routers
-from .spec import Algorithm, Family, Maturity, Operation, Registry, TestVector
+from .routes import build_batch_router, build_catalog_router, build_routers
+from .spec import Algorithm, Execution, Family, Maturity, Operation, Registry, TestVector
 
 __all__ = [
     "Algorithm",
     "CryptoLabError",
     "DecryptionFailed",
+    "Execution",
     "Family",
     "InvalidInput",
     "InvalidKey",
     "Maturity",
     "Operation",
     "Registry",
+    "ServerBusy",
     "TestVector",
     "UnknownAlgorithm",
     "UnsupportedOperation",
+    "build_batch_router",
     "build_catalog_router",
     "build_routers",
     "registry",
@@ -26,7 +26,7 @@ from db.models import (
     SmallRsaSignInput,
     SmallRsaVerifyInput,
 )
-from registry.spec import Algorithm, Family, Maturity, Operation, TestVector
+from registry.spec import Algorithm, Execution, Family, Maturity, Operation, TestVector
 
 RSA = Algorithm(
     slug="rsa",
@@ -48,6 +48,7 @@ RSA = Algorithm(
             summary="Generer une paire de clefs RSA 2048 bits",
             method="GET",
             path="/rsa/generate-keys",
+            execution=Execution.PROCESS,
         ),
         Operation(
             name="encrypt",
@@ -216,6 +217,7 @@ RSA_SIGNATURE = Algorithm(
             summary="Generer une paire de cles RSA-2048 dediee a la signature",
             method="GET",
             path="/rsasignature/generate-keys",
+            execution=Execution.PROCESS,
         ),
         Operation(
             name="sign-pkcs1v15",
@@ -409,6 +411,7 @@ ECC = Algorithm(
             input_model=EccScalarMultiplyInput,
             handler=lambda d: _ecc_scalar_multiply(d.k, d.x, d.y),
             summary="Calculer k*P (doublement-et-addition)",
+            execution=Execution.PROCESS,
         ),
     ),
     vectors=(
@@ -561,6 +564,7 @@ DSA = Algorithm(
             summary="Generer une paire de cles DSA (2048 bits)",
             method="GET",
             path="/dsa/generate-keys",
+            execution=Execution.PROCESS,
         ),
         Operation(
             name="sign",
@@ -12,7 +12,7 @@ from db.models import (
     ShiftInput,
     TextInput,
 )
-from registry.spec import Algorithm, Family, Maturity, Operation, TestVector
+from registry.spec import Algorithm, Execution, Family, Maturity, Operation, TestVector
 from utils import (
     affine_tool,
     caesar,
@@ -46,12 +46,14 @@ CAESAR = Algorithm(
             input_model=ShiftInput,
             handler=lambda d: {"cipher": caesar.caesar_encrypt(d.text, d.shift)},
             summary="Chiffrer un texte par decalage",
+            execution=Execution.INLINE,
         ),
         Operation(
             name="decrypt",
             input_model=ShiftInput,
             handler=lambda d: {"plain": caesar.caesar_decrypt(d.text, d.shift)},
             summary="Dechiffrer un texte decale",
+            execution=Execution.INLINE,
         ),
     ),
     vectors=(
@@ -287,12 +289,14 @@ ROT13 = Algorithm(
             input_model=TextInput,
             handler=lambda d: {"cipher": substitution_tool.rot13(d.text)},
             summary="Appliquer ROT13 (involutif : chiffrer = dechiffrer)",
+            execution=Execution.INLINE,
         ),
         Operation(
             name="decrypt",
             input_model=TextInput,
             handler=lambda d: {"plain": substitution_tool.rot13(d.text)},
             summary="Appliquer ROT13 (involutif : chiffrer = dechiffrer)",
+            execution=Execution.INLINE,
         ),
     ),
     vectors=(
@@ -329,12 +333,14 @@ ATBASH = Algorithm(
             input_model=TextInput,
             handler=lambda d: {"cipher": substitution_tool.atbash(d.text)},
             summary="Appliquer Atbash (involutif : chiffrer = dechiffrer)",
+            execution=Execution.INLINE,
         ),
         Operation(
             name="decrypt",
             input_model=TextInput,
             handler=lambda d: {"plain": substitution_tool.atbash(d.text)},
             summary="Appliquer Atbash (involutif : chiffrer = dechiffrer)",
+            execution=Execution.INLINE,
         ),
     ),
     vectors=(
@@ -12,7 +12,7 @@ from db.models import (
     ScryptInput,
     TextInput,
 )
-from registry.spec import Algorithm, Family, Maturity, Operation, TestVector
+from registry.spec import Algorithm, Execution, Family, Maturity, Operation, TestVector
 from utils import hash_tool
 
 SHA256 = Algorithm(
@@ -92,6 +92,7 @@ BCRYPT = Algorithm(
             },
             summary="Hacher un mot de passe (facteur de cout reglable)",
             path="/bcrypt",
+            execution=Execution.PROCESS,
         ),
         Operation(
             name="verify",
@@ -102,6 +103,7 @@ BCRYPT = Algorithm(
             },
             summary="Verifier un mot de passe contre son hachage",
             path="/bcrypt/verify",
+            execution=Execution.PROCESS,
         ),
     ),
     vectors=(
@@ -371,6 +373,7 @@ PBKDF2 = Algorithm(
             summary="Deriver une cle par PBKDF2-HMAC-SHA256",
             path="/pbkdf2",
             length_field="password",
+            execution=Execution.PROCESS,
         ),
     ),
     vectors=(
@@ -419,6 +422,7 @@ SCRYPT = Algorithm(
             summary="Deriver une cle par scrypt",
             path="/scrypt",
             length_field="password",
+            execution=Execution.PROCESS,
         ),
     ),
     vectors=(
@@ -472,6 +476,7 @@ ARGON2ID = Algorithm(
             summary="Deriver une cle par Argon2id",
             path="/argon2id",
             length_field="password",
+            execution=Execution.PROCESS,
         ),
     ),
     vectors=(
@@ -20,17 +20,143 @@ from db.models import (
     Rc4Input,
     TripleDesDecryptInput,
 )
-from registry.spec import Algorithm, Family, Maturity, Operation, TestVector
-from utils import (
-    aes_tool,
-    chacha20_tool,
-    des_tool,
-    finalists_tool,
-    modes_tool,
-    padding_oracle,
-    rc4_tool,
-    tripledes_tool,
-)
+from registry import execution
+from registry.spec import Algorithm, Execution, Family, Maturity, Operation, TestVector
+from utils import rc4_tool
+
+# Imports differes : PyCryptodome et cryptography coutent plusieurs centaines
+# de ms au chargement. Le catalogue est importe au demarrage (et par chaque
+# processus de calcul) : chaque outil n'est charge qu'a son premier appel.
+
+
+def _encrypt_aes_gcm(plain_text: str, key: str, key_size: int = 32) -> dict:
+    from utils import aes_tool
+
+    return aes_tool.encrypt_aes_gcm(plain_text, key, key_size=key_size)
+
+
+def _decrypt_aes_gcm(
+    cipher_hex: str, key: str, nonce_hex: str, tag_hex: str, salt_hex: str, key_size: int = 32
+) -> str:
+    from utils import aes_tool
+
+    return aes_tool.decrypt_aes_gcm(cipher_hex, key, nonce_hex, tag_hex, salt_hex, key_size=key_size)
+
+
+def _encrypt_des_cbc(plain_text: str, key: str) -> dict:
+    from utils import des_tool
+
+    return des_tool.encrypt_des_cbc(plain_text, key)
+
+
+def _decrypt_des_cbc(cipher_hex: str, key: str, iv_hex: str, salt_hex: str) -> str:
+    from utils import des_tool
+
+    return des_tool.decrypt_des_cbc(cipher_hex, key, iv_hex, salt_hex)
+
+
+def _encrypt_3des_cbc(plain_text: str, key: str) -> dict:
+    from utils import tripledes_tool
+
+    return tripledes_tool.encrypt_3des_cbc(plain_text, key)
+
+
+def _decrypt_3des_cbc(cipher_hex: str, key: str, iv_hex: str, salt_hex: str) -> str:
+    from utils import tripledes_tool
+
+    return tripledes_tool.decrypt_3des_cbc(cipher_hex, key, iv_hex, salt_hex)
+
+
+def _encrypt_chacha20(plain_text: str, key: str) -> dict:
+    from utils import chacha20_tool
+
+    return chacha20_tool.encrypt_chacha20(plain_text, key)
+
+
+def _decrypt_chacha20(cipher_hex: str, key: str, nonce_hex: str, salt_hex: str) -> str:
+    from utils import chacha20_tool
+
+    return chacha20_tool.decrypt_chacha20(cipher_hex, key, nonce_hex, salt_hex)
+
+
+def _encrypt_ecb(key_hex: str, plaintext_hex: str) -> dict:
+    from utils import modes_tool
+
+    return modes_tool.encrypt_ecb(key_hex, plaintext_hex)
+
+
+def _encrypt_cbc(key_hex: str, plaintext_hex: str, iv_hex: str) -> dict:
+    from utils import modes_tool
+
+    return modes_tool.encrypt_cbc(key_hex, plaintext_hex, iv_hex)
+
+
+def _encrypt_ctr(key_hex: str, plaintext_hex: str, iv_hex: str) -> dict:
+    from utils import modes_tool
+
+    return modes_tool.encrypt_ctr(key_hex, plaintext_hex, iv_hex)
+
+
+def _ecb_penguin_demo(key_hex: str, block_hex: str, repeats: int) -> dict:
+    from utils import modes_tool
+
+    return modes_tool.ecb_penguin_demo(key_hex, block_hex, repeats)
+
+
+def _encrypt_blowfish_cbc(plain_text: str, key: str) -> dict:
+    from utils import finalists_tool
+
+    return finalists_tool.encrypt_blowfish_cbc(plain_text, key)
+
+
+def _decrypt_blowfish_cbc(cipher_hex: str, key: str, iv_hex: str, salt_hex: str) -> str:
+    from utils import finalists_tool
+
+    return finalists_tool.decrypt_blowfish_cbc(cipher_hex, key, iv_hex, salt_hex)
+
+
+def _blowfish_ecb_block_hex(key_hex: str, plaintext_hex: str) -> dict:
+    from utils import finalists_tool
+
+    return finalists_tool.blowfish_ecb_block_hex(key_hex, plaintext_hex)
+
+
+def _encrypt_camellia_cbc(plain_text: str, key: str) -> dict:
+    from utils import finalists_tool
+
+    return finalists_tool.encrypt_camellia_cbc(plain_text, key)
+
+
+def _decrypt_camellia_cbc(cipher_hex: str, key: str, iv_hex: str, salt_hex: str) -> str:
+    from utils import finalists_tool
+
+    return finalists_tool.decrypt_camellia_cbc(cipher_hex, key, iv_hex, salt_hex)
+
+
+def _camellia_ecb_block_hex(key_hex: str, plaintext_hex: str) -> dict:
+    from utils import finalists_tool
+
+    return finalists_tool.camellia_ecb_block_hex(key_hex, plaintext_hex)
+
+
+def _encrypt_for_oracle(key_hex: str, iv_hex: str, plaintext: str) -> dict:
+    from utils import padding_oracle
+
+    return padding_oracle.encrypt_for_oracle(key_hex, iv_hex, plaintext)
+
+
+def _oracle_query(key_hex: str, iv_hex: str, cipher_hex: str) -> dict:
+    from utils import padding_oracle
+
+    return padding_oracle.oracle_query(key_hex, iv_hex, cipher_hex)
+
+
+def _padding_oracle_attack(key_hex: str, iv_hex: str, cipher_hex: str, strategy: str) -> dict:
+    from utils import padding_oracle
+
+    return padding_oracle.padding_oracle_attack(
+        key_hex, iv_hex, cipher_hex, strategy=strategy, fan_out=execution.fan_out
+    )
 
 
 def _aes_variant(slug: str, name: str, key_size: int, year: int, summary_size: str) -> Algorithm:
@@ -56,7 +182,7 @@ def _aes_variant(slug: str, name: str, key_size: int, year: int, summary_size: s
             Operation(
                 name="encrypt",
                 input_model=KeyTextInput,
-                handler=lambda d, ks=key_size: aes_tool.encrypt_aes_gcm(d.text, d.key, key_size=ks),
+                handler=lambda d, ks=key_size: _encrypt_aes_gcm(d.text, d.key, key_size=ks),
                 summary=f"Chiffrer en {name}",
                 description=(
                     "Le nonce est tire au hasard a chaque appel : deux chiffrements "
@@ -67,7 +193,7 @@ def _aes_variant(slug: str, name: str, key_size: int, year: int, summary_size: s
                 name="decrypt",
                 input_model=AesVariantDecryptInput,
                 handler=lambda d, ks=key_size: {
-                    "plain": aes_tool.decrypt_aes_gcm(
+                    "plain": _decrypt_aes_gcm(
                         d.cipher_hex, d.key, d.nonce_hex, d.tag_hex, d.salt_hex, key_size=ks
                     )
                 },
@@ -103,7 +229,7 @@ AES = Algorithm(
         Operation(
             name="encrypt",
             input_model=KeyTextInput,
-            handler=lambda d: aes_tool.encrypt_aes_gcm(d.text, d.key),
+            handler=lambda d: _encrypt_aes_gcm(d.text, d.key),
             summary="Chiffrer en AES-256-GCM",
             description=(
                 "Le nonce est tire au hasard a chaque appel : deux chiffrements "
@@ -115,7 +241,7 @@ AES = Algorithm(
             name="decrypt",
             input_model=AesDecryptInput,
             handler=lambda d: {
-                "plain": aes_tool.decrypt_aes_gcm(
+                "plain": _decrypt_aes_gcm(
                     d.cipher_hex, d.key, d.nonce_hex, d.tag_hex, d.salt_hex
                 )
             },
@@ -145,14 +271,14 @@ DES = Algorithm(
         Operation(
             name="encrypt",
             input_model=KeyTextInput,
-            handler=lambda d: des_tool.encrypt_des_cbc(d.text, d.key),
+            handler=lambda d: _encrypt_des_cbc(d.text, d.key),
             summary="Chiffrer en DES-CBC",
         ),
         Operation(
             name="decrypt",
             input_model=DesDecryptInput,
             handler=lambda d: {
-                "plain": des_tool.decrypt_des_cbc(d.cipher_hex, d.key, d.iv_hex, d.salt_hex)
+                "plain": _decrypt_des_cbc(d.cipher_hex, d.key, d.iv_hex, d.salt_hex)
             },
             summary="Dechiffrer un DES-CBC",
             length_field="cipher_hex",
@@ -181,14 +307,14 @@ TRIPLEDES = Algorithm(
         Operation(
             name="encrypt",
             input_model=KeyTextInput,
-            handler=lambda d: tripledes_tool.encrypt_3des_cbc(d.text, d.key),
+            handler=lambda d: _encrypt_3des_cbc(d.text, d.key),
             summary="Chiffrer en 3DES-CBC",
         ),
         Operation(
             name="decrypt",
             input_model=TripleDesDecryptInput,
             handler=lambda d: {
-                "plain": tripledes_tool.decrypt_3des_cbc(d.cipher_hex, d.key, d.iv_hex, d.salt_hex)
+                "plain": _decrypt_3des_cbc(d.cipher_hex, d.key, d.iv_hex, d.salt_hex)
             },
             summary="Dechiffrer un 3DES-CBC",
             length_field="cipher_hex",
@@ -217,7 +343,7 @@ CHACHA20 = Algorithm(
         Operation(
             name="encrypt",
             input_model=ChaCha20Input,
-            handler=lambda d: chacha20_tool.encrypt_chacha20(d.text, d.key),
+            handler=lambda d: _encrypt_chacha20(d.text, d.key),
             summary="Chiffrer en ChaCha20-Poly1305",
             description=(
                 "Le nonce (96 bits) est tire au hasard a chaque appel, comme "
@@ -228,7 +354,7 @@ CHACHA20 = Algorithm(
             name="decrypt",
             input_model=ChaCha20DecryptInput,
             handler=lambda d: {
-                "plain": chacha20_tool.decrypt_chacha20(d.cipher_hex, d.key, d.nonce_hex, d.salt_hex)
+                "plain": _decrypt_chacha20(d.cipher_hex, d.key, d.nonce_hex, d.salt_hex)
             },
             summary="Dechiffrer et verifier le tag Poly1305",
             length_field="cipher_hex",
@@ -312,28 +438,28 @@ ECB_PENGUIN = Algorithm(
         Operation(
             name="encrypt-ecb",
             input_model=ModesEncryptInput,
-            handler=lambda d: modes_tool.encrypt_ecb(d.key_hex, d.plaintext_hex),
+            handler=lambda d: _encrypt_ecb(d.key_hex, d.plaintext_hex),
             summary="Chiffrer en ECB (cle et clair en hexadecimal)",
             length_field="plaintext_hex",
         ),
         Operation(
             name="encrypt-cbc",
             input_model=ModesEncryptInput,
-            handler=lambda d: modes_tool.encrypt_cbc(d.key_hex, d.plaintext_hex, d.iv_hex),
+            handler=lambda d: _encrypt_cbc(d.key_hex, d.plaintext_hex, d.iv_hex),
             summary="Chiffrer en CBC (cle, IV et clair en hexadecimal)",
             length_field="plaintext_hex",
         ),
         Operation(
             name="encrypt-ctr",
             input_model=ModesEncryptInput,
-            handler=lambda d: modes_tool.encrypt_ctr(d.key_hex, d.plaintext_hex, d.iv_hex),
+            handler=lambda d: _encrypt_ctr(d.key_hex, d.plaintext_hex, d.iv_hex),
             summary="Chiffrer en CTR (cle, compteur initial et clair en hexadecimal)",
             length_field="plaintext_hex",
         ),
         Operation(
             name="penguin-demo",
             input_model=EcbPenguinInput,
-            handler=lambda d: modes_tool.ecb_penguin_demo(d.key_hex, d.block_hex, d.repeats),
+            handler=lambda d: _ecb_penguin_demo(d.key_hex, d.block_hex, d.repeats),
             summary="Repeter un bloc et comparer ECB/CBC/CTR (le pingouin ECB)",
             length_field="block_hex",
         ),
@@ -428,14 +554,14 @@ BLOWFISH = Algorithm(
         Operation(
             name="encrypt",
             input_model=KeyTextInput,
-            handler=lambda d: finalists_tool.encrypt_blowfish_cbc(d.text, d.key),
+            handler=lambda d: _encrypt_blowfish_cbc(d.text, d.key),
             summary="Chiffrer en Blowfish-CBC",
         ),
         Operation(
             name="decrypt",
             input_model=FinalistDecryptInput,
             handler=lambda d: {
-                "plain": finalists_tool.decrypt_blowfish_cbc(d.cipher_hex, d.key, d.iv_hex, d.salt_hex)
+                "plain": _decrypt_blowfish_cbc(d.cipher_hex, d.key, d.iv_hex, d.salt_hex)
             },
             summary="Dechiffrer un Blowfish-CBC",
             length_field="cipher_hex",
@@ -443,7 +569,7 @@ BLOWFISH = Algorithm(
         Operation(
             name="ecb-block",
             input_model=FinalistBlockHexInput,
-            handler=lambda d: finalists_tool.blowfish_ecb_block_hex(d.key_hex, d.plaintext_hex),
+            handler=lambda d: _blowfish_ecb_block_hex(d.key_hex, d.plaintext_hex),
             summary="Chiffrer un bloc de 8 octets en Blowfish-ECB (vecteurs officiels)",
             path="/blowfish/ecb-block",
             length_field="plaintext_hex",
@@ -484,14 +610,14 @@ CAMELLIA = Algorithm(
         Operation(
             name="encrypt",
             input_model=KeyTextInput,
-            handler=lambda d: finalists_tool.encrypt_camellia_cbc(d.text, d.key),
+            handler=lambda d: _encrypt_camellia_cbc(d.text, d.key),
             summary="Chiffrer en Camellia-128-CBC",
         ),
         Operation(
             name="decrypt",
             input_model=FinalistDecryptInput,
             handler=lambda d: {
-                "plain": finalists_tool.decrypt_camellia_cbc(d.cipher_hex, d.key, d.iv_hex, d.salt_hex)
+                "plain": _decrypt_camellia_cbc(d.cipher_hex, d.key, d.iv_hex, d.salt_hex)
             },
             summary="Dechiffrer un Camellia-128-CBC",
             length_field="cipher_hex",
@@ -499,7 +625,7 @@ CAMELLIA = Algorithm(
         Operation(
             name="ecb-block",
             input_model=FinalistBlockHexInput,
-            handler=lambda d: finalists_tool.camellia_ecb_block_hex(d.key_hex, d.plaintext_hex),
+            handler=lambda d: _camellia_ecb_block_hex(d.key_hex, d.plaintext_hex),
             summary="Chiffrer un bloc de 16 octets en Camellia-ECB (vecteur officiel)",
             path="/camellia/ecb-block",
             length_field="plaintext_hex",
@@ -543,14 +669,14 @@ PADDING_ORACLE = Algorithm(
         Operation(
             name="encrypt",
             input_model=PaddingOracleEncryptInput,
-            handler=lambda d: padding_oracle.encrypt_for_oracle(d.key_hex, d.iv_hex, d.plaintext),
+            handler=lambda d: _encrypt_for_oracle(d.key_hex, d.iv_hex, d.plaintext),
             summary="Chiffrer un texte en AES-CBC + PKCS#7 (cle et IV en clair)",
             length_field="plaintext",
         ),
         Operation(
             name="oracle-query",
             input_model=PaddingOracleQueryInput,
-            handler=lambda d: padding_oracle.oracle_query(d.key_hex, d.iv_hex, d.cipher_hex),
+            handler=lambda d: _oracle_query(d.key_hex, d.iv_hex, d.cipher_hex),
             summary="Interroger l'oracle : ce couple (IV, chiffre) a-t-il un bourrage valide ?",
             path="/paddingoracle/oracle-query",
             length_field="cipher_hex",
@@ -558,10 +684,13 @@ PADDING_ORACLE = Algorithm(
         Operation(
             name="attack",
             input_model=PaddingOracleAttackInput,
-            handler=lambda d: padding_oracle.padding_oracle_attack(d.key_hex, d.iv_hex, d.cipher_hex),
+            handler=lambda d: _padding_oracle_attack(d.key_hex, d.iv_hex, d.cipher_hex, d.strategy),
             summary="Dechiffrer entierement via l'oracle de bourrage, sans la cle",
             path="/paddingoracle/attack",
             length_field="cipher_hex",
+            # Le handler ne fait qu'orchestrer, dans un thread : les blocs,
+            # independants, se recuperent en parallele dans le pool de processus.
+            execution=Execution.THREAD,
         ),
     ),
     # Pas de vecteur NIST/RFC (il n'existe pas de reference officielle pour
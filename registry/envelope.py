@@ -13,11 +13,12 @@ le code retour a raison, et un client qui ne regarde que l'enveloppe aussi.
 
 from __future__ import annotations
 
+import json
 from typing import Any, Generic, TypeVar
 
 from fastapi import HTTPException, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
 from .errors import CryptoLabError
@@ -41,12 +42,79 @@ class Envelope(BaseModel, Generic[T]):
     error: ErrorBody | None = None
 
 
-def success(data: Any, status: int = 200) -> JSONResponse:
+# --- Encodage ---
+#
+# `JSONResponse(content=jsonable_encoder(data))` parcourt deux fois le resultat :
+# une fois pour le convertir, une fois pour le serialiser. Un simulateur SHA-256
+# sur 20 Ko d'entree produit des milliers d'etapes, et ce double parcours pesait
+# une bonne part du temps de reponse. Les handlers renvoient presque toujours
+# des structures deja primitives : on le verifie d'un parcours rapide et l'on
+# serialise directement, `jsonable_encoder` ne servant plus que de repli.
+
+try:  # orjson est optionnel : plus rapide, mais l'API s'en passe tres bien.
+    import orjson
+except ImportError:  # pragma: no cover - depend de l'environnement
+    orjson = None
+
+#: Types serialisables tels quels. Comparaison de type exacte : une sous-classe
+#: (une Enum qui herite de str, par exemple) passe par `jsonable_encoder`.
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+def is_primitive(value: Any) -> bool:
+    """Vrai si `value` ne contient que des dict a clefs str, listes et scalaires."""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        kind = type(item)
+        if kind in _SCALARS:
+            continue
+        if kind is dict:
+            for key, child in item.items():
+                if type(key) is not str:
+                    return False
+                stack.append(child)
+        elif kind is list or kind is tuple:
+            stack.extend(item)
+        else:
+            return False
+    return True
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    # Memes options que `JSONResponse.render` : les octets produits sont identiques.
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(value: Any) -> bytes:
+    """Serialise une valeur JSON en octets (orjson si disponible)."""
+    if not is_primitive(value):
+        value = jsonable(value)
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            # Entier au-dela de 64 bits (RSA, Diffie-Hellman...) : orjson le
+            # refuse, la bibliotheque standard le sait ecrire.
+            pass
+    return _stdlib_dumps(value)
+
+
+def encode_success(data: Any) -> bytes:
+    """Enveloppe reussie, ecrite directement en octets."""
+    return b'{"ok":true,"data":' + dumps(data) + b',"error":null}'
+
+
+def encode_failure(code: str, message: str, details: dict[str, Any] | None = None) -> bytes:
+    """Enveloppe en echec, ecrite directement en octets."""
+    return b'{"ok":false,"data":null,"error":' + dumps(error_body(code, message, details)) + b"}"
+
+
+def success(data: Any, status: int = 200) -> Response:
     """Reponse reussie."""
-    return JSONResponse(
-        status_code=status,
-        content={"ok": True, "data": jsonable(data), "error": None},
-    )
+    return Response(encode_success(data), status_code=status, media_type="application/json")
 
 
 def failure(
@@ -54,18 +122,29 @@ def failure(
     message: str,
     status: int,
     details: dict[str, Any] | None = None,
-) -> JSONResponse:
+) -> Response:
     """Reponse en echec, avec le vrai code HTTP."""
-    return JSONResponse(
-        status_code=status,
-        content={
-            "ok": False,
-            "data": None,
-            "error": {"code": code, "message": message, "details": details or {}},
-        },
+    return Response(
+        encode_failure(code, message, details), status_code=status, media_type="application/json"
     )
 
 
+def error_body(code: str, message: str, details: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Partie « erreur » de l'enveloppe, sous forme de dictionnaire."""
+    return {"code": code, "message": message, "details": details or {}}
+
+
+def validation_message(errors: list[dict[str, Any]]) -> str:
+    """
+    Resume une liste d'erreurs Pydantic en une phrase : la premiere erreur,
+    prefixee du champ fautif. La liste complete reste dans `details`.
+    """
+    first = errors[0] if errors else {}
+    field = ".".join(str(part) for part in first.get("loc", ()) if part != "body")
+    message = first.get("msg", "Donnees d'entree invalides.")
+    return f"{field} : {message}" if field else message
+
+
 def jsonable(value: Any) -> Any:
     """Convertit les modeles Pydantic imbriques en structures JSON."""
     from fastapi.encoders import jsonable_encoder
@@ -129,12 +208,9 @@ def install_handlers(app) -> None:
         # Pydantic renvoie une liste d'erreurs structurees ; on la conserve dans
         # `details` et on resume la premiere dans `message`.
         errors = exc.errors()
-        first = errors[0] if errors else {}
-        field = ".".join(str(part) for part in first.get("loc", ()) if part != "body")
-        message = first.get("msg", "Donnees d'entree invalides.")
         return failure(
             "validation_error",
-            f"{field} : {message}" if field else message,
+            validation_message(errors),
             422,
             {"errors": jsonable(errors)},
         )
@@ -27,6 +27,16 @@ class CryptoLabError(Exception):
         self.message = message
         self.details = details or {}
 
+    def __reduce__(self):  # noqa: ANN204
+        # Une erreur levee dans le pool de processus revient par pickle, qui ne
+        # rappelle le constructeur qu'avec `args` : sans cela, `details` serait
+        # perdu en chemin.
+        return _rebuild, (type(self), self.message, self.details)
+
+
+def _rebuild(cls: type[CryptoLabError], message: str, details: dict) -> CryptoLabError:
+    return cls(message, details=details)
+
 
 class InvalidInput(CryptoLabError):
     """Entree syntaxiquement valide mais refusee par l'algorithme."""
@@ -67,3 +77,16 @@ class UnsupportedOperation(CryptoLabError):
 
     code = "unsupported_operation"
     status = 404
+
+
+class ServerBusy(CryptoLabError):
+    """
+    Trop d'operations lourdes sont deja en cours.
+
+    Le pool de processus est borne : au-dela de sa file d'attente, on refuse
+    tout de suite plutot que d'empiler des requetes qui expireraient de toute
+    facon. Le client peut reessayer quelques secondes plus tard.
+    """
+
+    code = "server_busy"
+    status = 503
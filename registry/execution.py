@@ -0,0 +1,253 @@
+"""
+Execution des operations du registre : boucle d'evenements, threads, processus.
+
+Chaque `Operation` declare sa classe d'execution (`registry.spec.Execution`).
+Ce module tient les deux ressources partagees qui en decoulent :
+
+* un **pool de processus borne**, pour les operations lourdes (bcrypt de cout
+  16, scrypt a n=1M, generation de clefs RSA-2048). Elles y tournent en
+  parallele sur plusieurs coeurs, hors du GIL du processus qui sert les
+  requetes. Une operation faite de taches independantes (attaque par oracle
+  de bourrage, un bloc par tache) les y repartit par `fan_out` ;
+* une **jauge par classe**, qui borne le nombre d'operations en vol. Au-dela,
+  la requete est refusee tout de suite par `ServerBusy` (503) : un etudiant qui
+  lance scrypt aux parametres maximaux ne peut pas bloquer une classe entiere.
+
+Le pool n'est cree qu'au premier besoin. Les processus sont lances en mode
+`spawn` (identique sous Linux, macOS et Windows) et importent le catalogue une
+seule fois a leur demarrage. Les handlers du catalogue sont des lambdas, que
+`pickle` ne sait pas transporter : on envoie au processus le slug et le nom de
+l'operation, et il retrouve le handler dans son propre registre.
+
+Configuration (environnement) :
+
+    CRYPTOLAB_PROCESS_WORKERS    processus du pool (0 = pas de pool : les
+                                 operations lourdes tournent en thread)
+    CRYPTOLAB_PROCESS_QUEUE      operations lourdes en attente au-dela des
+                                 processus occupes, avant refus
+    CRYPTOLAB_THREAD_CONCURRENCY operations en vol dans le pool de threads
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from registry import instrumentation
+from registry.errors import CryptoLabError, ServerBusy
+from registry.spec import Algorithm, Execution, Operation
+from utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+
+PROCESS_WORKERS = env_int("CRYPTOLAB_PROCESS_WORKERS", min(os.cpu_count() or 1, 4))
+PROCESS_QUEUE_DEPTH = env_int("CRYPTOLAB_PROCESS_QUEUE", 16)
+THREAD_CONCURRENCY = env_int("CRYPTOLAB_THREAD_CONCURRENCY", 32)
+
+
+class Gate:
+    """
+    Compteur d'operations en vol, borne, non bloquant.
+
+    Un semaphore ferait attendre la requete excedentaire ; ici on la refuse.
+    Attendre n'aurait de sens que si le serveur pouvait rattraper son retard,
+    ce qu'une salle de TP qui relance la meme requete ne lui laisse pas faire.
+    """
+
+    def __init__(self, name: str, capacity: int) -> None:
+        self.name = name
+        self.capacity = capacity
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def __enter__(self) -> Gate:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise ServerBusy(
+                    "Le serveur traite deja trop d'operations de ce type. "
+                    "Reessayez dans quelques secondes.",
+                    details={"execution": self.name, "capacity": self.capacity},
+                )
+            self._in_flight += 1
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+
+GATES: dict[Execution, Gate] = {
+    # INLINE n'a pas de jauge : ses operations rendent la main aussitot.
+    Execution.THREAD: Gate(Execution.THREAD.value, THREAD_CONCURRENCY),
+    # Les processus occupes, plus la file d'attente admise devant eux.
+    Execution.PROCESS: Gate(Execution.PROCESS.value, PROCESS_WORKERS + PROCESS_QUEUE_DEPTH),
+}
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _warm_worker() -> None:
+    """Initialisation d'un processus : importe le catalogue une fois pour toutes."""
+    import registry.catalog  # noqa: F401
+
+
+def _call_in_worker(slug: str, operation_name: str, payload: Any) -> dict:
+    """Point d'entree execute DANS le processus : retrouve le handler et l'appelle."""
+    from registry.catalog import registry
+
+    operation = registry.get(slug).operation(operation_name)
+    # Le cout est mesure ici, dans le processus qui calcule, et renvoye avec
+    # le resultat : `(data, secondes CPU, pic d'allocation)`.
+    return instrumentation.run_measured(operation.handler, payload)
+
+
+def _call_task(fn: Callable[..., Any], args: tuple) -> tuple[Any, float, int | None]:
+    """Point d'entree d'une tache de `fan_out`, execute DANS le processus."""
+    return instrumentation.run_measured(lambda call_args: fn(*call_args), args)
+
+
+def process_pool() -> ProcessPoolExecutor | None:
+    """Le pool de processus, cree au premier appel. None s'il est desactive."""
+    global _pool
+    if PROCESS_WORKERS == 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            logger.info("Pool de processus demarre (%d processus).", PROCESS_WORKERS)
+        return _pool
+
+
+def _discard_broken_pool(pool: ProcessPoolExecutor) -> None:
+    """Un processus mort (OOM sur Argon2 a 2 Gio...) casse le pool : on le recree au prochain appel."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown() -> None:
+    """Arrete le pool de processus. Appele a l'arret de l'application."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run(algorithm: Algorithm, operation: Operation, payload: Any) -> dict:
+    """
+    Execute une operation depuis un contexte synchrone (thread de FastAPI,
+    element d'un lot) et renvoie le resultat du handler.
+    """
+    if operation.execution is Execution.INLINE:
+        return instrumentation.call(operation.handler, payload)
+
+    with GATES[operation.execution]:
+        pool = process_pool() if operation.execution is Execution.PROCESS else None
+        if pool is None:
+            return instrumentation.call(operation.handler, payload)
+        future = pool.submit(_call_in_worker, algorithm.slug, operation.name, payload)
+        try:
+            data, cpu, peak = future.result()
+        except BrokenProcessPool as exc:
+            _discard_broken_pool(pool)
+            raise CryptoLabError(
+                f"Le processus de calcul de '{algorithm.slug}' s'est arrete brutalement."
+            ) from exc
+    instrumentation.charge(cpu, peak)
+    return data
+
+
+async def run_async(algorithm: Algorithm, operation: Operation, payload: Any) -> dict:
+    """
+    Execute une operation `PROCESS` depuis la boucle d'evenements, sans la
+    bloquer : la coroutine attend le processus, la boucle sert les autres.
+    """
+    pool = process_pool()
+    if pool is None:
+        # Pool desactive : on retombe sur le pool de threads, comme une
+        # operation ordinaire.
+        return await asyncio.to_thread(run, algorithm, operation, payload)
+
+    with GATES[Execution.PROCESS]:
+        loop = asyncio.get_running_loop()
+        try:
+            data, cpu, peak = await loop.run_in_executor(
+                pool, _call_in_worker, algorithm.slug, operation.name, payload
+            )
+        except BrokenProcessPool as exc:
+            _discard_broken_pool(pool)
+            raise CryptoLabError(
+                f"Le processus de calcul de '{algorithm.slug}' s'est arrete brutalement."
+            ) from exc
+    instrumentation.charge(cpu, peak)
+    return data
+
+
+def fan_out(fn: Callable[..., Any], calls: Sequence[tuple]) -> Iterator[tuple[int, Any]]:
+    """
+    Repartit `fn(*args)`, pour chaque tuple de `calls`, sur le pool de
+    processus. Rend les couples `(indice, resultat)` au fil des fins, pas dans
+    l'ordre : l'appelant diffuse sa progression sans attendre la plus lente.
+
+    `fn` doit etre une fonction de module (pickle la transporte par son nom).
+    L'ensemble compte pour une seule operation dans la jauge `PROCESS`, et
+    n'a jamais plus de deux taches par processus en vol : une operation
+    ordinaire soumise entre-temps passe entre deux taches, au lieu d'attendre
+    la fin de l'attaque. Si l'appelant abandonne le generateur (client
+    deconnecte), les taches pas encore parties sont annulees.
+
+    Pool desactive : les appels se font ici, dans l'ordre.
+    """
+    with GATES[Execution.PROCESS]:
+        pool = process_pool()
+        if pool is None:
+            # Ici, dans le thread de l'appelant : sa mesure couvre deja ce
+            # calcul, un `instrumentation.call` de plus le compterait deux fois.
+            for index, args in enumerate(calls):
+                yield index, fn(*args)
+            return
+
+        pending = iter(enumerate(calls))
+        in_flight: dict[Future, int] = {}
+
+        def submit(count: int) -> None:
+            for index, args in itertools.islice(pending, count):
+                in_flight[pool.submit(_call_task, fn, args)] = index
+
+        submit(2 * PROCESS_WORKERS)
+        try:
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                submit(len(done))
+                for future in done:
+                    index = in_flight.pop(future)
+                    data, cpu, peak = future.result()
+                    instrumentation.charge(cpu, peak)
+                    yield index, data
+        except BrokenProcessPool as exc:
+            _discard_broken_pool(pool)
+            raise CryptoLabError("Un processus de calcul s'est arrete brutalement.") from exc
+        finally:
+            for future in in_flight:
+                future.cancel()
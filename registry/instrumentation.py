@@ -0,0 +1,196 @@
+"""
+Mesure des operations du registre : temps reel, temps CPU, pic d'allocation.
+
+Les statistiques d'usage disent quels algorithmes sont appeles, pas lesquels
+coutent : scrypt, la generation de clefs RSA ou le simulateur AES ? Chaque
+operation reussie est donc mesuree a son point de passage unique (les routes
+generees et les elements de lot, voir registry/routes.py) :
+
+* **temps reel** : de l'entree dans le dispatcher a la fin du handler, attente
+  du pool de processus comprise — ce que le client attend ;
+* **temps CPU** : celui du handler seul, mesure dans le thread ou le processus
+  qui l'execute (`time.thread_time`). `time.process_time` compterait aussi les
+  autres requetes servies en meme temps par le processus ; pour une operation
+  PROCESS, c'est le processus de calcul qui mesure et renvoie son temps ;
+* **pic d'allocation** (optionnel) : via `tracemalloc`, qui ralentit nettement
+  les allocations. Le pic est celui du processus : deux operations simultanees
+  se melangent. A reserver a une seance de diagnostic.
+
+Chaque (algorithme, operation) garde une fenetre glissante de ses dernieres
+mesures, resumee en percentiles p50/p95/p99, plus le total cumule de temps
+CPU : c'est lui qui dit ou partent les minutes de CPU. Lecture :
+`GET /api/metrics/operations`.
+
+Configuration (environnement) :
+
+    CRYPTOLAB_OPERATION_WINDOW   mesures gardees par operation (512)
+    CRYPTOLAB_TRACE_ALLOC        "true" : pic d'allocation via tracemalloc
+    CRYPTOLAB_SERVER_TIMING      "true" : en-tete `Server-Timing` sur les
+                                 reponses des operations
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+import tracemalloc
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from utils.env import env_flag, env_int
+
+WINDOW = env_int("CRYPTOLAB_OPERATION_WINDOW", 512, minimum=1)
+TRACE_ALLOC = env_flag("CRYPTOLAB_TRACE_ALLOC")
+SERVER_TIMING = env_flag("CRYPTOLAB_SERVER_TIMING")
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Sample:
+    """Une mesure : secondes reelles, secondes CPU, octets au pic (ou None)."""
+
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak: int | None = None
+
+    def charge(self, cpu: float, peak: int | None) -> None:
+        """Impute a cette mesure le CPU (et le pic) d'un handler."""
+        self.cpu += cpu
+        if peak is not None:
+            self.peak = max(self.peak or 0, peak)
+
+    def server_timing(self) -> str:
+        """Valeur de l'en-tete `Server-Timing` (durees en millisecondes)."""
+        parts = [f"op;dur={self.wall * 1000:.2f}", f"cpu;dur={self.cpu * 1000:.2f}"]
+        if self.peak is not None:
+            parts.append(f'alloc;desc="{self.peak} B"')
+        return ", ".join(parts)
+
+
+_current: ContextVar[Sample | None] = ContextVar("cryptolab_sample", default=None)
+
+
+# --- Cote handler ---
+
+def run_measured(handler: Callable[[Any], Any], payload: Any) -> tuple[Any, float, int | None]:
+    """
+    Appelle `handler(payload)` et renvoie `(resultat, secondes CPU, pic)`.
+    Sert aussi dans le processus de calcul, qui renvoie ce triplet au serveur.
+    """
+    tracing = TRACE_ALLOC
+    if tracing:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.thread_time()
+    data = handler(payload)
+    cpu = time.thread_time() - start
+    peak = max(0, tracemalloc.get_traced_memory()[1] - baseline) if tracing else None
+    return data, cpu, peak
+
+
+def call(handler: Callable[[Any], Any], payload: Any) -> Any:
+    """`handler(payload)`, dont le cout est impute a la mesure en cours s'il y en a une."""
+    sample = _current.get()
+    if sample is None:
+        return handler(payload)
+    data, cpu, peak = run_measured(handler, payload)
+    sample.charge(cpu, peak)
+    return data
+
+
+def charge(cpu: float, peak: int | None) -> None:
+    """Impute a la mesure en cours un cout mesure ailleurs (processus de calcul)."""
+    sample = _current.get()
+    if sample is not None:
+        sample.charge(cpu, peak)
+
+
+# --- Fenetres glissantes ---
+
+def _percentile(ordered: list[float], p: int) -> float:
+    """Percentile au rang le plus proche d'une liste triee non vide."""
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _summary(values: list[float], scale: float, digits: int) -> dict[str, float]:
+    ordered = sorted(values)
+    return {f"p{p}": round(_percentile(ordered, p) * scale, digits) for p in PERCENTILES}
+
+
+class OperationStats:
+    """Les dernieres mesures de chaque (algorithme, operation), et leurs cumuls."""
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[tuple[str, str], deque[Sample]] = {}
+        self._counts: dict[tuple[str, str], int] = {}
+        self._cpu_totals: dict[tuple[str, str], float] = {}
+
+    def record(self, algorithm: str, operation: str, sample: Sample) -> None:
+        key = (algorithm, operation)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(sample)
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._cpu_totals[key] = self._cpu_totals.get(key, 0.0) + sample.cpu
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._cpu_totals.clear()
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Une ligne par operation, la plus gourmande en CPU cumule d'abord."""
+        with self._lock:
+            rows = [
+                (key, list(samples), self._counts[key], self._cpu_totals[key])
+                for key, samples in self._samples.items()
+            ]
+        out = []
+        for (algorithm, operation), samples, count, cpu_total in rows:
+            peaks = [s.peak for s in samples if s.peak is not None]
+            out.append({
+                "algorithm": algorithm,
+                "operation": operation,
+                "count": count,
+                "window": len(samples),
+                "cpu_seconds_total": round(cpu_total, 6),
+                "wall_ms": _summary([s.wall for s in samples], 1000, 3),
+                "cpu_ms": _summary([s.cpu for s in samples], 1000, 3),
+                "peak_bytes": _summary(peaks, 1, 0) if peaks else None,
+            })
+        out.sort(key=lambda row: (-row["cpu_seconds_total"], row["algorithm"], row["operation"]))
+        return out
+
+
+OPERATIONS = OperationStats()
+
+
+@contextmanager
+def measure(algorithm: str, operation: str) -> Iterator[Sample]:
+    """
+    Mesure une operation du dispatcher et l'enregistre si elle reussit. Les
+    handlers appeles dans le bloc via `call` (ou `charge`) y imputent leur CPU.
+    """
+    sample = Sample()
+    token = _current.set(sample)
+    start = time.perf_counter()
+    try:
+        yield sample
+    finally:
+        sample.wall = time.perf_counter() - start
+        _current.reset(token)
+    OPERATIONS.record(algorithm, operation, sample)
@@ -0,0 +1,108 @@
+"""
+Reponses diffusees en NDJSON : une ligne JSON par evenement, au fil du calcul.
+
+    {"event": "<type>", "data": {...}}     un evenement intermediaire
+    {"event": "result", "data": {...}}     le resultat complet, en dernier
+    {"event": "error",  "error": {...}}    echec en cours de route, en dernier
+
+Partage par les simulations pas a pas (routers/simulate.py) et les attaques
+diffusees (routers/attacks.py). Le premier evenement est calcule avant
+l'envoi de l'en-tete : une entree refusee des le depart, ou une jauge pleine,
+recoit encore une vraie erreur HTTP dans l'enveloppe habituelle. Apres, seul
+l'evenement `error` peut encore signaler l'echec.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import itertools
+import logging
+from collections.abc import Callable, Generator, Iterator
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+from registry.envelope import dumps, error_body
+from registry.errors import CryptoLabError
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "application/x-ndjson"
+
+
+def event(kind: str, data: Any) -> bytes:
+    """Une ligne `{"event": kind, "data": data}`."""
+    return b'{"event":"' + kind.encode() + b'","data":' + dumps(data) + b"}\n"
+
+
+def lines(
+    events: Generator[Any, None, Any],
+    kind: str,
+    result: Callable[[Any], dict],
+    failure: str,
+) -> Generator[bytes, None, None]:
+    """
+    Les lignes de `events` : un evenement `kind` par element produit, puis
+    `result(valeur de retour)`. `failure` est le message rendu au client si
+    le calcul echoue sans erreur metier.
+    """
+    started = False
+    while True:
+        try:
+            item = next(events)
+        except StopIteration as stop:
+            value = stop.value
+            break
+        except Exception as exc:
+            if not started:
+                # Rien n'est encore parti : `stream` repond par une erreur HTTP.
+                raise
+            # L'en-tete 200 est deja envoye : l'erreur devient le dernier evenement.
+            if isinstance(exc, CryptoLabError):
+                error = error_body(exc.code, exc.message, exc.details)
+            else:
+                logger.exception("%s", failure)
+                error = error_body("internal_error", failure)
+            yield b'{"event":"error","error":' + dumps(error) + b"}\n"
+            return
+        started = True
+        yield event(kind, item)
+
+    yield event("result", result(value))
+
+
+def stream(body: Generator[bytes, None, None], failure: str) -> StreamingResponse:
+    """Reponse NDJSON de `body` (voir `lines`), premiere ligne calculee ici."""
+    pinned = _pinned(body, contextvars.copy_context())
+    try:
+        first = next(pinned)
+    except CryptoLabError:
+        raise
+    except Exception as exc:
+        logger.exception("%s", failure)
+        raise CryptoLabError(failure) from exc
+    return StreamingResponse(itertools.chain([first], pinned), media_type=NDJSON)
+
+
+def _pinned(
+    body: Generator[bytes, None, None], context: contextvars.Context
+) -> Iterator[bytes]:
+    """
+    `body`, toujours avance dans le meme `context`.
+
+    Starlette fait avancer un generateur synchrone dans le pool de threads,
+    chaque ligne dans une copie differente du contexte. Un `with` ouvert dans
+    `body` (mesure, jauge) doit pourtant se refermer dans le contexte ou il
+    s'est ouvert : `ContextVar.reset` l'exige.
+    """
+    try:
+        while True:
+            try:
+                line = context.run(next, body)
+            except StopIteration:
+                return
+            yield line
+    finally:
+        # Client deconnecte : `body` est ferme ici, dans son contexte, et
+        # relache ce qu'il tenait.
+        context.run(body.close)
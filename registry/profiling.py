@@ -0,0 +1,244 @@
+"""
+Profilage a la demande des operations et des simulations.
+
+Une simulation lente en production ne se reproduit pas toujours en local :
+memes entrees, autre machine, autre charge. Une requete peut donc etre
+profilee sur place par `cProfile`, de deux facons :
+
+* a la demande : `?profile=1`, avec l'en-tete `X-CryptoLab-Admin` egal a
+  `CRYPTOLAB_ADMIN_TOKEN`. Sans jeton configure, le parametre est ignore ;
+* par echantillonnage : chaque requete est tiree au hasard, avec la
+  probabilite `CRYPTOLAB_PROFILE_SAMPLE_RATE`. Il faut aussi le jeton, sans
+  lequel personne ne pourrait lire ces profils ; sans lui, le taux est ignore
+  (avertissement au demarrage).
+
+Le profil (les fonctions les plus couteuses en temps propre) est range dans
+un anneau borne en memoire, et son numero renvoye dans l'en-tete
+`X-CryptoLab-Profile`. Lecture, avec le meme jeton : `GET /api/metrics/profiles`.
+
+Sont profiles : le calcul des routes generees (`registry/routes.py::_run`) et
+celui de `POST /api/simulate/{algo}` hors diffusion NDJSON. Les operations
+PROCESS tournent dans un autre processus : leur profil ne montrerait que
+l'attente, elles ne sont pas profilees. Un seul profil a la fois : une requete
+tiree pendant qu'une autre est profilee passe sans profil.
+
+Desactive par defaut. Tant qu'aucun jeton n'est configure, le
+middleware rend la main des la premiere ligne et `profiled` renvoie un
+contexte vide, sans rien allouer.
+
+Configuration (environnement) :
+
+    CRYPTOLAB_ADMIN_TOKEN           jeton des requetes `?profile=1` et de la
+                                    lecture des profils (vide = desactive)
+    CRYPTOLAB_PROFILE_SAMPLE_RATE   fraction des requetes profilees (0 ;
+                                    exige CRYPTOLAB_ADMIN_TOKEN)
+    CRYPTOLAB_PROFILE_TOP           fonctions gardees par profil (25)
+    CRYPTOLAB_PROFILE_RING          profils gardes en memoire (16)
+"""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import itertools
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TOKEN = os.getenv("CRYPTOLAB_ADMIN_TOKEN", "").strip()
+SAMPLE_RATE = env_float("CRYPTOLAB_PROFILE_SAMPLE_RATE", 0.0, maximum=1.0)
+TOP_N = env_int("CRYPTOLAB_PROFILE_TOP", 25, minimum=1)
+RING_SIZE = env_int("CRYPTOLAB_PROFILE_RING", 16, minimum=1)
+
+if SAMPLE_RATE > 0 and not ADMIN_TOKEN:
+    # Des profils que personne ne peut lire ne serviraient a rien.
+    logger.warning(
+        "CRYPTOLAB_PROFILE_SAMPLE_RATE ignore : CRYPTOLAB_ADMIN_TOKEN est requis "
+        "pour lire les profils echantillonnes."
+    )
+
+ADMIN_HEADER = "x-cryptolab-admin"
+PROFILE_HEADER = "x-cryptolab-profile"
+
+
+def enabled() -> bool:
+    # Sans jeton, aucun profil ne serait lisible : rien n'est profile.
+    return bool(ADMIN_TOKEN)
+
+
+def is_admin(token: str | None) -> bool:
+    """Le jeton presente est-il celui de l'administrateur ? (temps constant)"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+# --- Anneau des profils ---
+
+def _function_name(key: tuple[str, int, str]) -> str:
+    filename, line, name = key
+    if filename == "~":
+        # Fonction C : pstats la note `~`, son nom suffit (`<built-in ...>`).
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def summarize(profiler: cProfile.Profile, top: int = TOP_N) -> tuple[int, list[dict[str, Any]]]:
+    """(appels au total, les `top` fonctions les plus couteuses en temps propre)."""
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    functions = [
+        {
+            "function": _function_name(key),
+            "calls": calls,
+            "self_ms": round(self_time * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for key, (_, calls, self_time, cumulative, _) in rows[:top]
+    ]
+    return stats.total_calls, functions
+
+
+class ProfileRing:
+    """Les derniers profils, numerotes ; le plus ancien part quand l'anneau est plein."""
+
+    def __init__(self, size: int = RING_SIZE) -> None:
+        self._profiles: deque[dict[str, Any]] = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, label: str, seconds: float, profiler: cProfile.Profile) -> int:
+        total_calls, functions = summarize(profiler)
+        with self._lock:
+            profile_id = next(self._ids)
+            self._profiles.append({
+                "id": profile_id,
+                "label": label,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "wall_ms": round(seconds * 1000, 3),
+                "total_calls": total_calls,
+                "functions": functions,
+            })
+        return profile_id
+
+    def get(self, profile_id: int) -> dict[str, Any] | None:
+        with self._lock:
+            return next((p for p in self._profiles if p["id"] == profile_id), None)
+
+    def listing(self) -> list[dict[str, Any]]:
+        """Les profils gardes, du plus recent au plus ancien, sans leurs fonctions."""
+        with self._lock:
+            return [
+                {key: value for key, value in profile.items() if key != "functions"}
+                for profile in reversed(self._profiles)
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+PROFILES = ProfileRing()
+
+
+# --- Cote requete ---
+
+class _Slot:
+    """Marque une requete a profiler ; recoit le numero de son profil."""
+
+    __slots__ = ("profile_id",)
+
+    def __init__(self) -> None:
+        self.profile_id: int | None = None
+
+
+_requested: ContextVar[_Slot | None] = ContextVar("cryptolab_profile", default=None)
+_busy = threading.Lock()
+_NOTHING = nullcontext()
+
+
+def profiled(label: str) -> AbstractContextManager[None]:
+    """Profile le bloc si la requete en cours l'a demande ; sinon, contexte vide."""
+    slot = _requested.get()
+    if slot is None or slot.profile_id is not None:
+        return _NOTHING
+    return _profile(label, slot)
+
+
+@contextmanager
+def _profile(label: str, slot: _Slot) -> Iterator[None]:
+    if not _busy.acquire(blocking=False):
+        # Un autre profil est en cours : deux profileurs se melangeraient.
+        yield
+        return
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+    finally:
+        _busy.release()
+        slot.profile_id = PROFILES.add(label, time.perf_counter() - start, profiler)
+
+
+def _wants_profile(scope: Scope) -> bool:
+    if not ADMIN_TOKEN:
+        return False
+    if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if query.get("profile") != ["1"]:
+        return False
+    for name, value in scope["headers"]:
+        if name == ADMIN_HEADER.encode("latin-1"):
+            return is_admin(value.decode("latin-1"))
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    Decide, requete par requete, s'il faut profiler, et renvoie le numero du
+    profil dans l'en-tete `X-CryptoLab-Profile`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not enabled() or scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        slot = _Slot()
+        token = _requested.set(slot)
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start" and slot.profile_id is not None:
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_HEADER.encode("latin-1"), str(slot.profile_id).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _requested.reset(token)
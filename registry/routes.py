@@ -12,22 +12,30 @@ from __future__ import annotations
 
 import inspect
 import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from typing import Any
 
-from fastapi import APIRouter
+import pydantic
+from fastapi import APIRouter, Request, Response
 
 from db import crud
-from registry.envelope import success
-from registry.errors import CryptoLabError
-from registry.spec import Algorithm, Family, Operation, Registry
+from db.models import BatchInput, BatchItem
+from registry import execution, instrumentation, profiling
+from registry.envelope import error_body, jsonable, success, validation_message
+from registry.errors import CryptoLabError, UnknownAlgorithm, UnsupportedOperation
+from registry.snapshot import CatalogSnapshot, Materialized
+from registry.spec import Algorithm, Execution, Family, Operation, Registry
 
 logger = logging.getLogger(__name__)
 
 
-def _run(algorithm: Algorithm, operation: Operation, payload: Any) -> Any:
-    """Execute une operation et l'emballe dans l'enveloppe."""
+@contextmanager
+def _guarded(algorithm: Algorithm, operation: Operation) -> Iterator[None]:
+    """Traduit toute panne inattendue d'un handler en `CryptoLabError`."""
     try:
-        data = operation.handler(payload)
+        yield
     except CryptoLabError:
         # Erreur metier : le gestionnaire global la traduit en enveloppe.
         raise
@@ -42,12 +50,62 @@ def _run(algorithm: Algorithm, operation: Operation, payload: Any) -> Any:
             f"'{algorithm.slug}'."
         ) from exc
 
+
+def _complete(algorithm: Algorithm, operation: Operation, payload: Any, data: dict) -> dict:
+    """Enregistre l'usage anonyme et construit le contenu de `data`."""
     length = 0
     if payload is not None:
         length = len(str(getattr(payload, operation.length_field, "") or ""))
     crud.record_usage(algorithm.slug, operation.name, length)
 
-    return success({"algorithm": algorithm.slug, "action": operation.name, **data})
+    return {"algorithm": algorithm.slug, "action": operation.name, **data}
+
+
+def _execute(algorithm: Algorithm, operation: Operation, payload: Any) -> dict:
+    """Execute une operation et renvoie le contenu de `data`, hors enveloppe."""
+    with _guarded(algorithm, operation):
+        data = execution.run(algorithm, operation, payload)
+    return _complete(algorithm, operation, payload, data)
+
+
+async def _execute_async(algorithm: Algorithm, operation: Operation, payload: Any) -> dict:
+    """Variante de `_execute` pour les routes servies sur la boucle d'evenements."""
+    with _guarded(algorithm, operation):
+        if operation.execution is Execution.PROCESS:
+            data = await execution.run_async(algorithm, operation, payload)
+        else:
+            data = instrumentation.call(operation.handler, payload)
+    return _complete(algorithm, operation, payload, data)
+
+
+def _timed(response: Response, sample: instrumentation.Sample) -> Response:
+    """Ajoute l'en-tete `Server-Timing` si `CRYPTOLAB_SERVER_TIMING` l'active."""
+    if instrumentation.SERVER_TIMING:
+        response.headers["Server-Timing"] = sample.server_timing()
+    return response
+
+
+def _run(algorithm: Algorithm, operation: Operation, payload: Any) -> Any:
+    """Execute une operation, la mesure et l'emballe dans l'enveloppe."""
+    with (
+        profiling.profiled(f"{algorithm.slug}/{operation.name}"),
+        instrumentation.measure(algorithm.slug, operation.name) as sample,
+    ):
+        data = _execute(algorithm, operation, payload)
+    return _timed(success(data), sample)
+
+
+async def _run_async(algorithm: Algorithm, operation: Operation, payload: Any) -> Any:
+    # Une operation PROCESS calcule ailleurs : profiler la boucle pendant
+    # qu'elle attend ne montrerait que les autres requetes.
+    profile = (
+        profiling.profiled(f"{algorithm.slug}/{operation.name}")
+        if operation.execution is not Execution.PROCESS
+        else nullcontext()
+    )
+    with profile, instrumentation.measure(algorithm.slug, operation.name) as sample:
+        data = await _execute_async(algorithm, operation, payload)
+    return _timed(success(data), sample)
 
 
 def _add_route(router: APIRouter, algorithm: Algorithm, operation: Operation) -> None:
@@ -55,15 +113,30 @@ def _add_route(router: APIRouter, algorithm: Algorithm, operation: Operation) ->
     path = operation.resolved_path(algorithm.slug)
     doc = operation.description or operation.summary
 
+    # FastAPI sert un endpoint `def` dans son pool de threads et un endpoint
+    # `async def` sur la boucle d'evenements. Les operations THREAD gardent le
+    # premier ; INLINE et PROCESS prennent le second, l'une parce qu'un
+    # changement de thread couterait plus que le calcul, l'autre parce que la
+    # coroutine ne fait qu'attendre le pool de processus.
+    on_loop = operation.execution is not Execution.THREAD
+
     if operation.input_model is None:
         # Operation sans corps de requete (RSA generate-keys).
-        def endpoint() -> Any:  # noqa: ANN202 - signature imposee par FastAPI
-            return _run(algorithm, operation, None)
+        if on_loop:
+            async def endpoint() -> Any:  # noqa: ANN202 - signature imposee par FastAPI
+                return await _run_async(algorithm, operation, None)
+        else:
+            def endpoint() -> Any:  # noqa: ANN202 - signature imposee par FastAPI
+                return _run(algorithm, operation, None)
     else:
         model = operation.input_model
 
-        def endpoint(payload) -> Any:  # noqa: ANN001, ANN202
-            return _run(algorithm, operation, payload)
+        if on_loop:
+            async def endpoint(payload) -> Any:  # noqa: ANN001, ANN202
+                return await _run_async(algorithm, operation, payload)
+        else:
+            def endpoint(payload) -> Any:  # noqa: ANN001, ANN202
+                return _run(algorithm, operation, payload)
 
         # FastAPI deduit l'emplacement d'un parametre de son annotation : un
         # modele Pydantic annote devient le corps JSON de la requete, valide et
@@ -109,6 +182,24 @@ def build_routers(registry: Registry) -> list[APIRouter]:
     return routers
 
 
+def _etag_matches(header: str | None, etag: str) -> bool:
+    """`If-None-Match` designe-t-il cette representation ? (comparaison faible, RFC 9110)"""
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def _serve(request: Request, materialized: Materialized) -> Response:
+    """Sert une reponse materialisee, ou 304 si le client l'a deja."""
+    headers = {"ETag": materialized.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), materialized.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=materialized.body, media_type="application/json", headers=headers)
+
+
 def build_catalog_router(registry: Registry) -> APIRouter:
     """
     `/api/algorithms` : le catalogue, servi par l'API.
@@ -116,61 +207,102 @@ def build_catalog_router(registry: Registry) -> APIRouter:
     Le frontend decouvre ainsi ce que le backend sait faire, au lieu de le coder
     en dur. Un algorithme ajoute au registre apparait sur le site sans qu'une
     seule ligne de TypeScript ne change.
+
+    Les reponses sont calculees une fois, a la construction du routeur (voir
+    registry/snapshot.py), et revalidees par ETag.
     """
     router = APIRouter(prefix="/api/algorithms", tags=["Catalogue"])
+    snapshot = CatalogSnapshot(registry)
 
     @router.get("", summary="Lister tous les algorithmes exposes")
-    def list_algorithms(family: str | None = None, q: str | None = None) -> Any:
-        algorithms = registry.all()
+    def list_algorithms(request: Request, family: str | None = None, q: str | None = None) -> Any:
+        if q:
+            return _serve(request, snapshot.search(family or None, q))
+        return _serve(request, snapshot.listing(family or None))
 
-        if family:
-            algorithms = [a for a in algorithms if a.family.value == family]
+    @router.get("/{slug}", summary="Fiche detaillee d'un algorithme")
+    def get_algorithm(request: Request, slug: str) -> Any:
+        materialized = snapshot.detail(slug)
+        if materialized is None:
+            raise UnknownAlgorithm(
+                f"Aucun algorithme nomme '{slug}'.",
+                details={"available": snapshot.slugs()},
+            )
+        return _serve(request, materialized)
 
-        if q:
-            needle = q.casefold()
-            algorithms = [
-                a
-                for a in algorithms
-                if needle in a.slug
-                or needle in a.name.casefold()
-                or needle in a.summary.casefold()
-                or any(needle in alias for alias in a.aliases)
-            ]
+    return router
 
-        return success(
-            {
-                "count": len(algorithms),
-                "total_vectors": sum(len(a.vectors) for a in algorithms),
-                "families": [
-                    {"value": f.value, "label": f.label, "prefix": f.prefix} for f in Family
-                ],
-                "algorithms": [a.describe() for a in algorithms],
-            }
-        )
 
-    @router.get("/{slug}", summary="Fiche detaillee d'un algorithme")
-    def get_algorithm(slug: str) -> Any:
-        from registry.errors import UnknownAlgorithm
+def _run_batch_item(registry: Registry, item: BatchItem) -> dict[str, Any]:
+    """
+    Execute une operation du lot et renvoie sa propre enveloppe `{ok, data, error}`.
 
-        algorithm = registry.get(slug)
+    Un element en echec ne fait jamais echouer le lot : son erreur est rangee a
+    sa place, avec le meme code que la route unitaire aurait renvoye.
+    """
+    try:
+        algorithm = registry.get(item.algorithm)
         if algorithm is None:
-            raise UnknownAlgorithm(
-                f"Aucun algorithme nomme '{slug}'.",
-                details={"available": [a.slug for a in registry.all()]},
+            raise UnknownAlgorithm(f"Aucun algorithme nomme '{item.algorithm}'.")
+
+        operation = algorithm.operation(item.operation)
+        if operation is None:
+            raise UnsupportedOperation(
+                f"'{algorithm.slug}' ne declare pas d'operation '{item.operation}'.",
+                details={"available": [op.name for op in algorithm.operations]},
             )
 
-        fiche = algorithm.describe()
-        # La fiche detaillee expose les vecteurs eux-memes : c'est la preuve
-        # publique annoncee par le compteur de la liste.
-        fiche["vectors"] = [
+        payload = None
+        if operation.input_model is not None:
+            try:
+                payload = operation.input_model.model_validate(item.input or {})
+            except pydantic.ValidationError as exc:
+                errors = exc.errors()
+                return {
+                    "ok": False,
+                    "data": None,
+                    "error": error_body(
+                        "validation_error", validation_message(errors), {"errors": jsonable(errors)}
+                    ),
+                }
+
+        with instrumentation.measure(algorithm.slug, operation.name):
+            data = _execute(algorithm, operation, payload)
+    except CryptoLabError as exc:
+        return {"ok": False, "data": None, "error": error_body(exc.code, exc.message, exc.details)}
+
+    return {"ok": True, "data": data, "error": None}
+
+
+def build_batch_router(registry: Registry) -> APIRouter:
+    """
+    `/api/batch` : plusieurs operations du registre en une seule requete.
+
+    Chaque element est resolu dans le registre, valide par le modele d'entree de
+    son operation et execute par le meme chemin que sa route unitaire
+    (statistiques comprises). Le lot repond 200 des qu'il a ete execute ;
+    chaque resultat porte son propre `ok`.
+    """
+    router = APIRouter(prefix="/api/batch", tags=["Lot"])
+
+    @router.post("", summary="Executer un lot d'operations du registre")
+    def run_batch(batch: BatchInput) -> Any:
+        if batch.concurrency is None or batch.concurrency == 1 or len(batch.items) == 1:
+            results = [_run_batch_item(registry, item) for item in batch.items]
+        else:
+            workers = min(batch.concurrency, len(batch.items))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+                # `map` conserve l'ordre : le resultat i repond a l'element i.
+                results = list(pool.map(lambda item: _run_batch_item(registry, item), batch.items))
+
+        succeeded = sum(1 for result in results if result["ok"])
+        return success(
             {
-                "operation": vector.operation,
-                "inputs": vector.inputs,
-                "expected": vector.expected,
-                "source": vector.source,
+                "count": len(results),
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "results": results,
             }
-            for vector in algorithm.vectors
-        ]
-        return success(fiche)
+        )
 
     return router
@@ -0,0 +1,153 @@
+"""
+Catalogue materialise : les reponses de `/api/algorithms`, calculees une fois.
+
+Le registre ne change plus apres l'import du catalogue. Reconstruire a chaque
+requete les fiches de tous les algorithmes — schemas JSON des modeles d'entree
+compris — recalculait donc a l'identique la page la plus consultee du site.
+Le cliche (snapshot) serialise ces reponses au demarrage, en octets, chacune
+avec son ETag : un navigateur qui a deja la page la revalide en 304, sans
+corps.
+
+La recherche `q` passe par un index de mots construit au meme moment : chaque
+algorithme y est represente par les mots de son slug, de son nom, de son resume
+et de ses alias, sans casse ni accents.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from registry.envelope import encode_success
+from registry.spec import Algorithm, Family, Registry
+
+_WORD = re.compile(r"\w+")
+
+#: Recherches distinctes gardees en memoire. Le vocabulaire d'une salle de TP
+#: est petit ; au-dela, les plus anciennes sont oubliees.
+SEARCH_CACHE_SIZE = 256
+
+
+def fold(text: str) -> str:
+    """Texte sans casse ni accents : « Cesar », « césar » et « CESAR » se valent."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokens(text: str) -> tuple[str, ...]:
+    return tuple(_WORD.findall(fold(text)))
+
+
+@dataclass(frozen=True)
+class Materialized:
+    """Une reponse prete a servir : corps JSON et son ETag fort."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, data: Any) -> Materialized:
+        body = encode_success(data)
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+class CatalogSnapshot:
+    """Les reponses du catalogue et l'index de recherche, figes au demarrage."""
+
+    def __init__(self, registry: Registry) -> None:
+        self._algorithms = registry.all()
+        self._fiches = {a.slug: a.describe() for a in self._algorithms}
+        self._families = [
+            {"value": f.value, "label": f.label, "prefix": f.prefix} for f in Family
+        ]
+
+        # Index inverse : chaque mot du catalogue -> les algorithmes qui le portent.
+        index: dict[str, set[str]] = {}
+        for a in self._algorithms:
+            for word in tokens(" ".join((a.slug, a.name, a.summary, *a.aliases))):
+                index.setdefault(word, set()).add(a.slug)
+        self._index = {word: frozenset(slugs) for word, slugs in index.items()}
+
+        self._lists: dict[str | None, Materialized] = {
+            None: self._materialize_list(self._algorithms)
+        }
+        for family in Family:
+            self._lists[family.value] = self._materialize_list(
+                [a for a in self._algorithms if a.family is family]
+            )
+
+        self._details = {a.slug: Materialized.of(self._detail(a)) for a in self._algorithms}
+        self._matching = lru_cache(maxsize=SEARCH_CACHE_SIZE * 4)(self._matching_uncached)
+        self._search = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._search_uncached)
+
+    # --- Listes ---
+
+    def _materialize_list(self, algorithms: list[Algorithm]) -> Materialized:
+        return Materialized.of(
+            {
+                "count": len(algorithms),
+                "total_vectors": sum(len(a.vectors) for a in algorithms),
+                "families": self._families,
+                "algorithms": [self._fiches[a.slug] for a in algorithms],
+            }
+        )
+
+    def listing(self, family: str | None = None) -> Materialized:
+        """La liste complete, ou celle d'une famille (vide si elle n'existe pas)."""
+        if family in self._lists:
+            return self._lists[family]
+        return self._materialize_list([])
+
+    def search(self, family: str | None, query: str) -> Materialized:
+        """
+        Chaque mot de la requete doit apparaitre dans au moins un mot de
+        l'algorithme : « feist » trouve DES, « rsa 2048 » trouve RSA-2048.
+        """
+        return self._search(family, tokens(query))
+
+    def _matching_uncached(self, needle: str) -> frozenset[str]:
+        """Les algorithmes dont un mot contient `needle`."""
+        slugs: set[str] = set()
+        for word, owners in self._index.items():
+            if needle in word:
+                slugs |= owners
+        return frozenset(slugs)
+
+    def _search_uncached(self, family: str | None, needles: tuple[str, ...]) -> Materialized:
+        if not needles:
+            return self._materialize_list([])
+        found = frozenset.intersection(*(self._matching(needle) for needle in needles))
+        return self._materialize_list(
+            [
+                a
+                for a in self._algorithms
+                if a.slug in found and (family is None or a.family.value == family)
+            ]
+        )
+
+    # --- Fiches ---
+
+    def _detail(self, algorithm: Algorithm) -> dict[str, Any]:
+        fiche = dict(self._fiches[algorithm.slug])
+        # La fiche detaillee expose les vecteurs eux-memes : c'est la preuve
+        # publique annoncee par le compteur de la liste.
+        fiche["vectors"] = [
+            {
+                "operation": vector.operation,
+                "inputs": vector.inputs,
+                "expected": vector.expected,
+                "source": vector.source,
+            }
+            for vector in algorithm.vectors
+        ]
+        return fiche
+
+    def detail(self, slug: str) -> Materialized | None:
+        return self._details.get(slug)
+
+    def slugs(self) -> list[str]:
+        return [a.slug for a in self._algorithms]
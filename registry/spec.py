@@ -70,6 +70,26 @@ class Maturity(str, Enum):
     EDUCATIONAL = "educational"
 
 
+class Execution(str, Enum):
+    """
+    Ou s'execute une operation.
+
+    Les routes generees sont servies par FastAPI ; sans indication, une
+    operation tourne dans son pool de threads. A cause du GIL, un bcrypt de cout
+    16 ou une attaque par oracle de bourrage en Python pur y occupe alors le
+    seul coeur disponible, et les Cesar d'une classe entiere attendent derriere.
+    """
+
+    #: Sur la boucle d'evenements, sans changement de thread : reserve aux
+    #: operations instantanees (chiffres classiques triviaux).
+    INLINE = "inline"
+    #: Dans le pool de threads de FastAPI. Le defaut.
+    THREAD = "thread"
+    #: Dans un pool de processus borne (voir registry/execution.py) : calcul
+    #: lourd, en Python pur ou dans une extension qui garde le GIL.
+    PROCESS = "process"
+
+
 @dataclass(frozen=True)
 class TestVector:
     """
@@ -107,6 +127,8 @@ class Operation:
     path: str | None = None
     #: Champ dont la longueur alimente les statistiques anonymes.
     length_field: str = "text"
+    #: Classe d'execution : boucle d'evenements, thread ou processus.
+    execution: Execution = Execution.THREAD
 
     def resolved_path(self, slug: str) -> str:
         return self.path if self.path is not None else f"/{slug}/{self.name}"
@@ -171,18 +193,26 @@ class Registry:
 
     def __init__(self) -> None:
         self._algorithms: dict[str, Algorithm] = {}
+        # Ordre de presentation, calcule une fois : le registre ne change plus
+        # apres l'import du catalogue.
+        self._ordered: tuple[Algorithm, ...] | None = None
 
     def register(self, algorithm: Algorithm) -> Algorithm:
         if algorithm.slug in self._algorithms:
             raise ValueError(f"Algorithme deja enregistre : {algorithm.slug}")
         self._algorithms[algorithm.slug] = algorithm
+        self._ordered = None
         return algorithm
 
     def get(self, slug: str) -> Algorithm | None:
         return self._algorithms.get(slug)
 
     def all(self) -> list[Algorithm]:
-        return sorted(self._algorithms.values(), key=lambda a: (a.family.value, a.slug))
+        if self._ordered is None:
+            self._ordered = tuple(
+                sorted(self._algorithms.values(), key=lambda a: (a.family.value, a.slug))
+            )
+        return list(self._ordered)
 
     def vectors(self) -> list[tuple[Algorithm, TestVector]]:
         """Tous les vecteurs du registre, a plat. Consomme par les tests."""
@@ -0,0 +1,74 @@
+"""
+Attaques diffusees au fil du calcul.
+
+    POST /api/modern/paddingoracle/attack/stream
+
+La route generee `/api/modern/paddingoracle/attack` rend le clair quand tous
+les blocs sont retrouves : sur 20 Ko de chiffre, plus d'un millier de blocs,
+l'etudiant attend devant un ecran vide. Ici, meme corps JSON, mais la reponse
+est du NDJSON, une ligne par evenement, dans le format des simulations
+(registry/ndjson.py) :
+
+    {"event": "block",  "data": {...}}     un bloc retrouve, des qu'il l'est
+    {"event": "result", "data": {...}}     le resultat complet, en dernier
+    {"event": "error",  "error": {...}}    echec en cours de route, en dernier
+
+Les blocs se recuperent en parallele dans le pool de processus
+(`execution.fan_out`) : ils arrivent dans l'ordre ou ils se terminent, pas
+dans l'ordre du texte ; `data.block` donne leur place. Un client qui se
+deconnecte annule les blocs pas encore partis.
+"""
+
+from collections.abc import Generator
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from db import crud
+from db.models import PaddingOracleAttackInput
+from registry import execution, instrumentation, ndjson
+from registry.spec import Execution
+
+router = APIRouter(prefix="/api/modern", tags=["Attaques"])
+
+FAILURE = "Erreur interne pendant l'attaque par oracle de bourrage."
+
+
+def _attack(data: PaddingOracleAttackInput) -> Generator[dict, None, dict]:
+    """
+    L'attaque, sous la jauge `THREAD` et mesuree, comme la route generee :
+    une attaque diffusee occupe le serveur autant que l'autre.
+    """
+    # Import differe : padding_oracle charge PyCryptodome (~200 ms).
+    from utils import padding_oracle
+
+    with (
+        execution.GATES[Execution.THREAD],
+        instrumentation.measure("paddingoracle", "attack"),
+    ):
+        return (yield from padding_oracle.iter_attack(
+            data.key_hex,
+            data.iv_hex,
+            data.cipher_hex,
+            strategy=data.strategy,
+            fan_out=execution.fan_out,
+        ))
+
+
+@router.post(
+    "/paddingoracle/attack/stream",
+    summary="Dechiffrer via l'oracle de bourrage, bloc par bloc, en NDJSON",
+    response_class=StreamingResponse,
+)
+def stream_padding_oracle_attack(data: PaddingOracleAttackInput) -> StreamingResponse:
+    """
+    L'attaque de `/api/modern/paddingoracle/attack`, diffusee : un evenement
+    par bloc retrouve, puis le resultat.
+    """
+    def result(summary: dict) -> dict:
+        crud.record_usage("paddingoracle", "attack", len(data.cipher_hex))
+        return {"algorithm": "paddingoracle", "action": "attack", **summary}
+
+    # Le premier bloc est calcule avant l'envoi de l'en-tete : une entree
+    # refusee ou une jauge pleine (503) recoit encore une vraie erreur HTTP.
+    return ndjson.stream(ndjson.lines(_attack(data), "block", result, FAILURE), FAILURE)
@@ -0,0 +1,420 @@
+"""
+Variantes binaires des routes symetriques hexadecimales.
+
+    POST /api/binary/aesmodes/encrypt-ecb          cle
+    POST /api/binary/aesmodes/encrypt-cbc          cle, IV
+    POST /api/binary/aesmodes/encrypt-ctr          cle, compteur initial
+    POST /api/binary/rc4/encrypt                   cle (chiffre et dechiffre)
+    POST /api/binary/chacha20poly1305/encrypt      cle, nonce, AAD facultative
+    POST /api/binary/aesmodes/stream/{mode}        cle, IV (cbc, ctr) ; en flux
+    POST /api/binary/aesmodes/penguin              cle, IV facultatif ; une image
+
+Les routes JSON de ces outils prennent et rendent de l'hexadecimal : 20 Ko de
+donnees voyagent en 40 Ko de texte, passent par `bytes.fromhex`, sont copies
+plusieurs fois puis remis en hexadecimal au retour. Ici, le corps de la requete
+est le clair (`application/octet-stream`) et le corps de la reponse est le
+chiffre, octet pour octet ; le corps est lu au travers d'une `memoryview` et
+les chiffres y lisent directement.
+
+Les parametres sont en hexadecimal, dans un en-tete ou dans la chaine de
+requete (l'en-tete l'emporte) :
+
+    X-CryptoLab-Key     key_hex
+    X-CryptoLab-IV      iv_hex
+    X-CryptoLab-Nonce   nonce_hex
+    X-CryptoLab-AAD     aad_hex
+
+Preferer les en-tetes pour la cle : une chaine de requete finit dans les
+journaux d'acces. Pour ChaCha20-Poly1305, la reponse est chiffre || tag (les
+16 derniers octets), le format de l'AEAD de la RFC 8439.
+
+Une erreur reste une enveloppe JSON `{ok, data, error}`, avec le meme code que
+la route hexadecimale : seul un succes est binaire.
+
+Les routes `stream/{mode}` lisent le corps morceau par morceau et renvoient
+chaque morceau chiffre aussitot (voir `modes_tool.StreamEncryptor`) : une image
+de plusieurs mega-octets se chiffre en memoire constante, pour voir le
+pingouin ECB sur un vrai fichier. ECB et CBC ajoutent un bourrage PKCS#7. Une
+seule borne s'y applique, configurable :
+
+    CRYPTOLAB_STREAM_MAX_BYTES   taille maximale d'un flux (16 Mio)
+    CRYPTOLAB_IMAGE_MAX_BYTES    taille maximale d'une image chiffree dans les
+                                 trois modes a la fois (4 Mio)
+
+Un Content-Length au-dela est refuse d'emblee, en JSON. Un envoi par morceaux
+qui la depasse en cours de route est coupe : la reponse a deja commence, et
+une reponse tronquee ne doit pas passer pour complete.
+
+La route `penguin` chiffre les pixels d'une image BMP, PPM ou PGM et garde son
+en-tete (voir utils/image_tool.py). Sans `mode`, elle repond en
+`multipart/mixed` : un resume JSON, puis l'image chiffree en ECB, CBC et CTR ;
+les trois sont tenues en memoire, d'ou la borne plus basse. Avec
+`?mode=ecb|cbc|ctr`, une seule image revient, en flux, en memoire constante.
+"""
+
+import logging
+import secrets
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import Any, Literal
+
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+
+from db import crud
+from db.models import MAX_HEX, MAX_KEY
+from registry import instrumentation, profiling
+from registry.envelope import dumps
+from registry.errors import CryptoLabError, InvalidInput
+from utils import rc4_tool
+from utils.env import env_int
+
+# Imports differes dans les routes : modes_tool, chacha20_tool et image_tool
+# chargent PyCryptodome ou cryptography (plusieurs centaines de ms), que
+# `import main` n'a pas a payer avant la premiere requete qui chiffre.
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/binary", tags=["Binaire"])
+
+OCTET_STREAM = "application/octet-stream"
+
+#: Meme borne que les routes JSON : MAX_HEX caracteres hexadecimaux.
+MAX_BYTES = MAX_HEX // 2
+
+#: Borne des routes en flux, qui ne gardent jamais le fichier en memoire.
+STREAM_MAX_BYTES = env_int("CRYPTOLAB_STREAM_MAX_BYTES", 16 * 1024 * 1024, minimum=1)
+
+#: Borne de la route `penguin` sans `mode` : l'image et ses trois chiffres
+#: tiennent en memoire ensemble.
+IMAGE_MAX_BYTES = env_int("CRYPTOLAB_IMAGE_MAX_BYTES", 4 * 1024 * 1024, minimum=1)
+
+#: parametre -> (en-tete, taille maximale en octets)
+PARAMETERS: dict[str, tuple[str, int]] = {
+    "key_hex": ("x-cryptolab-key", MAX_KEY),
+    "iv_hex": ("x-cryptolab-iv", 16),
+    "nonce_hex": ("x-cryptolab-nonce", 16),
+    "aad_hex": ("x-cryptolab-aad", MAX_KEY),
+}
+
+#: En-tetes a autoriser en CORS pour que le frontend puisse les envoyer.
+HEADERS = tuple(header for header, _ in PARAMETERS.values())
+
+
+def _param(request: Request, name: str, *, required: bool = True) -> bytes:
+    """Parametre hexadecimal `name`, lu dans son en-tete ou la chaine de requete."""
+    header, max_bytes = PARAMETERS[name]
+    value = request.headers.get(header)
+    if value is None:
+        value = request.query_params.get(name)
+    if value is None:
+        if required:
+            raise InvalidInput(f"Parametre manquant : en-tete {header} ou {name}.")
+        return b""
+    if len(value) > 2 * max_bytes:
+        raise InvalidInput(f"{name} depasse {max_bytes} octets.")
+    try:
+        return bytes.fromhex(value)
+    except ValueError as exc:
+        raise InvalidInput(f"{name} doit etre hexadecimal.") from exc
+
+
+def _too_large(limit: int) -> InvalidInput:
+    return InvalidInput(f"Le corps depasse {limit} octets.", details={"max_bytes": limit})
+
+
+def _check_declared(request: Request, limit: int) -> None:
+    """Refuse d'emblee un Content-Length au-dela de `limit`."""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise _too_large(limit)
+
+
+async def _body(request: Request, limit: int = MAX_BYTES) -> memoryview:
+    """Le corps de la requete, borne a `limit`, vu sans copie."""
+    _check_declared(request, limit)
+    body = bytearray()
+    async for chunk in request.stream():
+        # Sans Content-Length (envoi par morceaux), la borne se verifie au fil
+        # de la lecture plutot qu'apres avoir tout accepte.
+        if len(body) + len(chunk) > limit:
+            raise _too_large(limit)
+        body += chunk
+    return memoryview(body)
+
+
+def _profiled_call(label: str, transform: Callable[[memoryview], Any], data: memoryview) -> Any:
+    """
+    `instrumentation.call`, profile dans le thread qui calcule : cProfile ne
+    voit que le thread qui l'active, et la boucle ne fait qu'attendre.
+    """
+    with profiling.profiled(label):
+        return instrumentation.call(transform, data)
+
+
+async def _compute(
+    algorithm: str, operation: str, transform: Callable[[memoryview], Any], data: memoryview
+) -> tuple[Any, instrumentation.Sample]:
+    """Execute `transform` hors de la boucle et le mesure."""
+    label = f"{operation}:binary"
+    with instrumentation.measure(algorithm, label) as sample:
+        try:
+            # Le pool de threads, comme les routes JSON THREAD : RC4 est du
+            # Python pur, 20 Ko occuperaient la boucle d'evenements.
+            output = await run_in_threadpool(
+                _profiled_call, f"{algorithm}/{label}", transform, data
+            )
+        except CryptoLabError:
+            raise
+        except Exception as exc:
+            # Meme traitement que les routes generees (registry/routes.py) :
+            # la trace reste cote serveur, le client recoit une enveloppe.
+            logger.exception("Echec de %s/%s", algorithm, label)
+            raise CryptoLabError(
+                f"Erreur interne pendant l'operation '{label}' de '{algorithm}'."
+            ) from exc
+    crud.record_usage(algorithm, label, len(data))
+    return output, sample
+
+
+def _timed(response: Response, sample: instrumentation.Sample) -> Response:
+    if instrumentation.SERVER_TIMING:
+        response.headers["Server-Timing"] = sample.server_timing()
+    return response
+
+
+async def _respond(
+    algorithm: str,
+    operation: str,
+    transform: Callable[[memoryview], bytes | bytearray],
+    data: memoryview,
+) -> Response:
+    """`_compute`, puis les octets produits en reponse."""
+    output, sample = await _compute(algorithm, operation, transform, data)
+    # Une memoryview sur le tampon de sortie : Starlette l'envoie sans copie.
+    return _timed(Response(content=memoryview(output), media_type=OCTET_STREAM), sample)
+
+
+_DOC = "Corps : le clair, en octets bruts. Reponse : le chiffre, en octets bruts."
+
+
+@router.post("/aesmodes/encrypt-ecb", summary="ECB sur des octets bruts", description=_DOC)
+async def encrypt_ecb(request: Request) -> Response:
+    from utils import modes_tool
+
+    key = _param(request, "key_hex")
+    data = await _body(request)
+    return await _respond(
+        "aesmodes", "encrypt-ecb", lambda d: modes_tool.encrypt_ecb_bytes(key, d), data
+    )
+
+
+@router.post("/aesmodes/encrypt-cbc", summary="CBC sur des octets bruts", description=_DOC)
+async def encrypt_cbc(request: Request) -> Response:
+    from utils import modes_tool
+
+    key, iv = _param(request, "key_hex"), _param(request, "iv_hex")
+    data = await _body(request)
+    return await _respond(
+        "aesmodes", "encrypt-cbc", lambda d: modes_tool.encrypt_cbc_bytes(key, d, iv), data
+    )
+
+
+@router.post("/aesmodes/encrypt-ctr", summary="CTR sur des octets bruts", description=_DOC)
+async def encrypt_ctr(request: Request) -> Response:
+    from utils import modes_tool
+
+    key, iv = _param(request, "key_hex"), _param(request, "iv_hex")
+    data = await _body(request)
+    return await _respond(
+        "aesmodes", "encrypt-ctr", lambda d: modes_tool.encrypt_ctr_bytes(key, d, iv), data
+    )
+
+
+@router.post(
+    "/rc4/encrypt",
+    summary="RC4 sur des octets bruts",
+    description=_DOC + " RC4 est involutif : la meme route dechiffre.",
+)
+async def rc4(request: Request) -> Response:
+    key = _param(request, "key_hex")
+    data = await _body(request)
+    return await _respond("rc4", "encrypt", lambda d: rc4_tool.rc4_crypt(d, key), data)
+
+
+@router.post(
+    "/chacha20poly1305/encrypt",
+    summary="ChaCha20-Poly1305 sur des octets bruts",
+    description=_DOC + " La reponse se termine par le tag Poly1305 (16 octets).",
+)
+async def chacha20_poly1305(request: Request) -> Response:
+    from utils import chacha20_tool
+
+    key, nonce = _param(request, "key_hex"), _param(request, "nonce_hex")
+    aad = _param(request, "aad_hex", required=False)
+    data = await _body(request)
+    return await _respond(
+        "chacha20poly1305",
+        "encrypt",
+        lambda d: chacha20_tool.chacha20_poly1305_bytes(key, nonce, d, aad),
+        data,
+    )
+
+
+# --- Flux ---
+
+class StreamAborted(RuntimeError):
+    """
+    Flux interrompu apres le debut de la reponse.
+
+    Volontairement hors de `CryptoLabError` : aucune enveloppe n'est plus
+    possible, le serveur coupe la connexion et le client voit un chiffre
+    incomplet comme tel.
+    """
+
+
+class _DuplexResponse(StreamingResponse):
+    """
+    StreamingResponse qui peut lire le corps de la requete pendant qu'elle repond.
+
+    Selon la version ASGI du serveur, StreamingResponse surveille la
+    deconnexion du client en lisant `receive` : elle volerait alors les
+    morceaux du corps au generateur. Ici, c'est le generateur qui lit
+    `receive`, et une deconnexion y leve `ClientDisconnect`.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
+async def _encrypt_stream(
+    chunks: AsyncIterator[bytes], encryptor: Any, usage: str, sent: bytes = b""
+) -> AsyncIterator[bytes]:
+    """
+    Diffuse `encryptor` (un `StreamEncryptor` ou un `ImageStreamEncryptor`)
+    applique aux morceaux restants ; `sent` a ete produit avant la reponse.
+    """
+    if sent:
+        yield sent
+    async for chunk in chunks:
+        if encryptor.processed + len(chunk) > STREAM_MAX_BYTES:
+            # L'en-tete 200 est parti : seule la coupure de la connexion dit
+            # au client que le chiffre est incomplet.
+            raise StreamAborted(f"Le flux depasse {STREAM_MAX_BYTES} octets.")
+        # Sur la boucle, sans changement de thread : AES en C chiffre un
+        # morceau de 64 Ko en quelques dizaines de microsecondes.
+        out = encryptor.update(chunk)
+        if out:
+            yield out
+    yield encryptor.finalize()
+    crud.record_usage("aesmodes", usage, encryptor.processed)
+
+
+@router.post(
+    "/aesmodes/stream/{mode}",
+    summary="Chiffrer un fichier en flux (ECB, CBC ou CTR)",
+    description=(
+        "Corps : le fichier, en octets bruts, de taille quelconque jusqu'a "
+        "CRYPTOLAB_STREAM_MAX_BYTES. Reponse : le chiffre, diffuse au fil de la "
+        "lecture. ECB et CBC ajoutent un bourrage PKCS#7 ; CTR n'en a pas besoin."
+    ),
+)
+async def encrypt_stream(request: Request, mode: Literal["ecb", "cbc", "ctr"]) -> Response:
+    from utils import modes_tool
+
+    key = _param(request, "key_hex")
+    iv = _param(request, "iv_hex") if mode != "ecb" else b""
+    _check_declared(request, STREAM_MAX_BYTES)
+    # Cle et IV sont verifies ici, avant la premiere ligne de la reponse : une
+    # erreur de parametre recoit encore une enveloppe JSON.
+    encryptor = modes_tool.StreamEncryptor(mode, key, iv)
+    return _DuplexResponse(
+        _encrypt_stream(request.stream(), encryptor, f"stream-{mode}"), media_type=OCTET_STREAM
+    )
+
+
+# --- Pingouin ECB sur une image ---
+
+def _multipart(
+    summary: dict, images: dict[str, bytearray], media_type: str, boundary: bytes
+) -> Iterator[bytes | memoryview]:
+    delimiter = b"--" + boundary
+    yield delimiter + b"\r\nContent-Type: application/json\r\n\r\n" + dumps(summary) + b"\r\n"
+    for mode, image in images.items():
+        headers = (
+            f"\r\nContent-Type: {media_type}"
+            f'\r\nContent-Disposition: attachment; filename="penguin-{mode}.{summary["format"]}"'
+            "\r\n\r\n"
+        )
+        yield delimiter + headers.encode()
+        yield memoryview(image)
+        yield b"\r\n"
+    yield delimiter + b"--\r\n"
+
+
+def _boundary(images: dict[str, bytearray]) -> bytes:
+    """Separateur absent de toutes les images (RFC 2046 §5.1.1)."""
+    while True:
+        boundary = secrets.token_hex(24).encode()
+        if not any(boundary in image for image in images.values()):
+            return boundary
+
+
+async def _penguin_stream(request: Request, mode: str, key: bytes, iv: bytes) -> Response:
+    from utils import image_tool
+
+    _check_declared(request, STREAM_MAX_BYTES)
+    encryptor = image_tool.ImageStreamEncryptor(mode, key, iv)
+    # L'en-tete est lu avant de repondre : un fichier qui n'est pas une image
+    # recoit encore une enveloppe JSON, et la reponse porte le bon type.
+    chunks = request.stream()
+    sent = b""
+    async for chunk in chunks:
+        if encryptor.processed + len(chunk) > STREAM_MAX_BYTES:
+            raise _too_large(STREAM_MAX_BYTES)
+        sent = encryptor.update(chunk)
+        if encryptor.header is not None:
+            break
+    else:
+        encryptor.finalize()  # Leve : en-tete incomplet.
+    header = encryptor.header
+    return _DuplexResponse(
+        _encrypt_stream(chunks, encryptor, f"penguin-{mode}", sent),
+        media_type=header.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="penguin-{mode}.{header.extension}"'
+        },
+    )
+
+
+@router.post(
+    "/aesmodes/penguin",
+    summary="Chiffrer les pixels d'une image BMP/PPM/PGM (pingouin ECB)",
+    description=(
+        "Corps : une image BMP, PPM (P6) ou PGM (P5). L'en-tete est garde, les "
+        "pixels sont chiffres : l'image s'ouvre encore, et en ECB ses contours "
+        "restent visibles. Sans `mode` : `multipart/mixed` (resume JSON, puis "
+        "les images ECB, CBC et CTR). Avec `mode` : cette image seule, en flux. "
+        "IV par defaut : zero, choisi ici uniquement pour la demonstration."
+    ),
+)
+async def penguin(request: Request, mode: Literal["ecb", "cbc", "ctr"] | None = None) -> Response:
+    from utils import image_tool
+
+    key = _param(request, "key_hex")
+    iv = _param(request, "iv_hex", required=False) or bytes(16)
+    if mode is not None:
+        return await _penguin_stream(request, mode, key, iv)
+
+    data = await _body(request, IMAGE_MAX_BYTES)
+    (summary, images), sample = await _compute(
+        "aesmodes", "penguin", lambda d: image_tool.encrypt_image(d, key, iv), data
+    )
+    boundary = _boundary(images)
+    media_type = image_tool.parse_header(data).media_type
+    response = StreamingResponse(
+        _multipart(summary, images, media_type, boundary),
+        media_type=f"multipart/mixed; boundary={boundary.decode()}",
+    )
+    return _timed(response, sample)
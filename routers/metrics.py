@@ -0,0 +1,123 @@
+"""
+Metriques internes du serveur : etat des caches, usage agrege, cout de chaque
+operation, et `/metrics` au format texte Prometheus (requetes, latences, usage
+par algorithme).
+
+Rien ici ne touche aux donnees des utilisateurs : seulement des compteurs
+(entrees, succes, echecs) qui disent si les caches servent a quelque chose
+pendant une seance de TP, et les agregats anonymes d'usage.
+"""
+
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db import crud
+from registry import instrumentation, profiling
+from registry.envelope import success
+from utils import kdf_cache
+from utils.key_schedule_cache import SCHEDULES
+
+router = APIRouter(prefix="/api/metrics", tags=["Meta"])
+prometheus_router = APIRouter(tags=["Meta"])
+
+PROMETHEUS_TEXT = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/caches", summary="Hit/miss counters of the server-side caches")
+def cache_metrics():
+    return success({"caches": [SCHEDULES.stats(), kdf_cache.KDF_CACHE.stats()]})
+
+
+@router.get("/usage", summary="Most used algorithms and input-length distribution")
+def usage_metrics(
+    limit: int = Query(10, ge=1, le=100),
+    hours: int = Query(24 * 7, ge=1, le=24 * 366),
+    algorithm: str | None = Query(None, max_length=64),
+):
+    """Lu dans les agregats horaires ; `enabled` vaut false sans statistiques."""
+    top = crud.top_algorithms(limit, hours)
+    if top is None:
+        return success({"enabled": False, "top": [], "lengths": None})
+    return success({
+        "enabled": True,
+        "hours": hours,
+        "top": top,
+        "lengths": crud.length_distribution(algorithm, hours),
+    })
+
+
+@router.get("/operations", summary="Wall time, CPU time and allocation percentiles per operation")
+def operation_metrics():
+    """Fenetre glissante par (algorithme, operation), la plus couteuse en CPU d'abord."""
+    return success({
+        "window": instrumentation.OPERATIONS.window,
+        "trace_alloc": instrumentation.TRACE_ALLOC,
+        "operations": instrumentation.OPERATIONS.snapshot(),
+    })
+
+
+def require_admin(request: Request) -> None:
+    """Dependance : l'en-tete `X-CryptoLab-Admin` doit porter `CRYPTOLAB_ADMIN_TOKEN`."""
+    if not profiling.is_admin(request.headers.get(profiling.ADMIN_HEADER)):
+        raise HTTPException(status_code=403, detail="Jeton d'administration manquant ou invalide.")
+
+
+@router.get(
+    "/profiles",
+    summary="Recent request profiles (admin)",
+    dependencies=[Depends(require_admin)],
+)
+def list_profiles():
+    return success({"sample_rate": profiling.SAMPLE_RATE, "profiles": profiling.PROFILES.listing()})
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Hottest functions of one request profile (admin)",
+    dependencies=[Depends(require_admin)],
+)
+def get_profile(profile_id: int):
+    profile = profiling.PROFILES.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Aucun profil numero {profile_id} en memoire.")
+    return success(profile)
+
+
+@prometheus_router.get("/metrics", summary="Prometheus text exposition", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(crud.render_prometheus(), media_type=PROMETHEUS_TEXT)
+
+
+class RequestMetricsMiddleware:
+    """
+    Mesure chaque requete HTTP et la compte par gabarit de route
+    (`/api/simulate/{algo}`, jamais l'URL reelle) : le nombre d'etiquettes
+    reste borne par le nombre de routes. Une reponse diffusee est mesuree
+    jusqu'a son dernier octet.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_capture)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            crud.observe_request(scope["method"], route, status, time.perf_counter() - start)
@@ -8,10 +8,11 @@ ajouter une simulation = ajouter une ligne.
 
 import logging
 from collections.abc import Callable
-from typing import Any
+from typing import Any, Literal
 
 import pydantic
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from db import crud
 from db.models import (
@@ -21,8 +22,10 @@ from db.models import (
     ShiftInput,
     TextInput,
 )
+from registry import ndjson, profiling
 from registry.envelope import success
 from utils import aes_simulator, des_simulator, step_visualizer
+from utils.tracing import FULL, Trace, Window, drain, replay
 
 logger = logging.getLogger(__name__)
 
@@ -99,13 +102,45 @@ SIMULATORS: dict[str, tuple[type[pydantic.BaseModel], Callable[..., dict], Calla
 }
 
 
+# algo -> version generatrice du simulateur. Les simulateurs longs (des
+# centaines de blocs a MAX_TEXT) produisent leurs etapes au fil du calcul ; les
+# autres sont rejoues depuis leur resultat complet.
+TRACERS: dict[str, Callable[..., Trace]] = {
+    "aes-multiblock": aes_simulator.iter_aes_encrypt_multiblock,
+    "aes-decrypt": aes_simulator.iter_aes_decrypt_multiblock,
+    "des-multiblock": des_simulator.iter_des_encrypt_multiblock,
+    "sha256": step_visualizer.iter_sha256,
+    "sha1": step_visualizer.iter_sha1,
+}
+
+
 @router.get("", summary="List the algorithms available for simulation")
 def list_simulations():
     return success({"algorithms": sorted(SIMULATORS)})
 
 
 @router.post("/{algo}", summary="Get step-by-step simulation for an algorithm")
-def simulate_algorithm(algo: str, data: dict = Body(...)) -> dict[str, Any]:
+def simulate_algorithm(
+    request: Request,
+    algo: str,
+    data: dict = Body(...),
+    stream: Literal["ndjson"] | None = Query(
+        None,
+        description=(
+            "`ndjson` : diffuse les etapes une par ligne au fil du calcul "
+            "(equivalent a `Accept: application/x-ndjson`)."
+        ),
+    ),
+    block_range: str | None = Query(
+        None, description="Blocs a tracer : `n` ou `debut-fin` (inclus, a partir de 0)."
+    ),
+    round_range: str | None = Query(
+        None, description="Tours a tracer dans chaque bloc : `n` ou `debut-fin`."
+    ),
+    detail: Literal["full", "summary"] | None = Query(
+        None, description="`summary` : une etape par bloc trace, sans le detail des tours."
+    ),
+) -> dict[str, Any]:
     """
     Execute une simulation etape par etape pour l'algorithme demande.
 
@@ -132,8 +167,18 @@ def simulate_algorithm(algo: str, data: dict = Body(...)) -> dict[str, Any]:
             detail=f"Donnees d'entree invalides pour '{algo}' : {exc.errors()}",
         ) from exc
 
+    window = _window(algo, block_range, round_range, detail)
+    input_length = len(getattr(parsed, "text", None) or getattr(parsed, "cipher_hex", ""))
+
+    if stream == "ndjson" or ndjson.NDJSON in request.headers.get("accept", ""):
+        return _stream(algo, _trace(algo, simulate, extract(parsed), window), input_length)
+
     try:
-        result = simulate(*extract(parsed))
+        with profiling.profiled(f"simulate/{algo}"):
+            if window.is_full:
+                result = simulate(*extract(parsed))
+            else:
+                result = drain(_trace(algo, simulate, extract(parsed), window))
     except Exception as exc:
         # On journalise la trace complete cote serveur, mais on ne renvoie
         # jamais le detail interne au client.
@@ -143,6 +188,59 @@ def simulate_algorithm(algo: str, data: dict = Body(...)) -> dict[str, Any]:
             detail=f"Erreur interne pendant la simulation de '{algo}'.",
         ) from exc
 
-    input_length = len(getattr(parsed, "text", None) or getattr(parsed, "cipher_hex", ""))
     crud.record_usage(algo, "simulate", input_length)
     return success({"algorithm": algo, **result})
+
+
+def _window(
+    algo: str,
+    block_range: str | None,
+    round_range: str | None,
+    detail: Literal["full", "summary"] | None,
+) -> Window:
+    """
+    Fenetre de trace demandee. Seuls les simulateurs longs (ceux de TRACERS)
+    savent calculer hors fenetre sans tracer.
+    """
+    if block_range is None and round_range is None and detail is None:
+        return FULL
+    if algo not in TRACERS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"La simulation '{algo}' ne se restreint pas a une fenetre. "
+                f"Simulations fenetrables : {', '.join(sorted(TRACERS))}."
+            ),
+        )
+    try:
+        return Window.parse(block_range, round_range, detail or "full")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+# --- Diffusion NDJSON ---
+#
+# Une ligne JSON par evenement (registry/ndjson.py) :
+#
+#     {"event": "step",   "data": {...}}     une etape, dans l'ordre
+#     {"event": "result", "data": {...}}     le resume, sans `steps`, en dernier
+#     {"event": "error",  "error": {...}}    echec en cours de route, en dernier
+#
+# Le frontend anime le bloc 0 pendant que le bloc 300 est encore en calcul, et
+# le serveur ne tient jamais la liste complete des etapes en memoire.
+
+def _trace(algo: str, simulate: Callable[..., dict], args: tuple, window: Window) -> Trace:
+    """Trace d'une simulation, calculee paresseusement."""
+    tracer = TRACERS.get(algo)
+    if tracer is not None:
+        return (yield from tracer(*args, window))
+    return (yield from replay(simulate(*args)))
+
+
+def _stream(algo: str, trace: Trace, input_length: int) -> StreamingResponse:
+    def result(summary: dict) -> dict:
+        crud.record_usage(algo, "simulate", input_length)
+        return {"algorithm": algo, **summary}
+
+    failure = f"Erreur interne pendant la simulation de '{algo}'."
+    return ndjson.stream(ndjson.lines(trace, "step", result, failure), failure)
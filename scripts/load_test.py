@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Test de charge : une salle de TP qui ouvre le meme exercice a la meme minute.
+
+La charge reelle arrive par vagues : 30 a 200 etudiants lancent le meme
+exercice dans la minute. Chaque etudiant virtuel arrive a un instant tire au
+hasard dans la rampe (`--ramp`), puis enchaine des requetes tirees dans un
+melange pondere, separees par un temps de reflexion (loi exponentielle de
+moyenne `--think`), jusqu'a la fin de l'essai.
+
+Les requetes reprennent celles du test de fumee (`scripts/smoke_test.py`,
+`CHECKS`), verifiees de la meme facon : une reponse 200 au mauvais contenu
+compte comme une erreur. S'y ajoutent le catalogue, une simulation SHA-256 et
+des connexions sur des comptes crees au depart.
+
+Deux cibles :
+
+* en memoire (defaut) : l'application ASGI est appelee directement, sans
+  serveur ni reseau ;
+* une URL : `uvicorn main:app` en local, ou une instance deployee.
+
+Rapport : debit, latences p50/p95/p99 et taux d'erreur par route, puis au
+total. `--json` ecrit le meme rapport dans un fichier.
+
+Usage :
+    python scripts/load_test.py [--url http://127.0.0.1:8000] [--students 60]
+                                [--ramp 10] [--duration 60] [--think 2]
+                                [--mix catalog=3,classical=4,hash=2,simulate=2,login=1]
+                                [--json load.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import secrets
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+# Permet `import smoke_test` et `from main import app` sans installer le paquet.
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from smoke_test import CHECKS, unwrap  # noqa: E402
+
+TIMEOUT = 60
+PASSWORD = "charge-de-test-2024"
+DEFAULT_MIX = "catalog=3,classical=4,hash=2,simulate=2,login=1"
+
+
+@dataclass(frozen=True)
+class Call:
+    """Une requete du melange, et ce qu'elle doit renvoyer (ou None)."""
+
+    method: str
+    path: str
+    body: dict | None
+    key: str | None = None
+    expected: Any = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def _category(path: str) -> str | None:
+    for prefix, category in (
+        ("/api/classical/", "classical"),
+        ("/api/hash/", "hash"),
+        ("/api/simulate/", "simulate"),
+    ):
+        if path.startswith(prefix):
+            return category
+    return None
+
+
+def build_calls() -> dict[str, list[Call]]:
+    """Les requetes de chaque categorie du melange."""
+    calls: dict[str, list[Call]] = defaultdict(list)
+    for method, path, body, key, expected in CHECKS:
+        category = _category(path)
+        if category is not None:
+            calls[category].append(Call(method, path, body, key, expected))
+    calls["catalog"].append(Call("GET", "/api/algorithms", None))
+    calls["simulate"].append(Call("POST", "/api/simulate/sha256", {"text": "abc"}))
+    # `login` est rempli par `create_accounts`, une fois les comptes crees.
+    return calls
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+# --- Execution ---
+
+class Recorder:
+    """Latences et erreurs par route."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.reasons: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, label: str, seconds: float, error: str | None) -> None:
+        self.latencies[label].append(seconds)
+        if error is not None:
+            self.errors[label] += 1
+            self.reasons[label][error] += 1
+
+
+def _check(call: Call, response: httpx.Response) -> str | None:
+    """None si la reponse est juste, sinon la raison de l'echec."""
+    if response.status_code >= 400:
+        return str(response.status_code)
+    if call.key is None:
+        return None
+    try:
+        actual = unwrap(response.json()).get(call.key)
+    except ValueError:
+        return "invalid_json"
+    return None if actual == call.expected else "wrong_result"
+
+
+async def send(client: httpx.AsyncClient, call: Call, recorder: Recorder) -> None:
+    start = time.perf_counter()
+    try:
+        response = await client.request(call.method, call.path, json=call.body)
+        error = _check(call, response)
+    except httpx.HTTPError as exc:
+        error = type(exc).__name__
+    recorder.record(call.label, time.perf_counter() - start, error)
+
+
+async def create_accounts(client: httpx.AsyncClient, count: int) -> list[Call]:
+    """Cree `count` comptes propres a cet essai ; renvoie leurs connexions."""
+    run = secrets.token_hex(4)
+    logins = []
+    for i in range(count):
+        email = f"charge-{run}-{i}@example.com"
+        response = await client.post("/api/auth/register", json={
+            "email": email, "password": PASSWORD, "first_name": "Charge",
+            "last_name": f"Etudiant {i}", "country": "France", "city": "Paris",
+        })
+        if response.status_code != 201:
+            print(f"Compte {email} non cree ({response.status_code}) : pas de connexions.",
+                  file=sys.stderr)
+            return []
+        logins.append(Call("POST", "/api/auth/login", {"email": email, "password": PASSWORD}))
+    return logins
+
+
+async def student(
+    client: httpx.AsyncClient,
+    calls: dict[str, list[Call]],
+    mix: dict[str, float],
+    recorder: Recorder,
+    *,
+    arrival: float,
+    deadline: float,
+    think: float,
+    rng: random.Random,
+) -> None:
+    categories = [name for name in mix if calls.get(name)]
+    weights = [mix[name] for name in categories]
+    await asyncio.sleep(arrival)
+    while time.perf_counter() < deadline:
+        category = rng.choices(categories, weights)[0]
+        await send(client, rng.choice(calls[category]), recorder)
+        if think > 0:
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+
+def _client(url: str | None) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url.rstrip("/"), timeout=TIMEOUT)
+    from main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://cryptolab", timeout=TIMEOUT
+    )
+
+
+async def run(args: argparse.Namespace) -> tuple[Recorder, float]:
+    mix = parse_mix(args.mix)
+    calls = build_calls()
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    async with _client(args.url) as client:
+        if mix.get("login"):
+            calls["login"] = await create_accounts(client, args.accounts)
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            student(client, calls, mix, recorder, arrival=rng.uniform(0, args.ramp),
+                    deadline=deadline, think=args.think, rng=random.Random(rng.random()))
+            for _ in range(args.students)
+        ))
+        return recorder, time.perf_counter() - start
+
+
+# --- Rapport ---
+
+def _percentile(ordered: list[float], p: int) -> float:
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict[str, Any]:
+    def row(latencies: list[float], errors: int) -> dict[str, Any]:
+        ordered = sorted(latencies)
+        return {
+            "requests": len(ordered),
+            "rps": round(len(ordered) / elapsed, 2),
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+            "error_rate": round(errors / len(ordered), 4),
+        }
+
+    routes = {
+        label: {**row(latencies, recorder.errors[label]),
+                "errors": dict(recorder.reasons[label])}
+        for label, latencies in sorted(recorder.latencies.items())
+    }
+    everything = [s for latencies in recorder.latencies.values() for s in latencies]
+    total = row(everything, sum(recorder.errors.values())) if everything else None
+    return {"elapsed_seconds": round(elapsed, 2), "routes": routes, "total": total}
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"\n{'route':<44} {'req':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>7}")
+    rows = list(report["routes"].items())
+    if report["total"] is not None:
+        rows.append(("TOTAL", report["total"]))
+    for label, r in rows:
+        print(f"{label:<44} {r['requests']:>6} {r['rps']:>7.1f} {r['p50_ms']:>6.1f}ms "
+              f"{r['p95_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms {r['error_rate']:>7.1%}")
+    for label, r in report["routes"].items():
+        if r["errors"]:
+            print(f"  erreurs {label} : {r['errors']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="instance a charger (defaut : l'application en memoire)")
+    parser.add_argument("--students", type=int, default=60, help="etudiants virtuels")
+    parser.add_argument("--ramp", type=float, default=10.0,
+                        help="secondes pendant lesquelles les etudiants arrivent")
+    parser.add_argument("--duration", type=float, default=60.0, help="duree de l'essai, en secondes")
+    parser.add_argument("--think", type=float, default=2.0,
+                        help="temps de reflexion moyen entre deux requetes, en secondes")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="poids par categorie")
+    parser.add_argument("--accounts", type=int, default=5, help="comptes crees pour les connexions")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", help="ecrire le rapport dans ce fichier")
+    args = parser.parse_args()
+
+    target = args.url or "l'application en memoire"
+    print(f"{args.students} etudiants sur {target}, {args.duration:.0f} s "
+          f"(rampe {args.ramp:.0f} s, reflexion {args.think:.1f} s)")
+    recorder, elapsed = asyncio.run(run(args))
+    report = summarize(recorder, elapsed)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if report["total"] is None:
+        return 1
+    return 1 if report["total"]["error_rate"] > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
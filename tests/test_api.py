@@ -6,6 +6,7 @@ la garantie qu'aucune donnee utilisateur n'est persistee.
 import pytest
 
 from tests.conftest import error_of, unwrap
+from utils import aes_simulator
 
 # --- Meta --------------------------------------------------------------------
 
@@ -265,3 +266,179 @@ def test_simulation_never_leaks_internal_errors(client, monkeypatch):
     response = client.post("/api/simulate/caesar", json={"text": "ABC", "shift": 3})
     assert response.status_code == 500
     assert "secret.py" not in error_of(response)["message"]
+
+
+# --- Simulations diffusees (NDJSON) ------------------------------------------
+
+def _ndjson_events(response) -> list[dict]:
+    import json
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize(
+    "algo, payload",
+    [
+        ("sha256", {"text": "abc" * 30}),
+        ("sha1", {"text": "abc"}),
+        ("aes-multiblock", {"text": "Deux blocs AES, au moins.", "key": "Thats my Kung Fu"}),
+        ("des-multiblock", {"text": "Trois blocs DES !!", "key": "abcdefgh"}),
+        # Sans version generatrice : rejoue depuis le resultat complet.
+        ("caesar", {"text": "BONJOUR", "shift": 3}),
+    ],
+)
+def test_streamed_simulation_matches_the_buffered_one(client, algo, payload):
+    buffered = unwrap(client.post(f"/api/simulate/{algo}", json=payload))
+    events = _ndjson_events(
+        client.post(f"/api/simulate/{algo}", params={"stream": "ndjson"}, json=payload)
+    )
+
+    assert [e["event"] for e in events] == ["step"] * (len(events) - 1) + ["result"]
+    assert [e["data"] for e in events[:-1]] == buffered["steps"]
+    assert events[-1]["data"] == {k: v for k, v in buffered.items() if k != "steps"}
+
+
+def test_streaming_is_negotiated_by_the_accept_header(client):
+    response = client.post(
+        "/api/simulate/sha256",
+        json={"text": "abc"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert _ndjson_events(response)[-1]["data"]["final_result"].startswith("ba7816bf")
+
+
+def test_streamed_failure_before_the_first_step_is_an_http_error(client):
+    response = client.post(
+        "/api/simulate/aes-decrypt",
+        params={"stream": "ndjson"},
+        json={"cipher_hex": "00" * 15, "key": "k"},
+    )
+    assert response.status_code == 500
+    assert "aes-decrypt" in error_of(response)["message"]
+
+
+def test_streamed_failure_midway_ends_with_an_error_event(client, monkeypatch):
+    from routers import simulate as simulate_router
+
+    def broken(text, window):
+        yield {"step": 0, "description": "premiere etape"}
+        raise RuntimeError("chemin/interne/secret.py ligne 42")
+
+    monkeypatch.setitem(simulate_router.TRACERS, "sha256", broken)
+    events = _ndjson_events(
+        client.post("/api/simulate/sha256", params={"stream": "ndjson"}, json={"text": "abc"})
+    )
+
+    assert [e["event"] for e in events] == ["step", "error"]
+    assert events[-1]["error"]["code"] == "internal_error"
+    assert "secret.py" not in events[-1]["error"]["message"]
+
+
+def test_unknown_stream_format_is_rejected(client):
+    response = client.post("/api/simulate/sha256", params={"stream": "xml"}, json={"text": "a"})
+    assert response.status_code == 422
+
+
+# --- Simulations fenetrees ----------------------------------------------------
+
+_AES_CIPHER_HEX = aes_simulator.simulate_aes_encrypt_multiblock(
+    "a" * 200, "Thats my Kung Fu"
+)["final_result_hex"]
+
+
+@pytest.mark.parametrize(
+    "algo, payload",
+    [
+        ("sha256", {"text": "a" * 1_000}),
+        ("sha1", {"text": "a" * 1_000}),
+        ("aes-multiblock", {"text": "a" * 200, "key": "Thats my Kung Fu"}),
+        ("des-multiblock", {"text": "a" * 200, "key": "abcdefgh"}),
+        ("aes-decrypt", {"cipher_hex": _AES_CIPHER_HEX, "key": "Thats my Kung Fu"}),
+    ],
+)
+def test_windowed_simulation_keeps_the_final_result(client, algo, payload):
+    full = unwrap(client.post(f"/api/simulate/{algo}", json=payload))
+    windowed = unwrap(client.post(
+        f"/api/simulate/{algo}",
+        params={"block_range": "2-3", "round_range": "5"},
+        json=payload,
+    ))
+
+    for key in ("final_result", "final_result_hex", "block_results", "block_count"):
+        assert windowed.get(key) == full.get(key)
+    assert windowed["window"]["blocks"] == [2, 3]
+    assert windowed["window"]["traced_blocks"] == 2
+    assert "window" not in full
+    assert len(windowed["steps"]) < len(full["steps"])
+
+    traced = {step["block"] for step in windowed["steps"] if "block" in step}
+    assert traced == {2, 3}
+    rounds = {
+        sub.get("round", step.get("round"))
+        for step in windowed["steps"]
+        for sub in step.get("block_steps", [step])
+        if sub.get("round", step.get("round")) is not None
+    }
+    assert rounds == {5}
+
+
+def test_summary_detail_keeps_one_step_per_traced_block(client):
+    data = unwrap(client.post(
+        "/api/simulate/aes-multiblock",
+        params={"detail": "summary"},
+        json={"text": "a" * 100, "key": "k"},
+    ))
+
+    blocks = [step for step in data["steps"] if step["phase"] == "Bloc"]
+    assert len(blocks) == data["block_count"]
+    assert all("block_steps" not in step for step in blocks)
+
+
+@pytest.mark.parametrize(
+    "algo, payload, traced",
+    [
+        ("aes-multiblock", {"text": "a" * 200, "key": "Thats my Kung Fu"}, "encrypt_block"),
+        ("aes-decrypt", {"cipher_hex": _AES_CIPHER_HEX, "key": "Thats my Kung Fu"},
+         "decrypt_block"),
+    ],
+)
+def test_aes_summary_skips_the_traced_rounds(client, monkeypatch, algo, payload, traced):
+    full = unwrap(client.post(f"/api/simulate/{algo}", json=payload))
+
+    def no_trace(*_args, **_kwargs):
+        raise AssertionError("le resume ne doit pas tracer les rounds")
+
+    monkeypatch.setattr(aes_simulator, traced, no_trace)
+    summary = unwrap(client.post(
+        f"/api/simulate/{algo}", params={"detail": "summary"}, json=payload
+    ))
+
+    for key in ("final_result", "final_result_hex", "block_results", "block_count"):
+        assert summary.get(key) == full.get(key)
+
+
+def test_window_is_rejected_when_unsupported_or_malformed(client):
+    caesar = client.post(
+        "/api/simulate/caesar", params={"block_range": "1"}, json={"text": "A", "shift": 1}
+    )
+    assert caesar.status_code == 400
+
+    for bad in ("3-1", "x", "-2"):
+        response = client.post(
+            "/api/simulate/sha256", params={"block_range": bad}, json={"text": "abc"}
+        )
+        assert response.status_code == 400, bad
+
+
+def test_window_applies_to_streamed_simulations(client):
+    events = _ndjson_events(client.post(
+        "/api/simulate/sha256",
+        params={"stream": "ndjson", "block_range": "0", "detail": "summary"},
+        json={"text": "abc"},
+    ))
+
+    assert events[-1]["data"]["window"]["detail"] == "summary"
+    assert [e["data"]["phase"] for e in events[:-1]] == [
+        "Bourrage", "Mise à jour du condensé", "Final",
+    ]
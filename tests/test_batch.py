@@ -0,0 +1,110 @@
+"""
+Tests de `/api/batch` : plusieurs operations du registre en un seul appel.
+
+Le contrat verifie ici : un resultat par element, dans l'ordre, chacun dans sa
+propre enveloppe, et un element en echec qui n'entraine jamais le lot entier.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from db.models import MAX_BATCH_ITEMS
+from tests.conftest import error_of, unwrap
+
+
+def _batch(client, items, **extra):
+    return client.post("/api/batch", json={"items": items, **extra})
+
+
+@pytest.mark.parametrize("concurrency", [None, 4])
+def test_batch_returns_one_result_per_item_in_order(client, concurrency):
+    items = [
+        {"algorithm": "caesar", "operation": "encrypt", "input": {"text": "abc", "shift": 1}},
+        {"algorithm": "sha256", "operation": "hash", "input": {"text": "abc"}},
+        {"algorithm": "caesar", "operation": "decrypt", "input": {"text": "bcd", "shift": 1}},
+    ]
+    extra = {"concurrency": concurrency} if concurrency else {}
+    data = unwrap(_batch(client, items, **extra))
+
+    assert data["count"] == 3
+    assert data["succeeded"] == 3
+    assert data["failed"] == 0
+    first, second, third = data["results"]
+    assert first["data"] == {"algorithm": "caesar", "action": "encrypt", "cipher": "bcd"}
+    assert second["data"]["hash"].startswith("ba7816bf")
+    assert third["data"]["algorithm"] == "caesar"
+    assert third["data"]["action"] == "decrypt"
+
+
+def test_batch_item_matches_the_single_route(client):
+    """Un element du lot passe par le meme chemin que sa route unitaire."""
+    body = {"text": "HELLO", "key": "KEY"}
+    single = unwrap(client.post("/api/classical/vigenere/encrypt", json=body))
+    batched = unwrap(_batch(client, [
+        {"algorithm": "vigenere", "operation": "encrypt", "input": body},
+    ]))["results"][0]
+
+    assert batched == {"ok": True, "data": single, "error": None}
+
+
+def test_batch_failures_are_reported_per_item(client):
+    data = unwrap(_batch(client, [
+        {"algorithm": "quantum", "operation": "encrypt", "input": {}},
+        {"algorithm": "caesar", "operation": "sign", "input": {}},
+        {"algorithm": "caesar", "operation": "encrypt", "input": {"text": "abc"}},
+        {"algorithm": "des", "operation": "decrypt", "input": {
+            "cipher_hex": "pas-du-hex", "key": "cle", "iv_hex": "00" * 8, "salt_hex": "00" * 16,
+        }},
+        {"algorithm": "caesar", "operation": "encrypt", "input": {"text": "abc", "shift": 1}},
+    ]))
+
+    assert data["failed"] == 4
+    assert data["succeeded"] == 1
+    codes = [r["error"]["code"] if not r["ok"] else None for r in data["results"]]
+    assert codes == [
+        "unknown_algorithm",
+        "unsupported_operation",
+        "validation_error",
+        "invalid_input",
+        None,
+    ]
+    assert "shift" in data["results"][2]["error"]["message"]
+    assert all(r["data"] is None for r in data["results"] if not r["ok"])
+
+
+def test_batch_accepts_operations_without_input(client):
+    result = unwrap(_batch(client, [
+        {"algorithm": "ecdh", "operation": "generate-keys"},
+    ]))["results"][0]
+
+    assert result["ok"] is True
+    assert result["data"]["action"] == "generate-keys"
+
+
+def test_batch_records_anonymous_usage_per_item(client, monkeypatch):
+    from db import crud
+
+    captured = []
+    monkeypatch.setattr(crud, "record_usage", lambda *args: captured.append(args))
+
+    _batch(client, [
+        {"algorithm": "caesar", "operation": "encrypt", "input": {"text": "secret", "shift": 3}},
+        {"algorithm": "sha256", "operation": "hash", "input": {"text": "abc"}},
+    ])
+
+    assert captured == [("caesar", "encrypt", 6), ("sha256", "hash", 3)]
+
+
+def test_batch_bounds_are_enforced(client):
+    item = {"algorithm": "caesar", "operation": "encrypt", "input": {"text": "a", "shift": 1}}
+
+    too_many = _batch(client, [item] * (MAX_BATCH_ITEMS + 1))
+    assert too_many.status_code == 422
+    assert error_of(too_many)["code"] == "validation_error"
+
+    empty = _batch(client, [])
+    assert empty.status_code == 422
+
+    too_parallel = _batch(client, [item], concurrency=1_000)
+    assert too_parallel.status_code == 422
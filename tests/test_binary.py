@@ -0,0 +1,339 @@
+"""
+Tests des routes binaires : memes octets que les routes hexadecimales, sans
+l'hexadecimal.
+"""
+
+import os
+
+import pytest
+
+from registry.errors import InvalidInput
+from routers.binary import MAX_BYTES
+from tests.conftest import error_of, unwrap
+
+KEY = "2b7e151628aed2a6abf7158809cf4f3c"
+IV = "000102030405060708090a0b0c0d0e0f"
+# NIST SP 800-38A F.1.1 : premier bloc ECB-AES128.
+PLAIN = bytes.fromhex("6bc1bee22e409f96e93d7e117393172a")
+ECB_CIPHER = bytes.fromhex("3ad77bb40d7a3660a89ecaf32466ef97")
+
+
+def _binary(client, path: str, body: bytes, **headers: str):
+    return client.post(
+        f"/api/binary/{path}",
+        content=body,
+        headers={"Content-Type": "application/octet-stream", **headers},
+    )
+
+
+def test_ecb_matches_the_nist_vector(client):
+    response = _binary(client, "aesmodes/encrypt-ecb", PLAIN, **{"X-CryptoLab-Key": KEY})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.content == ECB_CIPHER
+
+
+@pytest.mark.parametrize("mode", ["ecb", "cbc", "ctr"])
+def test_modes_agree_with_the_hex_routes(client, mode):
+    plain = os.urandom(160)
+    hexed = unwrap(client.post(
+        f"/api/modern/aesmodes/encrypt-{mode}",
+        json={"key_hex": KEY, "plaintext_hex": plain.hex(), "iv_hex": IV},
+    ))
+    # Parametres dans la chaine de requete, cette fois.
+    raw = client.post(
+        f"/api/binary/aesmodes/encrypt-{mode}?key_hex={KEY}&iv_hex={IV}", content=plain
+    )
+    assert raw.content == bytes.fromhex(hexed["cipher_hex"])
+
+
+def test_rc4_is_its_own_inverse(client):
+    plain = os.urandom(1000)
+    headers = {"X-CryptoLab-Key": "0102030405"}
+    cipher = _binary(client, "rc4/encrypt", plain, **headers).content
+    assert cipher != plain
+    assert _binary(client, "rc4/encrypt", cipher, **headers).content == plain
+
+    hexed = unwrap(client.post(
+        "/api/modern/rc4/keystream", json={"plaintext_hex": plain.hex(), "key_hex": "0102030405"}
+    ))
+    assert cipher.hex() == hexed["cipher_hex"]
+
+
+def test_chacha20_matches_rfc8439(client):
+    # RFC 8439 §2.8.2.
+    plain = (
+        b"Ladies and Gentlemen of the class of '99: If I could offer you only one "
+        b"tip for the future, sunscreen would be it."
+    )
+    response = _binary(
+        client,
+        "chacha20poly1305/encrypt",
+        plain,
+        **{
+            "X-CryptoLab-Key": bytes(range(0x80, 0xA0)).hex(),
+            "X-CryptoLab-Nonce": "070000004041424344454647",
+            "X-CryptoLab-AAD": "50515253c0c1c2c3c4c5c6c7",
+        },
+    )
+    assert len(response.content) == len(plain) + 16
+    assert response.content[:4].hex() == "d31a8d34"
+    assert response.content[-16:].hex() == "1ae10b594f09e26a7e902ecbd0600691"
+
+
+def test_errors_stay_json_envelopes(client):
+    missing = _binary(client, "aesmodes/encrypt-cbc", PLAIN, **{"X-CryptoLab-Key": KEY})
+    assert missing.status_code == 400
+    assert "x-cryptolab-iv" in error_of(missing)["message"]
+
+    ragged = _binary(client, "aesmodes/encrypt-ecb", PLAIN[:15], **{"X-CryptoLab-Key": KEY})
+    assert error_of(ragged)["code"] == "invalid_input"
+
+    not_hex = _binary(client, "rc4/encrypt", b"x", **{"X-CryptoLab-Key": "zz"})
+    assert error_of(not_hex)["code"] == "invalid_input"
+
+    short_nonce = _binary(
+        client,
+        "chacha20poly1305/encrypt",
+        b"x",
+        **{"X-CryptoLab-Key": "00" * 32, "X-CryptoLab-Nonce": "00"},
+    )
+    assert "nonce" in error_of(short_nonce)["message"]
+
+
+def test_body_is_capped(client):
+    response = _binary(
+        client, "aesmodes/encrypt-ecb", bytes(MAX_BYTES + 16), **{"X-CryptoLab-Key": KEY}
+    )
+    assert response.status_code == 400
+    assert error_of(response)["details"] == {"max_bytes": MAX_BYTES}
+
+    def chunks():
+        # Sans Content-Length : la borne est verifiee pendant la lecture.
+        for _ in range(3):
+            yield bytes(MAX_BYTES // 2)
+
+    response = client.post(
+        "/api/binary/rc4/encrypt", content=chunks(), headers={"X-CryptoLab-Key": "01"}
+    )
+    assert error_of(response)["details"] == {"max_bytes": MAX_BYTES}
+
+
+def test_binary_operations_are_measured(client):
+    from registry import instrumentation
+
+    instrumentation.OPERATIONS.clear()
+    _binary(client, "aesmodes/encrypt-ecb", PLAIN * 4, **{"X-CryptoLab-Key": KEY})
+    snapshot = instrumentation.OPERATIONS.snapshot()
+    operations = {(row["algorithm"], row["operation"]) for row in snapshot}
+    assert ("aesmodes", "encrypt-ecb:binary") in operations
+
+
+# --- Flux ---
+
+def _pieces(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.mark.parametrize("size", [0, 1, 15, 16, 17, 4099])
+@pytest.mark.parametrize("mode", ["ecb", "cbc", "ctr"])
+def test_stream_encryptor_matches_one_shot(mode, size):
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import pad
+
+    from utils.modes_tool import StreamEncryptor
+
+    key, iv, data = bytes.fromhex(KEY), bytes.fromhex(IV), os.urandom(size)
+    encryptor = StreamEncryptor(mode, key, iv)
+    streamed = b"".join(encryptor.update(piece) for piece in _pieces(data, 7))
+    streamed += encryptor.finalize()
+
+    if mode == "ecb":
+        expected = AES.new(key, AES.MODE_ECB).encrypt(pad(data, 16))
+    elif mode == "cbc":
+        expected = AES.new(key, AES.MODE_CBC, iv=iv).encrypt(pad(data, 16))
+    else:
+        expected = AES.new(key, AES.MODE_CTR, nonce=b"", initial_value=iv).encrypt(data)
+    assert streamed == expected
+
+
+def test_stream_route_carries_state_across_chunks(client):
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import pad
+
+    data = os.urandom(300_000)
+    response = client.post(
+        "/api/binary/aesmodes/stream/cbc",
+        content=_pieces(data, 65_536),
+        headers={"X-CryptoLab-Key": KEY, "X-CryptoLab-IV": IV},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    cipher = AES.new(bytes.fromhex(KEY), AES.MODE_CBC, iv=bytes.fromhex(IV))
+    expected = cipher.encrypt(pad(data, 16))
+    assert response.content == expected
+
+
+def test_stream_checks_parameters_before_answering(client):
+    response = client.post(
+        "/api/binary/aesmodes/stream/ctr", content=b"abc", headers={"X-CryptoLab-Key": KEY}
+    )
+    assert response.status_code == 400
+    assert error_of(response)["code"] == "invalid_input"
+
+    bad_key = client.post(
+        "/api/binary/aesmodes/stream/ecb", content=b"abc", headers={"X-CryptoLab-Key": "00"}
+    )
+    assert "16, 24 ou 32" in error_of(bad_key)["message"]
+
+
+def test_stream_cap(client, monkeypatch):
+    from routers import binary
+
+    monkeypatch.setattr(binary, "STREAM_MAX_BYTES", 1000)
+    declared = client.post(
+        "/api/binary/aesmodes/stream/ecb", content=bytes(1001), headers={"X-CryptoLab-Key": KEY}
+    )
+    assert error_of(declared)["details"] == {"max_bytes": 1000}
+
+    # Sans Content-Length, la reponse a deja commence : le flux est coupe.
+    with pytest.raises(binary.StreamAborted):
+        client.post(
+            "/api/binary/aesmodes/stream/ecb",
+            content=_pieces(bytes(2000), 600),
+            headers={"X-CryptoLab-Key": KEY},
+        )
+
+
+# --- Pingouin ECB sur une image ---
+
+def _bmp(width: int = 64, height: int = 48) -> bytes:
+    """BMP 24 bits en bandes de couleur unie : des aplats, comme le pingouin."""
+    rows = []
+    for y in range(height):
+        colour = bytes([(y // 8) * 40 % 256, 200, 30])
+        row = colour * width
+        row += bytes(-len(row) % 4)
+        rows.append(row)
+    pixels = b"".join(rows)
+    offset = 14 + 40
+    header = (
+        b"BM"
+        + (offset + len(pixels)).to_bytes(4, "little")
+        + bytes(4)
+        + offset.to_bytes(4, "little")
+        + (40).to_bytes(4, "little")
+        + width.to_bytes(4, "little")
+        + height.to_bytes(4, "little")
+        + (1).to_bytes(2, "little")
+        + (24).to_bytes(2, "little")
+        + bytes(24)
+    )
+    return header + pixels
+
+
+PPM = b"P6\n# un commentaire\n7 3\n255\n" + bytes(range(63))
+
+
+def _blocks(data: bytes) -> list[bytes]:
+    return [bytes(data[i:i + 16]) for i in range(0, len(data) - len(data) % 16, 16)]
+
+
+def test_image_headers_are_parsed():
+    from utils.image_tool import parse_header
+
+    bmp = parse_header(_bmp())
+    assert (bmp.format, bmp.offset, bmp.width, bmp.height) == ("bmp", 54, 64, 48)
+    ppm = parse_header(PPM)
+    assert (ppm.format, ppm.offset, ppm.width, ppm.height) == ("ppm", len(PPM) - 63, 7, 3)
+
+    assert parse_header(PPM[:10]) is None
+    assert parse_header(_bmp()[:20]) is None
+    with pytest.raises(InvalidInput):
+        parse_header(b"GIF89a...")
+
+
+def test_ecb_keeps_the_outline_and_the_header():
+    from Crypto.Cipher import AES
+
+    from utils.image_tool import encrypt_image
+
+    image = _bmp()
+    summary, images = encrypt_image(image, bytes.fromhex(KEY), bytes.fromhex(IV))
+    assert summary["clear_tail_bytes"] == 0
+    for encrypted in images.values():
+        assert len(encrypted) == len(image)
+        assert encrypted[:54] == image[:54]
+
+    # Six bandes de couleur : six blocs distincts en ECB, du bruit en CBC/CTR.
+    assert len(set(_blocks(images["ecb"][54:]))) <= 3 * 6
+    assert len(set(_blocks(images["cbc"][54:]))) == len(_blocks(image[54:]))
+    ctr = AES.new(bytes.fromhex(KEY), AES.MODE_CTR, nonce=b"", initial_value=bytes.fromhex(IV))
+    assert images["ctr"][54:] == ctr.encrypt(image[54:])
+
+
+def test_partial_last_block_stays_clear_except_in_ctr():
+    from utils.image_tool import encrypt_image
+
+    summary, images = encrypt_image(PPM, bytes.fromhex(KEY), bytes(16))
+    assert summary["clear_tail_bytes"] == 15
+    assert images["ecb"][-15:] == PPM[-15:] == images["cbc"][-15:]
+    assert images["ctr"][-15:] != PPM[-15:]
+
+
+def _parts(response) -> list[tuple[bytes, bytes]]:
+    boundary = response.headers["content-type"].split("boundary=")[1].encode()
+    chunks = response.content.split(b"--" + boundary)
+    assert chunks[0] == b"" and chunks[-1] == b"--\r\n"
+    parts = []
+    for chunk in chunks[1:-1]:
+        head, _, body = chunk[2:].partition(b"\r\n\r\n")
+        parts.append((head, body[:-2]))
+    return parts
+
+
+def test_penguin_route_returns_three_images(client):
+    import json
+
+    image = _bmp()
+    response = client.post(
+        "/api/binary/aesmodes/penguin", content=image, headers={"X-CryptoLab-Key": KEY}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("multipart/mixed")
+    (summary_head, summary), *images = _parts(response)
+    assert b"application/json" in summary_head
+    assert json.loads(summary)["modes"] == ["ecb", "cbc", "ctr"]
+    assert [b'filename="penguin-ecb.bmp"' in head for head, _ in images] == [True, False, False]
+    for head, body in images:
+        assert b"image/bmp" in head
+        assert body[:54] == image[:54] and len(body) == len(image)
+
+
+@pytest.mark.parametrize("mode", ["ecb", "cbc", "ctr"])
+def test_penguin_stream_matches_the_multipart_image(client, mode):
+    from utils.image_tool import encrypt_image
+
+    image = _bmp(width=333, height=97)
+    _, expected = encrypt_image(image, bytes.fromhex(KEY), bytes.fromhex(IV))
+    response = client.post(
+        f"/api/binary/aesmodes/penguin?mode={mode}",
+        content=_pieces(image, 1000),
+        headers={"X-CryptoLab-Key": KEY, "X-CryptoLab-IV": IV},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/bmp"
+    assert response.content == expected[mode]
+
+
+def test_penguin_refuses_what_is_not_an_image(client):
+    for path in ("/api/binary/aesmodes/penguin", "/api/binary/aesmodes/penguin?mode=ecb"):
+        response = client.post(path, content=b"%PDF-1.7 ...", headers={"X-CryptoLab-Key": KEY})
+        assert response.status_code == 400
+        assert "Format non reconnu" in error_of(response)["message"]
+
+    truncated = client.post(
+        "/api/binary/aesmodes/penguin?mode=cbc", content=PPM[:12], headers={"X-CryptoLab-Key": KEY}
+    )
+    assert "tronquee" in error_of(truncated)["message"]
@@ -0,0 +1,40 @@
+"""Tests de la lecture tolerante de l'environnement (utils/env.py)."""
+
+from __future__ import annotations
+
+import logging
+
+from utils.env import env_flag, env_float, env_int
+
+NAME = "CRYPTOLAB_TEST_SETTING"
+
+
+def test_absent_or_empty_values_take_the_default(monkeypatch):
+    monkeypatch.delenv(NAME, raising=False)
+    assert env_int(NAME, 7) == 7
+    monkeypatch.setenv(NAME, "  ")
+    assert env_float(NAME, 2.5) == 2.5
+    assert env_flag(NAME) is False
+
+
+def test_values_are_clamped(monkeypatch):
+    monkeypatch.setenv(NAME, "-3")
+    assert env_int(NAME, 7) == 0
+    assert env_int(NAME, 7, minimum=1) == 1
+    monkeypatch.setenv(NAME, "4.5")
+    assert env_float(NAME, 0.0, maximum=1.0) == 1.0
+
+
+def test_malformed_value_warns_and_keeps_the_default(monkeypatch, caplog):
+    monkeypatch.setenv(NAME, "16MB")
+    with caplog.at_level(logging.WARNING, logger="utils.env"):
+        assert env_int(NAME, 1024) == 1024
+        assert env_float(NAME, 0.5) == 0.5
+    assert len(caplog.records) == 2
+    assert NAME in caplog.records[0].getMessage()
+
+
+def test_flag_is_true_only_for_true(monkeypatch):
+    for raw, expected in (("true", True), ("TRUE", True), ("1", False), ("yes", False)):
+        monkeypatch.setenv(NAME, raw)
+        assert env_flag(NAME) is expected
@@ -0,0 +1,76 @@
+"""
+Tests de l'encodage de l'enveloppe : le chemin rapide doit produire le meme
+JSON que `jsonable_encoder` + `JSONResponse`, avec ou sans orjson.
+"""
+
+from __future__ import annotations
+
+import json
+from enum import Enum
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from registry import envelope
+from utils import step_visualizer
+
+
+class _Color(str, Enum):
+    RED = "red"
+
+
+class _Point(BaseModel):
+    x: int
+    label: str
+
+
+def _reference(data) -> dict:
+    return {"ok": True, "data": jsonable_encoder(data), "error": None}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(envelope, "orjson", None)
+    elif envelope.orjson is None:
+        pytest.skip("orjson n'est pas installe")
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"text": "été", "n": 3, "ratio": 0.5, "flag": True, "none": None},
+        {"steps": [{"round": i, "state": ["00", "ff"]} for i in range(3)]},
+        {"tuple": (1, 2), "nested": {"deep": [[1], [2, {"x": "y"}]]}},
+        # Hors du chemin rapide : repli sur jsonable_encoder.
+        {"model": _Point(x=1, label="a"), "enum": _Color.RED, "raw": b"abc"},
+        # Entier au-dela de 64 bits, frequent en RSA.
+        {"modulus": 2**2048 + 1},
+    ],
+)
+def test_encoding_matches_jsonable_encoder(backend, data):
+    assert json.loads(envelope.encode_success(data)) == _reference(data)
+
+
+def test_real_simulator_output_round_trips(backend):
+    data = step_visualizer.simulate_sha256("abc")
+    assert envelope.is_primitive(data)
+    assert json.loads(envelope.encode_success(data)) == _reference(data)
+
+
+def test_primitive_check_is_exact():
+    assert envelope.is_primitive({"a": [1, "b", None, (2.0, True)]})
+    assert not envelope.is_primitive({1: "clef non textuelle"})
+    assert not envelope.is_primitive({"enum": _Color.RED})
+    assert not envelope.is_primitive([_Point(x=1, label="a")])
+
+
+def test_failure_frame(backend):
+    body = json.loads(envelope.encode_failure("invalid_input", "Non.", {"field": "x"}))
+    assert body == {
+        "ok": False,
+        "data": None,
+        "error": {"code": "invalid_input", "message": "Non.", "details": {"field": "x"}},
+    }
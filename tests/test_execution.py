@@ -0,0 +1,109 @@
+"""
+Tests des classes d'execution : boucle d'evenements, threads, pool de processus.
+
+Le contrat verifie ici : une operation lourde rend le meme resultat qu'elle
+tourne dans le processus du serveur ou dans le pool, ses erreurs metier
+traversent le pool intactes, et une classe saturee refuse en 503 au lieu
+d'empiler les requetes.
+"""
+
+from __future__ import annotations
+
+import pickle
+
+import pytest
+
+from registry import Execution, InvalidInput, ServerBusy, execution, registry
+from tests.conftest import error_of, unwrap
+
+
+def test_heavy_and_trivial_operations_declare_their_class():
+    def execution_of(slug, name):
+        return registry.get(slug).operation(name).execution
+
+    assert execution_of("bcrypt", "hash") is Execution.PROCESS
+    assert execution_of("scrypt", "derive") is Execution.PROCESS
+    assert execution_of("rsa", "generate-keys") is Execution.PROCESS
+    # L'attaque orchestre dans un thread ; ses blocs partent dans le pool.
+    assert execution_of("paddingoracle", "attack") is Execution.THREAD
+    assert execution_of("caesar", "encrypt") is Execution.INLINE
+    # Le defaut reste le pool de threads.
+    assert execution_of("vigenere", "encrypt") is Execution.THREAD
+
+
+def test_process_operation_runs_in_the_pool(client):
+    body = {"password": "password", "salt_hex": "4e61436c", "n": 16, "r": 1, "p": 1, "dklen": 16}
+    data = unwrap(client.post("/api/hash/scrypt", json=body))
+
+    assert data["algorithm"] == "scrypt"
+    assert data["action"] == "derive"
+    # Le meme handler, appele directement, doit donner le meme resultat.
+    operation = registry.get("scrypt").operation("derive")
+    direct = operation.handler(operation.input_model.model_validate(body))
+    assert {k: v for k, v in data.items() if k not in ("algorithm", "action")} == direct
+
+
+def test_process_operation_runs_inline_when_the_pool_is_disabled(client, monkeypatch):
+    monkeypatch.setattr(execution, "PROCESS_WORKERS", 0)
+    data = unwrap(client.post("/api/hash/bcrypt", json={"text": "abc", "cost": 4}))
+
+    assert data["hash"].startswith("$2")
+
+
+def test_fan_out_without_a_pool_charges_its_cpu_once(monkeypatch):
+    from registry import instrumentation
+    from utils import padding_oracle
+
+    monkeypatch.setattr(execution, "PROCESS_WORKERS", 0)
+    key_hex, iv_hex = "00" * 16, "11" * 16
+    cipher_hex = padding_oracle.encrypt_for_oracle(key_hex, iv_hex, "Seize blocs " * 20)["cipher_hex"]
+    algorithm = registry.get("paddingoracle")
+    operation = algorithm.operation("attack")
+    payload = operation.input_model(key_hex=key_hex, iv_hex=iv_hex, cipher_hex=cipher_hex)
+
+    with instrumentation.measure("paddingoracle", "attack") as sample:
+        execution.run(algorithm, operation, payload)
+
+    # Un seul thread calcule : son CPU ne peut pas depasser le temps ecoule.
+    assert sample.cpu <= sample.wall + 0.005
+
+
+def test_errors_keep_their_details_across_the_pool():
+    error = InvalidInput("Entree refusee.", details={"field": "salt_hex"})
+    copy = pickle.loads(pickle.dumps(error))
+
+    assert type(copy) is InvalidInput
+    assert copy.message == "Entree refusee."
+    assert copy.details == {"field": "salt_hex"}
+
+
+@pytest.mark.parametrize("kind", [Execution.PROCESS, Execution.THREAD])
+def test_saturated_class_is_refused_with_503(client, monkeypatch, kind):
+    monkeypatch.setattr(execution.GATES[kind], "capacity", 0)
+    if kind is Execution.PROCESS:
+        response = client.post("/api/hash/bcrypt", json={"text": "abc", "cost": 4})
+    else:
+        response = client.post("/api/classical/vigenere/encrypt", json={"text": "abc", "key": "k"})
+
+    assert response.status_code == 503
+    error = error_of(response)
+    assert error["code"] == "server_busy"
+    assert error["details"]["execution"] == kind.value
+
+
+def test_inline_operations_are_never_refused(client, monkeypatch):
+    for gate in execution.GATES.values():
+        monkeypatch.setattr(gate, "capacity", 0)
+    data = unwrap(client.post("/api/classical/caesar/encrypt", json={"text": "abc", "shift": 1}))
+
+    assert data["cipher"] == "bcd"
+
+
+def test_gate_is_released_after_a_failure():
+    gate = execution.Gate("test", 1)
+    with pytest.raises(RuntimeError), gate:
+        raise RuntimeError("boom")
+
+    assert gate.in_flight == 0
+    with gate, pytest.raises(ServerBusy), gate:
+        pass
@@ -0,0 +1,96 @@
+"""Tests de la mesure des operations : percentiles, CPU, pic, Server-Timing."""
+
+from __future__ import annotations
+
+from registry import instrumentation
+from registry.instrumentation import OperationStats, Sample
+from tests.conftest import unwrap
+
+
+def _row(rows, algorithm, operation):
+    return next(r for r in rows if r["algorithm"] == algorithm and r["operation"] == operation)
+
+
+def test_percentiles_use_the_nearest_rank_over_the_window():
+    stats = OperationStats(window=100)
+    for ms in range(1, 201):
+        stats.record("aes", "encrypt", Sample(wall=ms / 1000, cpu=ms / 2000))
+
+    row = _row(stats.snapshot(), "aes", "encrypt")
+    # Seules les 100 dernieres mesures (101..200 ms) restent dans la fenetre.
+    assert row["count"] == 200
+    assert row["window"] == 100
+    assert row["wall_ms"] == {"p50": 150.0, "p95": 195.0, "p99": 199.0}
+    assert row["cpu_ms"]["p50"] == 75.0
+    assert row["peak_bytes"] is None
+    # Le cumul CPU porte sur toutes les mesures, pas sur la seule fenetre.
+    assert row["cpu_seconds_total"] == round(sum(range(1, 201)) / 2000, 6)
+
+
+def test_snapshot_puts_the_most_cpu_hungry_operation_first():
+    stats = OperationStats()
+    stats.record("caesar", "encrypt", Sample(cpu=0.001))
+    stats.record("scrypt", "derive", Sample(cpu=0.5))
+    assert [r["algorithm"] for r in stats.snapshot()] == ["scrypt", "caesar"]
+
+
+def test_handler_cost_is_charged_to_the_current_measure(monkeypatch):
+    monkeypatch.setattr(instrumentation, "OPERATIONS", OperationStats())
+    monkeypatch.setattr(instrumentation, "TRACE_ALLOC", True)
+
+    def handler(n):
+        blob = bytearray(n)
+        return sum(range(50_000)) + len(blob)
+
+    with instrumentation.measure("demo", "run") as sample:
+        instrumentation.call(handler, 1_000_000)
+
+    assert sample.cpu > 0
+    assert sample.wall >= sample.cpu * 0.5
+    assert sample.peak >= 1_000_000
+    assert _row(instrumentation.OPERATIONS.snapshot(), "demo", "run")["peak_bytes"]["p50"] >= 1_000_000
+
+
+def test_failed_operations_are_not_recorded(monkeypatch):
+    monkeypatch.setattr(instrumentation, "OPERATIONS", OperationStats())
+    try:
+        with instrumentation.measure("demo", "fail"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert instrumentation.OPERATIONS.snapshot() == []
+
+
+def test_routes_feed_the_operations_endpoint(client, monkeypatch):
+    monkeypatch.setattr(instrumentation, "OPERATIONS", OperationStats())
+    body = {"text": "HELLO", "shift": 3}
+    unwrap(client.post("/api/classical/caesar/encrypt", json=body))
+    unwrap(client.post("/api/batch", json={"items": [
+        {"algorithm": "caesar", "operation": "encrypt", "input": body},
+    ]}))
+
+    data = unwrap(client.get("/api/metrics/operations"))
+    row = _row(data["operations"], "caesar", "encrypt")
+    assert row["count"] == 2
+    assert set(row["wall_ms"]) == {"p50", "p95", "p99"}
+
+
+def test_process_operations_report_the_worker_cpu(client, monkeypatch):
+    monkeypatch.setattr(instrumentation, "OPERATIONS", OperationStats())
+    body = {"password": "password", "salt_hex": "4e61436c", "n": 1024, "r": 8, "p": 1, "dklen": 16}
+    unwrap(client.post("/api/hash/scrypt", json=body))
+
+    row = _row(instrumentation.OPERATIONS.snapshot(), "scrypt", "derive")
+    assert row["cpu_seconds_total"] > 0
+
+
+def test_server_timing_header_is_opt_in(client, monkeypatch):
+    body = {"text": "HELLO", "shift": 3}
+    response = client.post("/api/classical/caesar/encrypt", json=body)
+    assert "server-timing" not in response.headers
+
+    monkeypatch.setattr(instrumentation, "SERVER_TIMING", True)
+    response = client.post("/api/classical/caesar/encrypt", json=body)
+    header = response.headers["server-timing"]
+    assert header.startswith("op;dur=")
+    assert "cpu;dur=" in header
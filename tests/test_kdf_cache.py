@@ -0,0 +1,78 @@
+"""Tests du cache des cles PBKDF2 des outils symetriques."""
+
+from __future__ import annotations
+
+import pytest
+
+from tests.conftest import unwrap
+from utils import aes_tool, kdf_cache
+from utils.hash_tool import pbkdf2_derive
+from utils.kdf_cache import KdfCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+def test_disabled_cache_always_derives():
+    cache = KdfCache(enabled=False)
+    assert cache.derive("phrase", b"sel", 10, 16) == pbkdf2_derive("phrase", b"sel", 10, 16)
+    assert cache.stats()["size"] == 0 and cache.stats()["misses"] == 0
+
+
+def test_hit_returns_the_same_key(clock):
+    cache = KdfCache(enabled=True, ttl=60, maxsize=4, clock=clock)
+    first = cache.derive("phrase", b"sel", 10, 16)
+    assert cache.derive("phrase", b"sel", 10, 16) == first
+    assert cache.derive("phrase", b"autre-sel", 10, 16) != first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_index_never_holds_the_passphrase(clock):
+    cache = KdfCache(enabled=True, clock=clock)
+    cache.derive("phrase-secrete", b"sel", 10, 16)
+    (index,) = cache._entries
+    assert b"phrase-secrete" not in repr(index).encode()
+
+
+def test_expired_entries_are_zeroised(clock):
+    cache = KdfCache(enabled=True, ttl=60, maxsize=4, clock=clock)
+    cache.derive("phrase", b"sel", 10, 16)
+    (_, buffer), = cache._entries.values()
+
+    clock.now = 61
+    assert cache.stats()["size"] == 0
+    assert buffer == bytearray(16)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_size_bound_evicts_oldest(clock):
+    cache = KdfCache(enabled=True, ttl=60, maxsize=2, clock=clock)
+    for salt in (b"a", b"b", b"c"):
+        cache.derive("phrase", salt, 10, 16)
+    cache.derive("phrase", b"a", 10, 16)
+    assert cache.stats() | {"ttl_seconds": None} == {
+        "name": "pbkdf2", "enabled": True, "size": 2, "maxsize": 2, "ttl_seconds": None,
+        "hits": 0, "misses": 4, "evictions": 2, "hit_ratio": 0.0,
+    }
+
+
+def test_decrypt_after_encrypt_hits_the_cache(monkeypatch, client):
+    cache = KdfCache(enabled=True)
+    monkeypatch.setattr(kdf_cache, "KDF_CACHE", cache)
+
+    encrypted = aes_tool.encrypt_aes_gcm("bonjour", "phrase")
+    assert aes_tool.decrypt_aes_gcm(key="phrase", **encrypted) == "bonjour"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    caches = unwrap(client.get("/api/metrics/caches"))["caches"]
+    assert next(c for c in caches if c["name"] == "pbkdf2")["hit_ratio"] == 0.5
@@ -0,0 +1,78 @@
+"""Tests du cache des key schedules et de son endpoint de metriques."""
+
+from __future__ import annotations
+
+import pytest
+
+from tests.conftest import unwrap
+from utils import aes_simulator, des_simulator
+from utils.key_schedule_cache import SCHEDULES, KeyScheduleCache, Schedule
+
+
+@pytest.fixture(autouse=True)
+def _cold_cache():
+    SCHEDULES.clear()
+    yield
+    SCHEDULES.clear()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = KeyScheduleCache("test", maxsize=2)
+    builds = []
+
+    def build(key: bytes) -> Schedule:
+        builds.append(key)
+        return Schedule((key,))
+
+    cache.get("ns", b"a", build)
+    cache.get("ns", b"b", build)
+    cache.get("ns", b"a", build)   # a redevient le plus recent
+    cache.get("ns", b"c", build)   # evince b
+    cache.get("ns", b"a", build)
+    cache.get("ns", b"b", build)
+
+    assert builds == [b"a", b"b", b"c", b"b"]
+    assert cache.stats() | {"name": None} == {
+        "name": None, "size": 2, "maxsize": 2, "hits": 2, "misses": 4, "hit_ratio": 0.3333,
+    }
+
+
+def test_namespaces_do_not_collide():
+    cache = KeyScheduleCache("test")
+    assert cache.get("aes", b"k", lambda k: "aes") == "aes"
+    assert cache.get("des", b"k", lambda k: "des") == "des"
+
+
+def test_zero_size_disables_storage():
+    cache = KeyScheduleCache("test", maxsize=0)
+    cache.get("ns", b"k", lambda k: 1)
+    cache.get("ns", b"k", lambda k: 1)
+    assert cache.stats()["size"] == 0 and cache.stats()["misses"] == 2
+
+
+def test_steps_are_fresh_copies():
+    schedule = Schedule((1,), ({"step": "KS-0"},))
+    schedule.steps()[0]["block"] = 3
+    assert schedule.trace[0] == {"step": "KS-0"}
+
+
+def test_repeated_simulations_hit_the_cache():
+    first = aes_simulator.simulate_aes_encrypt_multiblock("x" * 40, "Thats my Kung Fu")
+    misses = SCHEDULES.misses
+    second = aes_simulator.simulate_aes_encrypt_multiblock("x" * 40, "Thats my Kung Fu")
+    assert second == first
+    assert SCHEDULES.misses == misses and SCHEDULES.hits >= 1
+
+    encrypted = des_simulator.simulate_des_encrypt_multiblock("bonjour", "abcdefgh")
+    decrypted = des_simulator.simulate_des_decrypt_multiblock(encrypted["final_result_hex"], "abcdefgh")
+    assert decrypted["final_result"] == "bonjour"
+    # Le block_steps d'un bloc n'a pas contamine les etapes gardees en cache.
+    assert all("block" not in step for step in decrypted["steps"][:18])
+
+
+def test_cache_metrics_endpoint(client):
+    client.post("/api/simulate/aes", json={"text": "Two One Nine Two", "key": "Thats my Kung Fu"})
+    client.post("/api/simulate/aes", json={"text": "Two One Nine Two", "key": "Thats my Kung Fu"})
+    caches = unwrap(client.get("/api/metrics/caches"))["caches"]
+    schedules = next(c for c in caches if c["name"] == "key_schedules")
+    assert schedules["hits"] >= 1 and schedules["size"] >= 1
@@ -8,6 +8,8 @@ sans jamais lire la cle — sur plusieurs textes, tailles et le PKCS#7 nu.
 
 from __future__ import annotations
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -87,3 +89,200 @@ def test_official_vector_matches_registry():
     """Le meme vecteur que celui verrouille dans registry/catalog/symmetric.py."""
     result = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, "Attaque")
     assert result == {"cipher_hex": "b4e262df6ef2d4d08dc50af8c4d9aed3", "block_count": 1}
+
+
+# --- Moteur parallele : comptage exact, repartition, progression -------------
+
+def test_attack_counts_every_oracle_query():
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, "Compte exact des questions")
+    key = bytes.fromhex(KEY_HEX)
+    cipher = bytes.fromhex(enc["cipher_hex"])
+    result = padding_oracle.padding_oracle_attack(KEY_HEX, IV_HEX, enc["cipher_hex"])
+
+    prev_blocks = [bytes.fromhex(IV_HEX), cipher[:16]]
+    per_block = [
+        padding_oracle.recover_block(key, prev, cipher[i * 16:(i + 1) * 16], last=i == 1)[1]
+        for i, prev in enumerate(prev_blocks)
+    ]
+    assert result["blocks"] == 2
+    assert result["queries"] == sum(per_block)
+    # Au moins une question par octet, au plus 256 plus la sonde anti faux positif.
+    for count in per_block:
+        assert 16 <= count <= 256 * 16 + 1
+
+
+def test_oracle_agrees_with_the_cbc_oracle():
+    key = bytes.fromhex(KEY_HEX)
+    oracle = padding_oracle.PaddingOracle(key)
+    enc = bytes.fromhex(padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, "bloc")["cipher_hex"])
+    for last in range(256):
+        iv = bytes(15) + bytes([last])
+        assert oracle(iv, enc) == padding_oracle.has_valid_padding(key, iv, enc)
+    assert oracle.queries == 256
+
+
+def test_attack_does_not_depend_on_the_block_order():
+    plaintext = "Les blocs sont independants : l'ordre de calcul est libre."
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, plaintext)
+
+    def backwards(fn, calls):
+        for index in reversed(range(len(calls))):
+            yield index, fn(*calls[index])
+
+    forward = padding_oracle.padding_oracle_attack(KEY_HEX, IV_HEX, enc["cipher_hex"])
+    reverse = padding_oracle.padding_oracle_attack(
+        KEY_HEX, IV_HEX, enc["cipher_hex"], fan_out=backwards
+    )
+    assert reverse == forward
+    assert reverse["plain"] == plaintext
+
+
+def test_attack_through_the_process_pool():
+    from registry import execution
+
+    plaintext = "Trois blocs, trois processus au plus."
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, plaintext)
+    pooled = padding_oracle.padding_oracle_attack(
+        KEY_HEX, IV_HEX, enc["cipher_hex"], fan_out=execution.fan_out
+    )
+    assert pooled == padding_oracle.padding_oracle_attack(KEY_HEX, IV_HEX, enc["cipher_hex"])
+
+
+def test_attack_streams_one_event_per_block():
+    plaintext = "Chaque bloc arrive des qu'il est retrouve."
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, plaintext)
+    response = client.post("/api/modern/paddingoracle/attack/stream", json={
+        "key_hex": KEY_HEX, "iv_hex": IV_HEX, "cipher_hex": enc["cipher_hex"],
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    blocks = [event["data"] for event in events[:-1]]
+    assert {event["event"] for event in events[:-1]} == {"block"}
+    assert sorted(block["block"] for block in blocks) == list(range(enc["block_count"]))
+
+    result = events[-1]
+    assert result["event"] == "result"
+    assert result["data"]["plain"] == plaintext
+    assert result["data"]["queries"] == sum(block["queries"] for block in blocks)
+    ordered = b"".join(
+        bytes.fromhex(block["plain_hex"]) for block in sorted(blocks, key=lambda b: b["block"])
+    )
+    assert padding_oracle.pkcs7_unpad(ordered).decode() == plaintext
+
+
+def test_attack_stream_refuses_bad_input_before_streaming():
+    response = client.post("/api/modern/paddingoracle/attack/stream", json={
+        "key_hex": KEY_HEX, "iv_hex": IV_HEX, "cipher_hex": "abcd",
+    })
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "invalid_input"
+
+
+def test_attack_stream_is_gated_like_the_generated_route(monkeypatch):
+    from registry import execution
+    from registry.spec import Execution
+
+    monkeypatch.setattr(execution.GATES[Execution.THREAD], "capacity", 0)
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, "Jauge pleine.")
+    response = client.post("/api/modern/paddingoracle/attack/stream", json={
+        "key_hex": KEY_HEX, "iv_hex": IV_HEX, "cipher_hex": enc["cipher_hex"],
+    })
+
+    assert response.status_code == 503
+    assert response.json()["error"]["code"] == "server_busy"
+
+
+def test_attack_stream_is_measured_and_releases_its_gate(monkeypatch):
+    from registry import execution, instrumentation
+    from registry.instrumentation import OperationStats
+    from registry.spec import Execution
+
+    monkeypatch.setattr(instrumentation, "OPERATIONS", OperationStats())
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, "Mesuree, puis relachee.")
+    response = client.post("/api/modern/paddingoracle/attack/stream", json={
+        "key_hex": KEY_HEX, "iv_hex": IV_HEX, "cipher_hex": enc["cipher_hex"],
+    })
+
+    assert json.loads(response.text.splitlines()[-1])["event"] == "result"
+    rows = instrumentation.OPERATIONS.snapshot()
+    assert [(row["algorithm"], row["operation"]) for row in rows] == [("paddingoracle", "attack")]
+    assert execution.GATES[Execution.THREAD].in_flight == 0
+
+
+# --- Ordre des essais : clairs probables d'abord -----------------------------
+
+def test_guess_orders_are_permutations():
+    everything = list(range(256))
+    assert sorted(padding_oracle.TEXT_ORDER) == everything
+    assert sorted(padding_oracle.PADDING_ORDER) == everything
+    assert padding_oracle.PADDING_ORDER[:16] == bytes(range(1, 17))
+
+
+def test_frequency_order_saves_queries_on_text():
+    plaintext = "Le bourrage fuit : Eloise dechiffre le message sans la cle. " * 3
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, plaintext)
+    ordered = padding_oracle.padding_oracle_attack(KEY_HEX, IV_HEX, enc["cipher_hex"])
+    numeric = padding_oracle.padding_oracle_attack(
+        KEY_HEX, IV_HEX, enc["cipher_hex"], strategy="numeric"
+    )
+
+    assert ordered["plain"] == numeric["plain"] == plaintext
+    assert ordered["strategy"] == "frequency"
+    assert numeric["queries_saved"] == 0
+    # Ce qui est "economise" est mesure : l'ordre numerique l'a bien paye.
+    assert ordered["queries"] + ordered["queries_saved"] == numeric["queries"]
+    assert numeric["queries"] > 4 * ordered["queries"]
+
+
+@pytest.mark.parametrize("tail", [b"\x02\x02", b"\x03\x03\x03"])
+def test_numeric_baseline_counts_the_false_positive_probe(tail):
+    # Octets intermediaires choisis : le bourrage `tail[0]` est deja en place
+    # avant le dernier octet, et l'essai qui le complete precede le bon dans
+    # l'ordre numerique. L'oracle y repond vrai, et le sondage coute une question.
+    from Crypto.Cipher import AES
+
+    key = bytes.fromhex(KEY_HEX)
+    intermediate = bytes(range(0x40, 0x40 + 16 - len(tail))) + tail
+    target = AES.new(key, AES.MODE_ECB).encrypt(intermediate)
+    prev = bytes.fromhex(IV_HEX)
+
+    plain, queries, numeric_queries = padding_oracle.recover_block(
+        key, prev, target, strategy="numeric"
+    )
+    assert plain == bytes(a ^ b for a, b in zip(intermediate, prev, strict=True))
+    assert queries == numeric_queries
+
+    ordered = padding_oracle.recover_block(key, prev, target)
+    assert ordered[0] == plain
+    assert ordered[2] == queries
+
+
+@pytest.mark.parametrize("plaintext", ["", "A", "Exactement seize!", "é" * 9])
+def test_frequency_order_recovers_padding_and_utf8(plaintext):
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, plaintext)
+    result = padding_oracle.padding_oracle_attack(KEY_HEX, IV_HEX, enc["cipher_hex"])
+    assert result["plain"] == plaintext
+    assert result["queries_saved"] > 0
+
+
+def test_unknown_strategy_is_refused():
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, "abc")
+    with pytest.raises(InvalidInput):
+        padding_oracle.padding_oracle_attack(KEY_HEX, IV_HEX, enc["cipher_hex"], strategy="random")
+
+
+def test_attack_strategy_through_the_api():
+    enc = padding_oracle.encrypt_for_oracle(KEY_HEX, IV_HEX, "Comparer les strategies")
+    body = {"key_hex": KEY_HEX, "iv_hex": IV_HEX, "cipher_hex": enc["cipher_hex"]}
+    ordered = unwrap(client.post("/api/modern/paddingoracle/attack", json=body))
+    numeric = unwrap(client.post(
+        "/api/modern/paddingoracle/attack", json={**body, "strategy": "numeric"}
+    ))
+
+    assert ordered["queries"] + ordered["queries_saved"] == numeric["queries"]
+    assert client.post(
+        "/api/modern/paddingoracle/attack", json={**body, "strategy": "random"}
+    ).status_code == 422
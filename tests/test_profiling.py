@@ -0,0 +1,103 @@
+"""Tests du profilage a la demande : jeton, echantillonnage, anneau des profils."""
+
+from __future__ import annotations
+
+import pytest
+
+from registry import profiling
+from registry.profiling import ProfileRing
+from tests.conftest import error_of, unwrap
+
+TOKEN = "jeton-de-test"
+ADMIN = {"X-CryptoLab-Admin": TOKEN}
+SIMULATION = {"text": "HELLO", "key": "KEY"}
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(profiling, "PROFILES", ProfileRing(size=2))
+
+
+def test_profiling_is_inert_by_default(client):
+    response = client.post("/api/simulate/aes?profile=1", json=SIMULATION, headers=ADMIN)
+    assert response.status_code == 200
+    assert "x-cryptolab-profile" not in response.headers
+    assert profiling.profiled("demo") is profiling._NOTHING
+
+
+def test_admin_request_is_profiled_and_readable(client, admin):
+    response = client.post("/api/simulate/aes?profile=1", json=SIMULATION, headers=ADMIN)
+    profile_id = int(response.headers["x-cryptolab-profile"])
+
+    profile = unwrap(client.get(f"/api/metrics/profiles/{profile_id}", headers=ADMIN))
+    assert profile["label"] == "simulate/aes"
+    assert profile["total_calls"] > 0
+    names = [row["function"] for row in profile["functions"]]
+    assert any("aes_simulator.py" in name for name in names)
+
+    listing = unwrap(client.get("/api/metrics/profiles", headers=ADMIN))
+    assert [p["id"] for p in listing["profiles"]] == [profile_id]
+    assert "functions" not in listing["profiles"][0]
+
+
+def test_registry_operations_are_profiled(client, admin):
+    response = client.post(
+        "/api/classical/vigenere/encrypt?profile=1", json=SIMULATION, headers=ADMIN
+    )
+    profile_id = int(response.headers["x-cryptolab-profile"])
+    assert profiling.PROFILES.get(profile_id)["label"] == "vigenere/encrypt"
+
+
+def test_binary_routes_profile_the_worker_thread(client, admin):
+    response = client.post(
+        "/api/binary/rc4/encrypt?profile=1&key_hex=4b6579",
+        content=b"x" * 4096,
+        headers={**ADMIN, "Content-Type": "application/octet-stream"},
+    )
+    profile_id = int(response.headers["x-cryptolab-profile"])
+
+    profile = profiling.PROFILES.get(profile_id)
+    assert profile["label"] == "rc4/encrypt:binary"
+    names = [row["function"] for row in profile["functions"]]
+    assert any("rc4_crypt" in name for name in names)
+
+
+def test_wrong_token_neither_profiles_nor_reads(client, admin):
+    wrong = {"X-CryptoLab-Admin": "autre"}
+    response = client.post("/api/simulate/aes?profile=1", json=SIMULATION, headers=wrong)
+    assert "x-cryptolab-profile" not in response.headers
+
+    for headers in (wrong, {}):
+        response = client.get("/api/metrics/profiles", headers=headers)
+        assert response.status_code == 403
+        assert error_of(response)["code"] == "forbidden"
+
+
+def test_sampled_profiles_are_readable_with_the_token(client, admin, monkeypatch):
+    monkeypatch.setattr(profiling, "SAMPLE_RATE", 1.0)
+    response = client.post("/api/simulate/caesar", json={"text": "HELLO", "shift": 3})
+    profile_id = int(response.headers["x-cryptolab-profile"])
+
+    profile = unwrap(client.get(f"/api/metrics/profiles/{profile_id}", headers=ADMIN))
+    assert profile["label"] == "simulate/caesar"
+
+
+def test_sampling_without_a_token_profiles_nothing(client, monkeypatch):
+    # Personne ne pourrait lire ces profils : le taux est ignore.
+    monkeypatch.setattr(profiling, "SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(profiling, "PROFILES", ProfileRing())
+    response = client.post("/api/simulate/caesar", json={"text": "HELLO", "shift": 3})
+    assert "x-cryptolab-profile" not in response.headers
+    assert profiling.PROFILES.listing() == []
+
+
+def test_ring_keeps_only_the_latest_profiles(client, admin):
+    ids = [
+        int(client.post("/api/simulate/caesar?profile=1", json={"text": "A", "shift": 1},
+                        headers=ADMIN).headers["x-cryptolab-profile"])
+        for _ in range(3)
+    ]
+    assert profiling.PROFILES.get(ids[0]) is None
+    assert [p["id"] for p in profiling.PROFILES.listing()] == ids[:0:-1]
+    assert client.get(f"/api/metrics/profiles/{ids[0]}", headers=ADMIN).status_code == 404
@@ -233,6 +233,55 @@ def test_catalog_search_matches_name_summary_and_aliases():
     assert "caesar" in [a["slug"] for a in by_name["algorithms"]]
 
 
+def test_catalog_search_ignores_accents_and_needs_every_word():
+    accented = unwrap(client.get("/api/algorithms", params={"q": "CÉSAR"}))
+    assert "caesar" in [a["slug"] for a in accented["algorithms"]]
+
+    both = [a["slug"] for a in unwrap(client.get("/api/algorithms", params={"q": "rsa 2048"}))["algorithms"]]
+    assert "rsa" in both
+    assert "ecdsa" not in both
+
+    nothing = unwrap(client.get("/api/algorithms", params={"q": "feistel quantique"}))
+    assert nothing["count"] == 0
+
+
+def test_catalog_search_combines_with_the_family_filter():
+    data = unwrap(client.get("/api/algorithms", params={"q": "cesar", "family": "hash"}))
+    assert data["count"] == 0
+
+    unknown = unwrap(client.get("/api/algorithms", params={"family": "quantique"}))
+    assert unknown["count"] == 0
+
+
+def test_catalog_is_revalidated_by_etag():
+    first = client.get("/api/algorithms")
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+
+    again = client.get("/api/algorithms", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    # Chaque representation a son propre ETag.
+    family = client.get("/api/algorithms", params={"family": "classical"})
+    assert family.headers["etag"] != etag
+    stale = client.get("/api/algorithms/sha256", headers={"If-None-Match": etag})
+    assert stale.status_code == 200
+
+
+def test_catalog_is_not_rebuilt_per_request(monkeypatch):
+    from registry.spec import Algorithm
+
+    def forbidden(_self):
+        raise AssertionError("describe() appele pendant une requete")
+
+    monkeypatch.setattr(Algorithm, "describe", forbidden)
+    assert client.get("/api/algorithms").status_code == 200
+    assert client.get("/api/algorithms/des").status_code == 200
+    assert client.get("/api/algorithms", params={"q": "hachage"}).status_code == 200
+
+
 def test_catalog_detail_exposes_the_vectors():
     data = unwrap(client.get("/api/algorithms/sha256"))
 
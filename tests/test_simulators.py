@@ -68,6 +68,46 @@ def test_aes_final_round_omits_mix_columns():
     assert final_round["mix_columns_out"] == "N/A"
 
 
+FIPS_KEY = bytes(range(16))
+FIPS_PLAIN = bytes.fromhex("00112233445566778899aabbccddeeff")
+FIPS_CIPHER = bytes.fromhex("69c4e0d86a7b0430d8cdb78070b4c55a")
+
+
+def test_aes_fast_core_fips197_vector():
+    """FIPS-197, annexe C.1 : le coeur a T-tables, dans les deux sens."""
+    round_keys = aes_simulator.expand_key_fast(FIPS_KEY)
+    assert len(round_keys) == 44
+    # Cle du round 10, annexe C.1 (« round[10].k_sch »).
+    assert round_keys[40:] == [0x13111D7F, 0xE3944A17, 0xF307A78B, 0x4D2B30C5]
+    assert aes_simulator.encrypt_block_fast(FIPS_PLAIN, round_keys) == FIPS_CIPHER
+
+    decryption_keys = aes_simulator.decryption_key_schedule(round_keys)
+    assert aes_simulator.decrypt_block_fast(FIPS_CIPHER, decryption_keys) == FIPS_PLAIN
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_aes_fast_core_matches_pycryptodome(seed):
+    rng = random.Random(seed)
+    key, block = rng.randbytes(16), rng.randbytes(16)
+    reference = AES.new(key, AES.MODE_ECB).encrypt(block)
+
+    round_keys = aes_simulator.expand_key_fast(key)
+    assert aes_simulator.encrypt_block_fast(block, round_keys) == reference
+    decryption_keys = aes_simulator.decryption_key_schedule(round_keys)
+    assert aes_simulator.decrypt_block_fast(reference, decryption_keys) == block
+
+
+def test_aes_fast_key_schedule_matches_traced_one():
+    words, _ = aes_simulator.key_to_words("Thats my Kung Fu")
+    traced, _ = aes_simulator.expand_key(words)
+    fast = aes_simulator.expand_key_fast(b"Thats my Kung Fu")
+    for rnd, state in enumerate(traced):
+        columns = [
+            int.from_bytes(bytes(state[r][c] for r in range(4)), "big") for c in range(4)
+        ]
+        assert columns == fast[rnd * 4:rnd * 4 + 4]
+
+
 # --- Arithmetique GF(2^8) ----------------------------------------------------
 
 def test_gf_multiplication_by_two():
@@ -87,6 +127,21 @@ def test_gf_multiplication_is_commutative():
             assert aes_math.gmul(a, b) == aes_math.gmul(b, a)
 
 
+def test_gf_tables_match_peasant_multiplication():
+    for a in range(256):
+        for b in range(256):
+            assert aes_math.gmul(a, b) == aes_math.gmul_peasant(a, b)
+    assert aes_math.MUL14 == [aes_math.gmul_peasant(x, 0x0E) for x in range(256)]
+
+
+def test_inv_mix_columns_undoes_mix_columns():
+    rng = random.Random(0)
+    for _ in range(50):
+        column = [rng.randrange(256) for _ in range(4)]
+        mixed = aes_math.mix_single_column(column)
+        assert aes_math.inv_mix_single_column(mixed) == column
+
+
 def test_mix_columns_reference_column():
     # Colonne de reference du FIPS-197
     assert aes_math.mix_single_column([0xDB, 0x13, 0x53, 0x45]) == [0x8E, 0x4D, 0xA1, 0xBC]
@@ -116,6 +171,30 @@ def test_des_generates_16_round_keys():
     assert all(len(rk) == 48 for rk in round_keys)
 
 
+def test_des_integer_core_reference_vector():
+    """Exemple classique (Grabbe) : cle 133457799BBCDFF1, clair 0123456789ABCDEF."""
+    round_keys = des_simulator.expand_round_keys(bytes.fromhex("133457799BBCDFF1"))
+    assert round_keys[0] == 0b000110110000001011101111111111000111000001110010  # K1
+    cipher = des_simulator.encrypt_block_fast(bytes.fromhex("0123456789ABCDEF"), round_keys)
+    assert cipher.hex().upper() == "85E813540F0AB405"
+    assert des_simulator.decrypt_block_fast(cipher, round_keys).hex().upper() == "0123456789ABCDEF"
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_des_integer_core_matches_pycryptodome(seed):
+    rng = random.Random(seed)
+    key, block = rng.randbytes(8), rng.randbytes(8)
+    round_keys = des_simulator.expand_round_keys(key)
+    assert des_simulator.encrypt_block_fast(block, round_keys) == DES.new(key, DES.MODE_ECB).encrypt(block)
+
+
+def test_des_integer_key_schedule_matches_bit_strings():
+    key_bits = des_simulator.key_to_bits("abcdefgh")
+    as_strings, _ = des_simulator.generate_round_keys(key_bits)
+    as_ints = des_simulator.expand_round_keys(b"abcdefgh")
+    assert [int(k, 2) for k in as_strings] == as_ints
+
+
 def test_des_permutation_helpers():
     assert des_simulator.xor("1100", "1010") == "0110"
     assert des_simulator.shift_left("10110", 2) == "11010"
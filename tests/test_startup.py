@@ -0,0 +1,86 @@
+"""
+Tests du demarrage : ce que `import main` charge, et combien de temps il prend.
+
+Chaque reveil d'instance sur le plan gratuit paie l'import de l'application.
+Les backends cryptographiques (PyCryptodome, cryptography, argon2, pymongo)
+ne doivent etre charges qu'a la premiere requete qui s'en sert.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from auth import service
+
+ROOT = Path(__file__).resolve().parent.parent
+
+#: Budget de `import main`, en millisecondes. Large : une CI partagee est lente,
+#: et le test doit attraper un retour des imports lourds, pas une gigue.
+IMPORT_BUDGET_MS = int(os.getenv("CRYPTOLAB_IMPORT_BUDGET_MS", "2500"))
+
+HEAVY = ("Crypto", "cryptography", "argon2", "bcrypt", "pymongo", "jwt")
+
+#: Outils de `utils/` qui tirent l'un de ces backends. Les implementations
+#: pedagogiques en Python pur (sha1_tool, playfair...) restent libres.
+HEAVY_TOOLS = ("aes_tool", "des_tool", "modes_tool", "rsa_tool", "signature_tool")
+
+
+def _python(*args: str) -> subprocess.CompletedProcess[str]:
+    env = {**os.environ, "CRYPTOLAB_JWT_SECRET": "test-demarrage"}
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def test_import_main_loads_no_crypto_backend():
+    loaded = json.loads(_python(
+        "-c", "import json, sys, main; print(json.dumps(sorted(sys.modules)))"
+    ).stdout)
+    roots = {name.split(".")[0] for name in loaded}
+    assert roots.isdisjoint(HEAVY), sorted(roots & set(HEAVY))
+    tools = [name for name in HEAVY_TOOLS if f"utils.{name}" in loaded]
+    assert tools == [], tools
+
+
+def test_import_main_fits_the_budget():
+    report = _python("-X", "importtime", "-c", "import main").stderr
+    line = next(line for line in reversed(report.splitlines()) if line.rstrip().endswith("| main"))
+    cumulative_us = int(line.split("|")[1])
+    assert cumulative_us / 1000 < IMPORT_BUDGET_MS, f"import main : {cumulative_us / 1000:.0f} ms"
+
+
+def test_malformed_limits_fall_back_to_the_defaults(monkeypatch):
+    monkeypatch.setenv("CRYPTOLAB_STREAM_MAX_BYTES", "16MB")
+    monkeypatch.setenv("CRYPTOLAB_IMAGE_MAX_BYTES", "4 Mo")
+    limits = json.loads(_python(
+        "-c",
+        "import json, main; from routers import binary; "
+        "print(json.dumps([binary.STREAM_MAX_BYTES, binary.IMAGE_MAX_BYTES]))",
+    ).stdout)
+    assert limits == [16 * 1024 * 1024, 4 * 1024 * 1024]
+
+
+@pytest.fixture
+def fresh_dummy_hash():
+    service._dummy_hash.cache_clear()
+    yield
+    service._dummy_hash.cache_clear()
+
+
+def test_dummy_hash_can_come_from_configuration(monkeypatch, fresh_dummy_hash):
+    configured = service.hash_password("n'importe quoi")
+    monkeypatch.setenv("CRYPTOLAB_DUMMY_HASH", configured)
+    assert service._dummy_hash() == configured
+
+
+def test_invalid_dummy_hash_is_ignored(monkeypatch, fresh_dummy_hash):
+    monkeypatch.setenv("CRYPTOLAB_DUMMY_HASH", "$2b$04$" + "a" * 53)
+    dummy = service._dummy_hash()
+    assert dummy.startswith("$2b$12$")
+    assert service.verify_password("cryptolab-dummy-password", dummy)
@@ -0,0 +1,61 @@
+"""Tests des backends de statistiques et de l'exposition /metrics."""
+
+from __future__ import annotations
+
+import pytest
+
+from db import crud
+from db.stats import MemoryStats, MongoStats, NullStats
+
+
+def test_memory_backend_renders_prometheus_text():
+    stats = MemoryStats()
+    stats.observe_request("POST", "/api/simulate/{algo}", 200, 0.02)
+    stats.observe_request("POST", "/api/simulate/{algo}", 200, 3.0)
+    stats.record_usage("aes", "encrypt", 20)
+
+    text = stats.render_prometheus()
+    assert 'cryptolab_http_requests_total{method="POST",route="/api/simulate/{algo}",status="200"} 2' in text
+    assert 'cryptolab_http_request_duration_seconds_bucket{method="POST",route="/api/simulate/{algo}",le="0.025"} 1' in text
+    assert 'cryptolab_http_request_duration_seconds_bucket{method="POST",route="/api/simulate/{algo}",le="+Inf"} 2' in text
+    assert 'cryptolab_http_request_duration_seconds_count{method="POST",route="/api/simulate/{algo}"} 2' in text
+    assert 'cryptolab_usage_total{algorithm="aes",action="encrypt"} 1' in text
+    assert 'cryptolab_input_length_bucket{algorithm="aes",action="encrypt",le="16"} 0' in text
+    assert 'cryptolab_input_length_bucket{algorithm="aes",action="encrypt",le="64"} 1' in text
+
+
+def test_label_values_are_escaped():
+    stats = MemoryStats()
+    stats.record_usage('a"b\\c', "x\ny", 0)
+    assert 'algorithm="a\\"b\\\\c",action="x\\ny"' in stats.render_prometheus()
+
+
+@pytest.mark.parametrize(
+    ("choice", "db", "expected"),
+    [
+        ("", None, MemoryStats),
+        ("none", object(), NullStats),
+        ("memory", object(), MemoryStats),
+        ("mongo", None, MemoryStats),
+        ("mongo", {"usage_hourly": object()}, MongoStats),
+        ("", {"usage_hourly": object()}, MongoStats),
+    ],
+)
+def test_backend_selection(monkeypatch, choice, db, expected):
+    monkeypatch.setenv("CRYPTOLAB_STATS_BACKEND", choice)
+    monkeypatch.setattr(crud, "get_db", lambda: db)
+    assert type(crud._select_backend()) is expected
+
+
+def test_metrics_endpoint_counts_requests_by_route_template(client, monkeypatch):
+    monkeypatch.setattr(crud, "_backend", MemoryStats())
+    client.post("/api/simulate/caesar", json={"text": "ABC", "shift": 1})
+    client.post("/api/simulate/caesar", json={"text": "SECRET", "shift": 2})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'route="/api/simulate/{algo}",status="200"} 2' in text
+    assert 'cryptolab_usage_total{algorithm="caesar",action="simulate"} 2' in text
+    assert "SECRET" not in text
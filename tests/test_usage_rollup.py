@@ -0,0 +1,77 @@
+"""Tests des agregats horaires d'usage."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from db import usage_rollup
+from tests.conftest import unwrap
+
+T0 = datetime(2026, 3, 2, 14, 5, 9, tzinfo=timezone.utc)
+
+
+def _event(algorithm="aes", action="encrypt", input_length=10, timestamp=T0):
+    return {
+        "algorithm": algorithm,
+        "action": action,
+        "input_length": input_length,
+        "timestamp": timestamp,
+    }
+
+
+def test_buckets():
+    assert usage_rollup.length_bucket(0) == "le_16"
+    assert usage_rollup.length_bucket(16) == "le_16"
+    assert usage_rollup.length_bucket(17) == "le_64"
+    assert usage_rollup.length_bucket(10_000) == "gt_4096"
+    assert usage_rollup.hour_bucket(T0) == datetime(2026, 3, 2, 14, tzinfo=timezone.utc)
+    # Un horodatage naif est lu comme de l'UTC.
+    assert usage_rollup.hour_bucket(T0.replace(tzinfo=None)) == usage_rollup.hour_bucket(T0)
+
+
+def test_rollup_counts_per_algorithm_action_and_hour():
+    counters = usage_rollup.rollup([
+        _event(),
+        _event(input_length=500),
+        _event(action="decrypt"),
+        _event(timestamp=T0.replace(hour=15)),
+    ])
+    hour = usage_rollup.hour_bucket(T0)
+    assert counters[("aes", "encrypt", hour)] == {"count": 2, "le_16": 1, "le_1024": 1}
+    assert len(counters) == 3
+
+
+def test_upserts_increment_one_document_per_key():
+    (operation,) = usage_rollup.upserts(usage_rollup.rollup([_event(), _event()]))
+    assert operation._filter == {
+        "_id": {"algorithm": "aes", "action": "encrypt", "hour": usage_rollup.hour_bucket(T0)}
+    }
+    assert operation._doc == {"$inc": {"count": 2, "lengths.le_16": 2}}
+    assert operation._upsert is True
+
+
+class _Aggregating:
+    def __init__(self, rows):
+        self.rows = rows
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return iter(self.rows)
+
+
+def test_reads_shape_the_aggregation_results():
+    top = _Aggregating([{"_id": "aes", "count": 9}, {"_id": "des", "count": 4}])
+    assert usage_rollup.top_algorithms(top, limit=2) == [
+        {"algorithm": "aes", "count": 9},
+        {"algorithm": "des", "count": 4},
+    ]
+    assert top.pipelines[0][-1] == {"$limit": 2}
+
+    empty = _Aggregating([])
+    assert usage_rollup.length_distribution(empty, "aes") == dict.fromkeys(usage_rollup.LENGTH_LABELS, 0)
+    assert empty.pipelines[0][0]["$match"]["_id.algorithm"] == "aes"
+
+
+def test_usage_endpoint_without_stats(client):
+    assert unwrap(client.get("/api/metrics/usage")) == {"enabled": False, "top": [], "lengths": None}
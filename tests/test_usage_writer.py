@@ -0,0 +1,94 @@
+"""Tests du tampon d'ecriture des statistiques d'usage."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from db import crud
+from db.usage_writer import UsageWriter
+
+
+class _Sink:
+    """Collection factice : enregistre les lots recus, peut etre ralentie."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.batches: list[list[dict]] = []
+        self.delay = delay
+        self.called = threading.Event()
+
+    def __call__(self, docs: list[dict]) -> None:
+        time.sleep(self.delay)
+        self.batches.append(list(docs))
+        self.called.set()
+
+
+def test_submit_never_writes_in_the_caller():
+    sink = _Sink(delay=0.5)
+    writer = UsageWriter(sink, batch_size=1, interval=60)
+    start = time.perf_counter()
+    writer.submit({"n": 1})
+    assert time.perf_counter() - start < 0.1
+    writer.shutdown()
+    assert sink.batches == [[{"n": 1}]]
+
+
+def test_full_batch_wakes_the_flusher():
+    sink = _Sink()
+    writer = UsageWriter(sink, batch_size=3, interval=60)
+    for n in range(3):
+        writer.submit({"n": n})
+    assert sink.called.wait(2)
+    assert sink.batches == [[{"n": 0}, {"n": 1}, {"n": 2}]]
+    writer.shutdown()
+
+
+def test_interval_flushes_partial_batches():
+    sink = _Sink()
+    writer = UsageWriter(sink, batch_size=100, interval=0.05)
+    writer.submit({"n": 1})
+    assert sink.called.wait(2)
+    writer.shutdown()
+    assert writer.stats()["written"] == 1
+
+
+def test_full_buffer_drops_and_counts():
+    writer = UsageWriter(_Sink(), capacity=2, batch_size=100, interval=60)
+    assert [writer.submit({"n": n}) for n in range(4)] == [True, True, False, False]
+    writer.shutdown()
+    assert writer.stats() | {"batches": None} == {
+        "pending": 0, "capacity": 2, "written": 2, "dropped": 2, "failed": 0, "batches": None,
+    }
+
+
+def test_shutdown_writes_everything_in_batches():
+    sink = _Sink()
+    writer = UsageWriter(sink, batch_size=2, interval=60)
+    writer._start = lambda: None  # pas de thread : tout reste en attente
+    for n in range(5):
+        writer.submit({"n": n})
+    writer.shutdown()
+    assert [len(b) for b in sink.batches] == [2, 2, 1]
+    assert not writer.submit({"n": 6})
+
+
+def test_record_usage_goes_through_the_writer(monkeypatch):
+    class _Collection:
+        operations: list = []
+
+        def bulk_write(self, operations, ordered=True):
+            self.operations.extend(operations)
+
+    collection = _Collection()
+    monkeypatch.setattr(crud, "get_db", lambda: {"usage_hourly": collection})
+    monkeypatch.setattr(crud, "_backend", None)
+    monkeypatch.delenv("CRYPTOLAB_STATS_BACKEND", raising=False)
+
+    crud.record_usage("aes", "encrypt", 12)
+    crud.record_usage("aes", "encrypt", 100)
+    crud.shutdown()
+
+    (operation,) = collection.operations
+    assert operation._filter["_id"]["algorithm"] == "aes"
+    assert operation._doc == {"$inc": {"count": 2, "lengths.le_16": 1, "lengths.le_256": 1}}
+    assert crud.writer_stats()["written"] == 2
@@ -0,0 +1,206 @@
+"""
+Tests du mode multi-workers : ce qui doit etre commun aux processus l'est.
+
+Deux instances d'un meme support, sur un meme fichier, jouent deux workers ;
+un test lance de vrais processus pour le quota de connexions.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import stat
+
+import pytest
+
+from auth import local_state, rate_limit, security, service
+from auth import repository as repo
+from auth.models import RegisterInput
+from auth.rate_limit import MemoryAttempts, SqliteAttempts
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("CRYPTOLAB_STATE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+
+
+# --- Quota de connexions ---
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_quota_window_and_reset(kind, tmp_path):
+    clock = Clock()
+    if kind == "memory":
+        store = MemoryAttempts(60, 3, clock=clock)
+    else:
+        store = SqliteAttempts(tmp_path / "q.sqlite3", 60, 3, clock=clock)
+
+    assert [store.hit("a") for _ in range(4)] == [True, True, True, False]
+    assert store.hit("b")
+    clock.now += 61
+    assert store.hit("a")
+    store.reset("a")
+    assert all(store.hit("a") for _ in range(3))
+
+
+def test_two_workers_share_one_quota(tmp_path):
+    path = tmp_path / "q.sqlite3"
+    first, second = SqliteAttempts(path, 300, 10), SqliteAttempts(path, 300, 10)
+    granted = [store.hit("alice@example.com") for _ in range(6) for store in (first, second)]
+    assert granted.count(True) == 10
+
+
+def _hammer(path: str, count: int) -> int:
+    store = SqliteAttempts(path, 300, 25)
+    return sum(store.hit("alice@example.com") for _ in range(count))
+
+
+def test_processes_never_exceed_the_shared_quota(tmp_path):
+    path = str(tmp_path / "q.sqlite3")
+    SqliteAttempts(path, 300, 25)  # Schema cree avant la course.
+    with multiprocessing.get_context("spawn").Pool(3) as pool:
+        granted = pool.starmap(_hammer, [(path, 20)] * 3)
+    assert sum(granted) == 25
+
+
+def test_store_selection(monkeypatch, state_dir, tmp_path):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.delenv("CRYPTOLAB_RATE_LIMIT_DB", raising=False)
+    assert isinstance(rate_limit.build_store(300, 10), MemoryAttempts)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    assert isinstance(rate_limit.build_store(300, 10), SqliteAttempts)
+    assert (state_dir / "rate_limit.sqlite3").exists()
+
+    monkeypatch.setenv("CRYPTOLAB_RATE_LIMIT_DB", "memory")
+    assert isinstance(rate_limit.build_store(300, 10), MemoryAttempts)
+
+    monkeypatch.setenv("CRYPTOLAB_RATE_LIMIT_DB", str(tmp_path / "ailleurs.sqlite3"))
+    assert isinstance(rate_limit.build_store(300, 10), SqliteAttempts)
+    assert (tmp_path / "ailleurs.sqlite3").exists()
+
+
+# --- Secret JWT de developpement ---
+
+def test_dev_secret_is_shared_by_workers(monkeypatch, state_dir, workers):
+    monkeypatch.delenv("CRYPTOLAB_JWT_SECRET", raising=False)
+    monkeypatch.setenv("CRYPTOLAB_ENV", "development")
+
+    first, second = security._load_secret(), security._load_secret()
+    assert first == second
+    path = state_dir / "jwt_dev_secret"
+    assert path.read_text() == first
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert [p.name for p in state_dir.iterdir()] == ["jwt_dev_secret"]
+
+
+def test_single_worker_keeps_an_ephemeral_secret(monkeypatch, state_dir):
+    monkeypatch.delenv("CRYPTOLAB_JWT_SECRET", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setenv("CRYPTOLAB_ENV", "development")
+    assert security._load_secret() != security._load_secret()
+    assert not (state_dir / "jwt_dev_secret").exists()
+
+
+def test_default_state_dir_is_per_user(monkeypatch, tmp_path):
+    monkeypatch.delenv("CRYPTOLAB_STATE_DIR", raising=False)
+    monkeypatch.setattr(local_state.tempfile, "gettempdir", lambda: str(tmp_path))
+    path = local_state.state_dir()
+    assert path == tmp_path / f"cryptolab-{os.getuid()}"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+
+
+def test_state_dir_open_to_others_is_refused(monkeypatch, tmp_path):
+    shared = tmp_path / "partage"
+    shared.mkdir(mode=0o777)
+    os.chmod(shared, 0o777)
+    monkeypatch.setenv("CRYPTOLAB_STATE_DIR", str(shared))
+    with pytest.raises(local_state.StateDirError, match="0700"):
+        local_state.state_dir()
+
+
+def test_state_dir_owned_by_someone_else_is_refused(monkeypatch, state_dir):
+    monkeypatch.setattr(local_state.os, "getuid", lambda: os.stat(state_dir).st_uid + 1)
+    with pytest.raises(local_state.StateDirError, match="autre utilisateur"):
+        local_state.state_dir()
+
+
+def test_symlinked_state_dir_is_refused(monkeypatch, tmp_path):
+    target = tmp_path / "ailleurs"
+    target.mkdir(mode=0o700)
+    link = tmp_path / "lien"
+    link.symlink_to(target)
+    monkeypatch.setenv("CRYPTOLAB_STATE_DIR", str(link))
+    with pytest.raises(local_state.StateDirError):
+        local_state.state_dir()
+
+
+def test_dev_secret_never_follows_a_planted_symlink(monkeypatch, state_dir, workers, tmp_path):
+    monkeypatch.delenv("CRYPTOLAB_JWT_SECRET", raising=False)
+    monkeypatch.setenv("CRYPTOLAB_ENV", "development")
+    planted = tmp_path.parent / f"{tmp_path.name}-secret-connu"
+    planted.write_text("secret-connu")
+    (state_dir / "jwt_dev_secret").symlink_to(planted)
+    with pytest.raises(OSError):
+        security._load_secret()
+
+
+# --- Comptes sans MongoDB ---
+
+ACCOUNT = {
+    "email": "Bob@Example.com",
+    "password": "correct horse battery",
+    "first_name": "Bob",
+    "last_name": "Traore",
+    "country": "Mali",
+    "city": "Bamako",
+}
+
+
+def test_sqlite_accounts_are_visible_from_every_worker(tmp_path):
+    path = tmp_path / "users.sqlite3"
+    first, second = repo.SqliteUserRepository(path), repo.SqliteUserRepository(path)
+
+    repo.reset_repository(first)
+    try:
+        service.reset_rate_limits()
+        _, _, created = service.register(RegisterInput(**ACCOUNT))
+        # Le second worker retrouve le compte, et la connexion y aboutit.
+        repo.reset_repository(second)
+        _, _, logged_in = service.login("bob@example.com", ACCOUNT["password"])
+    finally:
+        repo.reset_repository(None)
+        service.reset_rate_limits()
+
+    assert logged_in == created
+    assert second.find_by_id(created.id)["created_at"] == created.created_at
+    with pytest.raises(repo.DuplicateEmailError):
+        second.create(first.find_by_email("bob@example.com"))
+
+
+def test_local_repository_follows_the_worker_count(monkeypatch, state_dir):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert isinstance(repo._local_repository(), repo.MemoryUserRepository)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert local_state.worker_count() == 3
+    assert isinstance(repo._local_repository(), repo.SqliteUserRepository)
+    assert (state_dir / "users.sqlite3").exists()
+
+
+def test_health_reports_workers(client):
+    body = client.get("/health").json()
+    assert body["workers"] == local_state.worker_count()
@@ -11,32 +11,10 @@ def gadd(a: int, b: int) -> int:
     return a ^ b
 
 
-def gmul_by_02(b: int) -> int:
-    """
-    Multiplication par 2 (l'opération 'xtime').
-    Équivaut à un décalage à gauche, suivi d'un XOR avec 0x11B si
-    le bit de poids fort était 1 (overflow).
-    """
-    if b < 0x80:
-        # Pas d'overflow, simple décalage
-        res = (b << 1)
-    else:
-        # Overflow
-        res = (b << 1) ^ 0x11B
-    return res & 0xFF  # Assure qu'on reste sur 8 bits
-
-
-def gmul_by_03(b: int) -> int:
-    """
-    Multiplication par 3.
-    gmul(b, 3) = gmul(b, 2) ^ gmul(b, 1)
-    """
-    return gadd(gmul_by_02(b), b)
-
-
-def gmul(a: int, b: int) -> int:
+def gmul_peasant(a: int, b: int) -> int:
     """
     Multiplication générale dans GF(2^8) (Peasant's Algorithm).
+    Version calculée, qui sert à construire les tables ci-dessous.
     """
     p = 0
     for _ in range(8):
@@ -54,6 +32,57 @@ def gmul(a: int, b: int) -> int:
     return p
 
 
+# --- Tables précalculées ---
+# 0x03 engendre le groupe multiplicatif de GF(2^8) : tout octet non nul s'écrit
+# 3^k. Avec EXP[k] = 3^k et LOG[3^k] = k, un produit devient une addition
+# d'exposants : a * b = EXP[LOG[a] + LOG[b]]. EXP est doublé (510 entrées) pour
+# éviter le modulo 255.
+#
+# Les coefficients de MixColumns (02, 03) et d'InvMixColumns (09, 0b, 0d, 0e)
+# ont en plus chacun leur table de 256 produits : une seule lecture par octet.
+
+EXP = [0] * 510
+LOG = [0] * 256
+_x = 1
+for _k in range(255):
+    EXP[_k] = EXP[_k + 255] = _x
+    LOG[_x] = _k
+    _x = gmul_peasant(_x, 0x03)
+del _x, _k
+
+
+def gmul(a: int, b: int) -> int:
+    """Multiplication générale dans GF(2^8), par les tables EXP/LOG."""
+    if a == 0 or b == 0:
+        return 0
+    return EXP[LOG[a] + LOG[b]]
+
+
+MUL2 = [gmul(x, 0x02) for x in range(256)]
+MUL3 = [gmul(x, 0x03) for x in range(256)]
+MUL9 = [gmul(x, 0x09) for x in range(256)]
+MUL11 = [gmul(x, 0x0B) for x in range(256)]
+MUL13 = [gmul(x, 0x0D) for x in range(256)]
+MUL14 = [gmul(x, 0x0E) for x in range(256)]
+
+
+def gmul_by_02(b: int) -> int:
+    """
+    Multiplication par 2 (l'opération 'xtime').
+    Équivaut à un décalage à gauche, suivi d'un XOR avec 0x11B si
+    le bit de poids fort était 1 (overflow) ; ici, lue dans MUL2.
+    """
+    return MUL2[b]
+
+
+def gmul_by_03(b: int) -> int:
+    """
+    Multiplication par 3.
+    gmul(b, 3) = gmul(b, 2) ^ gmul(b, 1) ; ici, lue dans MUL3.
+    """
+    return MUL3[b]
+
+
 # --- MixColumns Helpers ---
 # La matrice fixe pour MixColumns
 MIX_COLUMNS_MATRIX = [
@@ -67,14 +96,26 @@ MIX_COLUMNS_MATRIX = [
 def mix_single_column(column: list) -> list:
     """
     Applique l'opération MixColumns à une seule colonne (liste de 4 bytes).
+    C'est une multiplication de matrice : new_col[r] = sum(Matrix[r][c] * column[c]).
+    """
+    a0, a1, a2, a3 = column
+    return [
+        MUL2[a0] ^ MUL3[a1] ^ a2 ^ a3,
+        a0 ^ MUL2[a1] ^ MUL3[a2] ^ a3,
+        a0 ^ a1 ^ MUL2[a2] ^ MUL3[a3],
+        MUL3[a0] ^ a1 ^ a2 ^ MUL2[a3],
+    ]
+
+
+def inv_mix_single_column(column: list) -> list:
+    """
+    InvMixColumns sur une colonne : matrice inverse (coefficients 0x0e, 0x0b,
+    0x0d, 0x09), chaque produit lu dans sa table.
     """
-    new_col = [0] * 4
-    for r in range(4):
-        # C'est une multiplication de matrice : new_col[r] = sum(Matrix[r][c] * column[c])
-        new_val = 0
-        new_val = gadd(new_val, gmul(MIX_COLUMNS_MATRIX[r][0], column[0]))
-        new_val = gadd(new_val, gmul(MIX_COLUMNS_MATRIX[r][1], column[1]))
-        new_val = gadd(new_val, gmul(MIX_COLUMNS_MATRIX[r][2], column[2]))
-        new_val = gadd(new_val, gmul(MIX_COLUMNS_MATRIX[r][3], column[3]))
-        new_col[r] = new_val
-    return new_col
+    a0, a1, a2, a3 = column
+    return [
+        MUL14[a0] ^ MUL11[a1] ^ MUL13[a2] ^ MUL9[a3],
+        MUL9[a0] ^ MUL14[a1] ^ MUL11[a2] ^ MUL13[a3],
+        MUL13[a0] ^ MUL9[a1] ^ MUL14[a2] ^ MUL11[a3],
+        MUL11[a0] ^ MUL13[a1] ^ MUL9[a2] ^ MUL14[a3],
+    ]
@@ -1,6 +1,18 @@
 
 from . import aes_constants as const
-from .aes_math import gadd, gmul, mix_single_column
+from .aes_math import (
+    MUL2,
+    MUL3,
+    MUL9,
+    MUL11,
+    MUL13,
+    MUL14,
+    gadd,
+    inv_mix_single_column,
+    mix_single_column,
+)
+from .key_schedule_cache import SCHEDULES, Schedule
+from .tracing import FULL, Trace, Window, drain
 
 # --- Types de données ---
 # Un "mot" (word) est une liste de 4 bytes [b0, b1, b2, b3]
@@ -217,6 +229,20 @@ def expand_key(key_words: list[Word]) -> (list[State], list[dict]):
     return round_keys_state, key_schedule_trace
 
 
+def _key_bytes(key_words: list[Word]) -> bytes:
+    return bytes(b for word in key_words for b in word)
+
+
+def _build_schedule(key: bytes) -> Schedule:
+    round_keys, trace = expand_key([list(key[i:i + 4]) for i in range(0, 16, 4)])
+    return Schedule(tuple(tuple(tuple(row) for row in state) for state in round_keys), tuple(trace))
+
+
+def cached_schedule(key_words: list[Word]) -> Schedule:
+    """`expand_key(key_words)`, servi par le cache partagé des key schedules."""
+    return SCHEDULES.get("aes-128", _key_bytes(key_words), _build_schedule)
+
+
 # --- Simulateur Principal ---
 
 def simulate_aes_encrypt(plain_text_str: str, key_str: str) -> dict:
@@ -233,8 +259,9 @@ def simulate_aes_encrypt(plain_text_str: str, key_str: str) -> dict:
     # --- Phase 1: Génération des Clés de Round (Key Schedule) ---
     steps.append(
         {"phase": "Génération des Clés", "step": "KS-Start", "description": "Démarrage du Key Schedule AES-128..."})
-    round_keys, key_schedule_trace = expand_key(key_words)
-    steps.extend(key_schedule_trace)
+    schedule = cached_schedule(key_words)
+    round_keys = schedule.round_keys
+    steps.extend(schedule.steps())
 
     # --- Phase 2: Chiffrement ---
 
@@ -365,23 +392,6 @@ def inv_shift_rows(state: State, trace_list: list[str]) -> State:
     return new_state
 
 
-def inv_mix_single_column(column: list[int]) -> list[int]:
-    """Multiplication par la matrice inverse de MixColumns (coefficients 0x0e,0x0b,0x0d,0x09)."""
-    matrix = [
-        [0x0E, 0x0B, 0x0D, 0x09],
-        [0x09, 0x0E, 0x0B, 0x0D],
-        [0x0D, 0x09, 0x0E, 0x0B],
-        [0x0B, 0x0D, 0x09, 0x0E],
-    ]
-    new_col = [0] * 4
-    for r in range(4):
-        value = 0
-        for c in range(4):
-            value = gadd(value, gmul(matrix[r][c], column[c]))
-        new_col[r] = value
-    return new_col
-
-
 def inv_mix_columns(state: State, trace_list: list[str]) -> State:
     """InvMixColumns : inverse de MixColumns, colonne par colonne."""
     new_state = [[0] * 4 for _ in range(4)]
@@ -414,14 +424,24 @@ def _state_to_bytes(state: State) -> bytes:
     return bytes(state[r][c] for c in range(4) for r in range(4))
 
 
-def encrypt_block(block: bytes, key_words: list[Word]) -> tuple[bytes, list[dict]]:
-    """Chiffre un unique bloc de 16 octets, en tracant chaque round (AES-128)."""
+def encrypt_block(
+    block: bytes,
+    key_words: list[Word],
+    schedule: Schedule | None = None,
+) -> tuple[bytes, list[dict]]:
+    """
+    Chiffre un unique bloc de 16 octets, en tracant chaque round (AES-128).
+
+    `schedule` : résultat de `cached_schedule(key_words)`, obtenu une fois par
+    l'appelant qui chiffre plusieurs blocs avec la même clé.
+    """
     if len(block) != 16:
         raise ValueError("Un bloc AES fait exactement 16 octets.")
 
-    steps = []
-    round_keys, key_schedule_trace = expand_key(key_words)
-    steps.extend(key_schedule_trace)
+    schedule = schedule or cached_schedule(key_words)
+    round_keys = schedule.round_keys
+    # Copies : l'appelant annote les étapes de chaque bloc (numéro de bloc).
+    steps = schedule.steps()
 
     state = _bytes_to_state(block)
     round_trace = []
@@ -452,17 +472,22 @@ def encrypt_block(block: bytes, key_words: list[Word]) -> tuple[bytes, list[dict
     return _state_to_bytes(state), steps
 
 
-def decrypt_block(block: bytes, key_words: list[Word]) -> tuple[bytes, list[dict]]:
+def decrypt_block(
+    block: bytes,
+    key_words: list[Word],
+    schedule: Schedule | None = None,
+) -> tuple[bytes, list[dict]]:
     """
     Déchiffre un unique bloc de 16 octets : rounds appliqués dans l'ordre
     inverse (10 -> 0), chaque transformation remplacée par son inverse.
+    `schedule` : comme pour `encrypt_block`.
     """
     if len(block) != 16:
         raise ValueError("Un bloc AES fait exactement 16 octets.")
 
-    steps = []
-    round_keys, key_schedule_trace = expand_key(key_words)
-    steps.extend(key_schedule_trace)
+    schedule = schedule or cached_schedule(key_words)
+    round_keys = schedule.round_keys
+    steps = schedule.steps()
 
     state = _bytes_to_state(block)
 
@@ -494,6 +519,131 @@ def decrypt_block(block: bytes, key_words: list[Word]) -> tuple[bytes, list[dict
     return _state_to_bytes(state), steps
 
 
+# --- Cœur rapide, sans trace (T-tables) --------------------------------------
+# Les blocs hors de la fenêtre de trace n'ont besoin que de leurs octets. Ce
+# cœur fusionne SubBytes, ShiftRows et MixColumns en quatre tables de 256 mots
+# de 32 bits (les « T-tables » de l'implémentation de référence de Rijndael) :
+# un round ne coûte plus que 16 lectures de table et 16 XOR. L'état est tenu en
+# quatre colonnes de 32 bits, octet de la ligne 0 en poids fort.
+#
+# Le déchiffrement suit le « chiffrement inverse équivalent » (FIPS-197 §5.3.5) :
+# mêmes tables avec InvSubBytes et InvMixColumns, et clés de round des rounds
+# intermédiaires passées au préalable par InvMixColumns.
+
+def _word(b0: int, b1: int, b2: int, b3: int) -> int:
+    return (b0 << 24) | (b1 << 16) | (b2 << 8) | b3
+
+
+def _ror8(word: int) -> int:
+    return ((word >> 8) | (word << 24)) & 0xFFFFFFFF
+
+
+_SBOX = [const.S_BOX[b >> 4][b & 0x0F] for b in range(256)]
+
+T0 = [_word(MUL2[s], s, s, MUL3[s]) for s in _SBOX]
+T1 = [_ror8(t) for t in T0]
+T2 = [_ror8(t) for t in T1]
+T3 = [_ror8(t) for t in T2]
+
+TD0 = [_word(MUL14[s], MUL9[s], MUL13[s], MUL11[s]) for s in INV_S_BOX]
+TD1 = [_ror8(t) for t in TD0]
+TD2 = [_ror8(t) for t in TD1]
+TD3 = [_ror8(t) for t in TD2]
+
+
+def expand_key_fast(key: bytes) -> list[int]:
+    """Les 44 mots de 32 bits du key schedule AES-128, sans trace."""
+    if len(key) != 16:
+        raise ValueError("Une clé AES-128 fait exactement 16 octets.")
+    w = [int.from_bytes(key[i:i + 4], "big") for i in range(0, 16, 4)]
+    for i in range(4, 44):
+        temp = w[i - 1]
+        if i % 4 == 0:
+            temp = ((temp << 8) | (temp >> 24)) & 0xFFFFFFFF  # RotWord
+            temp = _word(_SBOX[temp >> 24], _SBOX[(temp >> 16) & 0xFF],
+                         _SBOX[(temp >> 8) & 0xFF], _SBOX[temp & 0xFF])  # SubWord
+            temp ^= const.RCON[i // 4][0] << 24
+        w.append(w[i - 4] ^ temp)
+    return w
+
+
+def decryption_key_schedule(round_keys: list[int]) -> list[int]:
+    """Clés du chiffrement inverse équivalent : rounds inversés, InvMixColumns au milieu."""
+    dk = list(round_keys[40:44])
+    for rnd in range(9, 0, -1):
+        for w in round_keys[rnd * 4:rnd * 4 + 4]:
+            # TDx[S[b]] : l'InvSubBytes des tables annule la S-Box, reste InvMixColumns.
+            dk.append(TD0[_SBOX[w >> 24]] ^ TD1[_SBOX[(w >> 16) & 0xFF]]
+                      ^ TD2[_SBOX[(w >> 8) & 0xFF]] ^ TD3[_SBOX[w & 0xFF]])
+    dk.extend(round_keys[0:4])
+    return dk
+
+
+def cached_fast_keys(key: bytes) -> tuple[int, ...]:
+    """`expand_key_fast(key)`, servi par le cache partagé des key schedules."""
+    return SCHEDULES.get(
+        "aes-128/fast", key, lambda k: Schedule(tuple(expand_key_fast(k)))
+    ).round_keys
+
+
+def cached_fast_decryption_keys(key: bytes) -> tuple[int, ...]:
+    """`decryption_key_schedule` de la clé, servi par le même cache."""
+    return SCHEDULES.get(
+        "aes-128/fast-inverse",
+        key,
+        lambda k: Schedule(tuple(decryption_key_schedule(list(cached_fast_keys(k))))),
+    ).round_keys
+
+
+def encrypt_block_fast(block: bytes, round_keys: list[int]) -> bytes:
+    """Chiffre un bloc de 16 octets avec un key schedule de `expand_key_fast`."""
+    rk = round_keys
+    s0 = int.from_bytes(block[0:4], "big") ^ rk[0]
+    s1 = int.from_bytes(block[4:8], "big") ^ rk[1]
+    s2 = int.from_bytes(block[8:12], "big") ^ rk[2]
+    s3 = int.from_bytes(block[12:16], "big") ^ rk[3]
+    for k in range(4, 40, 4):
+        s0, s1, s2, s3 = (
+            T0[s0 >> 24] ^ T1[(s1 >> 16) & 0xFF] ^ T2[(s2 >> 8) & 0xFF] ^ T3[s3 & 0xFF] ^ rk[k],
+            T0[s1 >> 24] ^ T1[(s2 >> 16) & 0xFF] ^ T2[(s3 >> 8) & 0xFF] ^ T3[s0 & 0xFF] ^ rk[k + 1],
+            T0[s2 >> 24] ^ T1[(s3 >> 16) & 0xFF] ^ T2[(s0 >> 8) & 0xFF] ^ T3[s1 & 0xFF] ^ rk[k + 2],
+            T0[s3 >> 24] ^ T1[(s0 >> 16) & 0xFF] ^ T2[(s1 >> 8) & 0xFF] ^ T3[s2 & 0xFF] ^ rk[k + 3],
+        )
+    # Round final : pas de MixColumns, donc la S-Box seule.
+    sb = _SBOX
+    out = (
+        _word(sb[s0 >> 24], sb[(s1 >> 16) & 0xFF], sb[(s2 >> 8) & 0xFF], sb[s3 & 0xFF]) ^ rk[40],
+        _word(sb[s1 >> 24], sb[(s2 >> 16) & 0xFF], sb[(s3 >> 8) & 0xFF], sb[s0 & 0xFF]) ^ rk[41],
+        _word(sb[s2 >> 24], sb[(s3 >> 16) & 0xFF], sb[(s0 >> 8) & 0xFF], sb[s1 & 0xFF]) ^ rk[42],
+        _word(sb[s3 >> 24], sb[(s0 >> 16) & 0xFF], sb[(s1 >> 8) & 0xFF], sb[s2 & 0xFF]) ^ rk[43],
+    )
+    return b"".join(word.to_bytes(4, "big") for word in out)
+
+
+def decrypt_block_fast(block: bytes, decryption_keys: list[int]) -> bytes:
+    """Déchiffre un bloc de 16 octets avec les clés de `decryption_key_schedule`."""
+    dk = decryption_keys
+    s0 = int.from_bytes(block[0:4], "big") ^ dk[0]
+    s1 = int.from_bytes(block[4:8], "big") ^ dk[1]
+    s2 = int.from_bytes(block[8:12], "big") ^ dk[2]
+    s3 = int.from_bytes(block[12:16], "big") ^ dk[3]
+    for k in range(4, 40, 4):
+        s0, s1, s2, s3 = (
+            TD0[s0 >> 24] ^ TD1[(s3 >> 16) & 0xFF] ^ TD2[(s2 >> 8) & 0xFF] ^ TD3[s1 & 0xFF] ^ dk[k],
+            TD0[s1 >> 24] ^ TD1[(s0 >> 16) & 0xFF] ^ TD2[(s3 >> 8) & 0xFF] ^ TD3[s2 & 0xFF] ^ dk[k + 1],
+            TD0[s2 >> 24] ^ TD1[(s1 >> 16) & 0xFF] ^ TD2[(s0 >> 8) & 0xFF] ^ TD3[s3 & 0xFF] ^ dk[k + 2],
+            TD0[s3 >> 24] ^ TD1[(s2 >> 16) & 0xFF] ^ TD2[(s1 >> 8) & 0xFF] ^ TD3[s0 & 0xFF] ^ dk[k + 3],
+        )
+    ib = INV_S_BOX
+    out = (
+        _word(ib[s0 >> 24], ib[(s3 >> 16) & 0xFF], ib[(s2 >> 8) & 0xFF], ib[s1 & 0xFF]) ^ dk[40],
+        _word(ib[s1 >> 24], ib[(s0 >> 16) & 0xFF], ib[(s3 >> 8) & 0xFF], ib[s2 & 0xFF]) ^ dk[41],
+        _word(ib[s2 >> 24], ib[(s1 >> 16) & 0xFF], ib[(s0 >> 8) & 0xFF], ib[s3 & 0xFF]) ^ dk[42],
+        _word(ib[s3 >> 24], ib[(s2 >> 16) & 0xFF], ib[(s1 >> 8) & 0xFF], ib[s0 & 0xFF]) ^ dk[43],
+    )
+    return b"".join(word.to_bytes(4, "big") for word in out)
+
+
 # --- Simulation multi-blocs (chiffrement et déchiffrement pas à pas) ---------
 # L'ancien simulateur ne traitait qu'un seul bloc de 16 caractères, tronquait
 # silencieusement au-delà, et ne simulait que le chiffrement. Ici : bourrage
@@ -502,13 +652,26 @@ def decrypt_block(block: bytes, key_words: list[Word]) -> tuple[bytes, list[dict
 # chaînage CBC/CTR est la responsabilité de `modes_tool`, qui montre
 # précisément pourquoi ECB seul est un mauvais choix).
 
-def simulate_aes_encrypt_multiblock(plain_text: str, key_str: str) -> dict:
+def iter_aes_encrypt_multiblock(plain_text: str, key_str: str, window: Window = FULL) -> Trace:
+    """
+    Trace du chiffrement multi-blocs, produite bloc par bloc : l'étape d'un
+    bloc est émise dès qu'il est chiffré.
+
+    `window` restreint la trace aux blocs et rounds demandés ; les autres blocs,
+    et tous en résumé (`detail="summary"`), passent par le cœur rapide
+    (`encrypt_block_fast`), et le chiffré reste le même.
+    """
     key_words, key_prep_trace = key_to_words(key_str)
     plain_bytes = plain_text.encode("utf-8")
     padded = pkcs7_pad(plain_bytes, 16)
     blocks = [padded[i:i + 16] for i in range(0, len(padded), 16)]
+    # Key schedule obtenu une seule fois pour tout le message (et gardé d'une
+    # requête à l'autre) : tracé pour les blocs de la fenêtre, en mots de
+    # 32 bits pour les autres.
+    schedule = cached_schedule(key_words)
+    fast_keys = None if window.is_full else cached_fast_keys(_key_bytes(key_words))
 
-    steps = [{
+    yield {
         "step": 0,
         "phase": "Bourrage PKCS#7",
         "description": (
@@ -518,63 +681,110 @@ def simulate_aes_encrypt_multiblock(plain_text: str, key_str: str) -> dict:
             f"Découpage en {len(blocks)} bloc(s) de 16 octets."
         ),
         "block_count": len(blocks),
-    }, {"step": 1, "phase": "Préparation de la clé", "description": key_prep_trace}]
+    }
+    yield {"step": 1, "phase": "Préparation de la clé", "description": key_prep_trace}
+    step_counter = 2
 
     block_results = []
     cipher_bytes = b""
     for index, block in enumerate(blocks):
-        cipher_block, block_steps = encrypt_block(block, key_words)
+        # En résumé, aucune étape de round n'est rendue : le cœur rapide suffit
+        # aussi pour les blocs de la fenêtre.
+        if not window.has_block(index) or window.summary:
+            cipher_block = encrypt_block_fast(block, fast_keys)
+            block_steps = []
+        else:
+            cipher_block, block_steps = encrypt_block(block, key_words, schedule)
         cipher_bytes += cipher_block
-        for s in block_steps:
-            s["block"] = index
-        steps.append({
-            "step": len(steps),
+        block_results.append(cipher_block.hex())
+        if not window.has_block(index):
+            continue
+
+        step = {
+            "step": step_counter,
             "phase": "Bloc",
             "block": index,
             "description": f"--- Bloc {index} ({block.hex()}) ---",
-            "block_steps": block_steps,
             "block_result_hex": cipher_block.hex(),
-        })
-        block_results.append(cipher_block.hex())
-
-    steps.append({
-        "step": len(steps),
+        }
+        if not window.summary:
+            if window.rounds is not None:
+                # Les étapes du key schedule n'ont pas de round : elles sortent
+                # de la fenêtre avec les rounds non demandés.
+                block_steps = [s for s in block_steps if window.has_round(s.get("round", -1))]
+            for s in block_steps:
+                s["block"] = index
+            step["block_steps"] = block_steps
+        yield step
+        step_counter += 1
+
+    yield {
+        "step": step_counter,
         "phase": "Final",
         "description": f"Fin du chiffrement. Résultat ({len(blocks)} bloc(s)) : {cipher_bytes.hex()}",
         "final_result_hex": cipher_bytes.hex(),
-    })
+    }
 
-    return {
+    summary = {
         "final_result_hex": cipher_bytes.hex(),
         "block_count": len(blocks),
         "block_results": block_results,
-        "steps": steps,
     }
+    if not window.is_full:
+        summary["window"] = window.describe(len(blocks))
+    return summary
+
+
+def simulate_aes_encrypt_multiblock(
+    plain_text: str, key_str: str, window: Window = FULL
+) -> dict:
+    return drain(iter_aes_encrypt_multiblock(plain_text, key_str, window))
 
 
-def simulate_aes_decrypt_multiblock(cipher_hex: str, key_str: str) -> dict:
+def iter_aes_decrypt_multiblock(cipher_hex: str, key_str: str, window: Window = FULL) -> Trace:
+    """
+    Trace du déchiffrement multi-blocs, bloc par bloc, comme
+    `iter_aes_encrypt_multiblock` : hors de `window`, ou en résumé, les blocs
+    passent par le cœur rapide (`decrypt_block_fast`), et le clair reste le même.
+    """
     key_words, key_prep_trace = key_to_words(key_str)
     cipher_bytes = bytes.fromhex(cipher_hex)
     if len(cipher_bytes) % 16 != 0:
         raise ValueError("Le chiffré doit être un multiple de 16 octets.")
     blocks = [cipher_bytes[i:i + 16] for i in range(0, len(cipher_bytes), 16)]
 
-    steps = [{"step": 0, "phase": "Préparation de la clé", "description": key_prep_trace}]
+    schedule = cached_schedule(key_words)
+    fast_keys = None if window.is_full else cached_fast_decryption_keys(_key_bytes(key_words))
+
+    yield {"step": 0, "phase": "Préparation de la clé", "description": key_prep_trace}
+    step_counter = 1
 
     plain_padded = b""
     for index, block in enumerate(blocks):
-        plain_block, block_steps = decrypt_block(block, key_words)
+        if not window.has_block(index) or window.summary:
+            plain_block = decrypt_block_fast(block, fast_keys)
+            block_steps = []
+        else:
+            plain_block, block_steps = decrypt_block(block, key_words, schedule)
         plain_padded += plain_block
-        for s in block_steps:
-            s["block"] = index
-        steps.append({
-            "step": len(steps),
+        if not window.has_block(index):
+            continue
+
+        step = {
+            "step": step_counter,
             "phase": "Bloc",
             "block": index,
             "description": f"--- Bloc {index} ({block.hex()}) ---",
-            "block_steps": block_steps,
             "block_result_hex": plain_block.hex(),
-        })
+        }
+        if not window.summary:
+            if window.rounds is not None:
+                block_steps = [s for s in block_steps if window.has_round(s.get("round", -1))]
+            for s in block_steps:
+                s["block"] = index
+            step["block_steps"] = block_steps
+        yield step
+        step_counter += 1
 
     try:
         plain_bytes = pkcs7_unpad(plain_padded, 16)
@@ -589,18 +799,23 @@ def simulate_aes_decrypt_multiblock(cipher_hex: str, key_str: str) -> dict:
     except UnicodeDecodeError as exc:
         raise ValueError("Le résultat déchiffré n'est pas du texte UTF-8 valide.") from exc
 
-    steps.append({
-        "step": len(steps),
+    yield {
+        "step": step_counter,
         "phase": "Dépadding",
         "description": (
             f"Retrait du bourrage PKCS#7 ({len(plain_padded) - len(plain_bytes)} "
             f"octets retirés).\nRésultat : '{plain_text}'."
         ),
         "final_result": plain_text,
-    })
-
-    return {
-        "final_result": plain_text,
-        "block_count": len(blocks),
-        "steps": steps,
     }
+
+    summary = {"final_result": plain_text, "block_count": len(blocks)}
+    if not window.is_full:
+        summary["window"] = window.describe(len(blocks))
+    return summary
+
+
+def simulate_aes_decrypt_multiblock(
+    cipher_hex: str, key_str: str, window: Window = FULL
+) -> dict:
+    return drain(iter_aes_decrypt_multiblock(cipher_hex, key_str, window))
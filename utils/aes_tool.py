@@ -4,7 +4,7 @@ import os
 from Crypto.Cipher import AES
 
 from registry.errors import DecryptionFailed, InvalidInput
-from utils.hash_tool import pbkdf2_derive
+from utils.kdf_cache import cached_pbkdf2
 
 # Nombre d'iterations PBKDF2 pour la derivation de cle. 200 000 est dans la
 # fourchette recommandee (OWASP, 2023) pour HMAC-SHA256 ; assez pour ralentir
@@ -42,7 +42,7 @@ def get_aes_key(key_string: str, salt: bytes | None = None, key_size: int = 32)
         )
     if salt is None:
         salt = os.urandom(SALT_SIZE)
-    key_bytes = pbkdf2_derive(key_string, salt, iterations=KDF_ITERATIONS, dklen=key_size)
+    key_bytes = cached_pbkdf2(key_string, salt, iterations=KDF_ITERATIONS, dklen=key_size)
     return key_bytes, salt
 
 
@@ -12,7 +12,7 @@ from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
 
 from registry.errors import DecryptionFailed, InvalidInput
-from utils.hash_tool import pbkdf2_derive
+from utils.kdf_cache import cached_pbkdf2
 
 KDF_ITERATIONS = 200_000
 SALT_SIZE = 16
@@ -24,7 +24,7 @@ def get_chacha20_key(key_string: str, salt: bytes | None = None) -> tuple[bytes,
     """Derive une cle de 32 octets par PBKDF2-HMAC-SHA256, comme AES/DES/3DES."""
     if salt is None:
         salt = os.urandom(SALT_SIZE)
-    key_bytes = pbkdf2_derive(key_string, salt, iterations=KDF_ITERATIONS, dklen=KEY_SIZE)
+    key_bytes = cached_pbkdf2(key_string, salt, iterations=KDF_ITERATIONS, dklen=KEY_SIZE)
     return key_bytes, salt
 
 
@@ -76,6 +76,24 @@ def decrypt_chacha20(cipher_hex: str, key: str, nonce_hex: str, salt_hex: str) -
         ) from exc
 
 
+def chacha20_poly1305_bytes(
+    key: bytes | memoryview,
+    nonce: bytes | memoryview,
+    data: bytes | memoryview,
+    aad: bytes | memoryview = b"",
+) -> bytes:
+    """
+    Coeur de `chacha20_poly1305_raw`, sur des octets : renvoie chiffre || tag,
+    le format de sortie de l'AEAD de la RFC 8439. Une memoryview est lue sans
+    copie.
+    """
+    if len(key) != KEY_SIZE:
+        raise InvalidInput(f"La cle ChaCha20 doit faire {KEY_SIZE} octets.")
+    if len(nonce) != NONCE_SIZE:
+        raise InvalidInput(f"Le nonce doit faire {NONCE_SIZE} octets (96 bits, RFC 8439).")
+    return ChaCha20Poly1305(key).encrypt(nonce, data, aad or None)
+
+
 def chacha20_poly1305_raw(key_hex: str, nonce_hex: str, plaintext_hex: str, aad_hex: str = "") -> dict:
     """
     Variante pedagogique deterministe : cle, nonce et associated data fournis
@@ -89,8 +107,7 @@ def chacha20_poly1305_raw(key_hex: str, nonce_hex: str, plaintext_hex: str, aad_
     except ValueError as exc:
         raise InvalidInput("Les champs hex fournis sont invalides.") from exc
 
-    aead = ChaCha20Poly1305(key_bytes)
-    ciphertext_and_tag = aead.encrypt(nonce_bytes, plain_bytes, aad_bytes or None)
+    ciphertext_and_tag = chacha20_poly1305_bytes(key_bytes, nonce_bytes, plain_bytes, aad_bytes)
     return {
         "cipher_hex": ciphertext_and_tag[:-16].hex(),
         "tag_hex": ciphertext_and_tag[-16:].hex(),
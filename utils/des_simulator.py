@@ -1,5 +1,7 @@
 
 from . import des_constants as const
+from .key_schedule_cache import SCHEDULES, Schedule
+from .tracing import FULL, Trace, Window, drain
 
 # --- Fonctions "Helpers" pour la manipulation de bits ---
 
@@ -50,107 +52,235 @@ def bits_to_hex(bits: str) -> str:
     return f'{int(bits, 2):X}'.zfill(len(bits) // 4)
 
 
+# --- Cœur entier : tables de permutation indexées par octet -------------------
+# Les chaînes de '0'/'1' se prêtent à l'affichage, pas au calcul : chaque
+# permutation y reconstruit une chaîne caractère par caractère. Le cœur de
+# calcul tient donc chaque bloc dans un entier (bit 1 des tables FIPS = bit de
+# poids fort) et chaque permutation dans des tables précalculées : pour chaque
+# octet d'entrée, 256 masques de sortie. Permuter 64 bits revient à 8 lectures
+# et 8 OU. Les chaînes de bits ne sont rendues que pour les étapes tracées.
+
+def _byte_tables(table: list[int], in_bits: int) -> list[list[int]]:
+    """Une table de 256 masques par octet d'entrée, pour une permutation FIPS."""
+    out_bits = len(table)
+    tables = [[0] * 256 for _ in range(in_bits // 8)]
+    for out_pos, source in enumerate(table):
+        byte_index, bit = divmod(source - 1, 8)
+        out_mask = 1 << (out_bits - 1 - out_pos)
+        for value in range(256):
+            if value & (0x80 >> bit):
+                tables[byte_index][value] |= out_mask
+    return tables
+
+
+def _apply(value: int, tables: list[list[int]]) -> int:
+    """Applique une permutation préparée par `_byte_tables` à un entier."""
+    out = 0
+    shift = 8 * (len(tables) - 1)
+    for table in tables:
+        out |= table[(value >> shift) & 0xFF]
+        shift -= 8
+    return out
+
+
+def _bits(value: int, width: int) -> str:
+    """Rendu d'un entier en chaîne de bits, pour la trace."""
+    return format(value, f"0{width}b")
+
+
+IP_TABLES = _byte_tables(const.IP, 64)
+FP_TABLES = _byte_tables(const.IP_1, 64)
+E_TABLES = _byte_tables(const.E, 32)
+P_TABLES = _byte_tables(const.P, 32)
+PC1_TABLES = _byte_tables(const.PC1, 64)
+PC2_TABLES = _byte_tables(const.PC2, 56)
+
+
+def _s_box_lookup(box: int, six: int) -> int:
+    """Valeur (0-15) de la S-Box `box` pour une entrée de 6 bits."""
+    row = ((six >> 4) & 0b10) | (six & 1)  # 1er et 6e bit
+    col = (six >> 1) & 0x0F                # les 4 bits du milieu
+    return const.S_BOX[box][row][col]
+
+
+# Tables « SP » : S-Box puis permutation P, fusionnées. SP[i][x] est la
+# contribution de la S-Box i (entrée x sur 6 bits) à la sortie 32 bits de F,
+# déjà permutée : F se réduit à 8 lectures et 8 XOR.
+SP = [
+    [_apply(_s_box_lookup(i, six) << (28 - 4 * i), P_TABLES) for six in range(64)]
+    for i in range(8)
+]
+
+_MASK_28 = (1 << 28) - 1
+_MASK_32 = 0xFFFFFFFF
+
+
+def f_fast(right: int, round_key: int) -> int:
+    """Fonction F sans trace, sur entiers : E, XOR avec K, puis tables SP."""
+    x = (
+        E_TABLES[0][right >> 24]
+        | E_TABLES[1][(right >> 16) & 0xFF]
+        | E_TABLES[2][(right >> 8) & 0xFF]
+        | E_TABLES[3][right & 0xFF]
+    ) ^ round_key
+    return (
+        SP[0][x >> 42] ^ SP[1][(x >> 36) & 0x3F]
+        ^ SP[2][(x >> 30) & 0x3F] ^ SP[3][(x >> 24) & 0x3F]
+        ^ SP[4][(x >> 18) & 0x3F] ^ SP[5][(x >> 12) & 0x3F]
+        ^ SP[6][(x >> 6) & 0x3F] ^ SP[7][x & 0x3F]
+    )
+
+
+def expand_round_keys(key: bytes) -> list[int]:
+    """Les 16 clés de round (48 bits) d'une clé de 8 octets, sans trace."""
+    return _key_schedule(int.from_bytes(key, "big"), trace=False)[0]
+
+
+def encrypt_block_int(block: int, round_keys: list[int]) -> int:
+    """Chiffre un bloc de 64 bits (entier) : IP, 16 rounds de Feistel, IP-1."""
+    ip = _apply(block, IP_TABLES)
+    left, right = ip >> 32, ip & _MASK_32
+    for round_key in round_keys:
+        left, right = right, left ^ f_fast(right, round_key)
+    return _apply((right << 32) | left, FP_TABLES)
+
+
+def decrypt_block_int(block: int, round_keys: list[int]) -> int:
+    """Mêmes rounds, clés dans l'ordre inverse (K16 en premier)."""
+    return encrypt_block_int(block, round_keys[::-1])
+
+
+def encrypt_block_fast(block: bytes, round_keys: list[int]) -> bytes:
+    """Chiffre un bloc de 8 octets avec les clés de `expand_round_keys`."""
+    return encrypt_block_int(int.from_bytes(block, "big"), round_keys).to_bytes(8, "big")
+
+
+def decrypt_block_fast(block: bytes, round_keys: list[int]) -> bytes:
+    return decrypt_block_int(int.from_bytes(block, "big"), round_keys).to_bytes(8, "big")
+
+
 # --- Logique de la Fonction F (le cœur d'un round) ---
 
-def f_function(right_half: str, round_key: str, s_box_steps: list) -> str:
+def _f_traced(right: int, round_key: int) -> tuple[int, str, dict]:
     """
-    Exécute la fonction F de Feistel.
-    (32 bits Right + 48 bits Key) -> 32 bits Output
+    Fonction F tracée : même calcul que `f_fast`, étape par étape, avec le
+    rendu en bits de chaque valeur intermédiaire et le détail des S-Boxes.
     """
+    right_half = _bits(right, 32)
 
     # 1. Expansion (E): 32 bits -> 48 bits
-    expanded = permute(right_half, const.E)
-    f_step_desc = f"  1. Expansion (E): 32 bits -> 48 bits.\n     {right_half} -> {expanded}"
+    expanded = _apply(right, E_TABLES)
+    expanded_bits = _bits(expanded, 48)
+    f_step_desc = f"  1. Expansion (E): 32 bits -> 48 bits.\n     {right_half} -> {expanded_bits}"
 
     # 2. XOR avec la clé de round (K)
-    xored = xor(expanded, round_key)
-    f_step_desc += f"\n  2. XOR avec Clé K: 48 bits XOR 48 bits.\n     {expanded} \n     XOR \n     {round_key} \n     = \n     {xored}"
+    xored = expanded ^ round_key
+    xored_bits = _bits(xored, 48)
+    f_step_desc += f"\n  2. XOR avec Clé K: 48 bits XOR 48 bits.\n     {expanded_bits} \n     XOR \n     {_bits(round_key, 48)} \n     = \n     {xored_bits}"
 
     # 3. Substitution (S-Boxes): 48 bits -> 32 bits
-    s_box_output = ""
+    s_box_output = 0
     s_box_details = []
     # Traite les 8 S-Boxes (6 bits chacune)
     for i in range(8):
-        s_input = xored[i * 6: (i + 1) * 6]
+        six = (xored >> (42 - 6 * i)) & 0x3F
+        s_input = xored_bits[i * 6: (i + 1) * 6]
 
-        # Le 1er et 6e bit déterminent la ligne
+        # Le 1er et 6e bit déterminent la ligne, les 4 bits du milieu la colonne
         row_bits = s_input[0] + s_input[5]
-        row = int(row_bits, 2)
-
-        # Les 4 bits du milieu déterminent la colonne
         col_bits = s_input[1:5]
-        col = int(col_bits, 2)
-
-        # Recherche dans la S-Box
-        s_value = const.S_BOX[i][row][col]
-
-        # Convertir la valeur (0-15) en 4 bits
-        s_output_bits = format(s_value, '04b')
-        s_box_output += s_output_bits
+        s_value = _s_box_lookup(i, six)
+        s_box_output |= s_value << (28 - 4 * i)
 
         s_box_details.append(
-            f"S{i + 1}: In='{s_input}', Ligne={row} ('{row_bits}'), Col={col} ('{col_bits}') -> Val={s_value} -> Out='{s_output_bits}'"
+            f"S{i + 1}: In='{s_input}', Ligne={int(row_bits, 2)} ('{row_bits}'), Col={int(col_bits, 2)} ('{col_bits}') -> Val={s_value} -> Out='{_bits(s_value, 4)}'"
         )
 
-    s_box_steps.append({"details": s_box_details, "full_output": s_box_output})
-    f_step_desc += f"\n  3. S-Boxes: 48 bits -> 32 bits.\n     (Détails dans 's_box_trace') -> {s_box_output}"
+    s_box_bits = _bits(s_box_output, 32)
+    f_step_desc += f"\n  3. S-Boxes: 48 bits -> 32 bits.\n     (Détails dans 's_box_trace') -> {s_box_bits}"
 
     # 4. Permutation (P): 32 bits -> 32 bits
-    f_output = permute(s_box_output, const.P)
-    f_step_desc += f"\n  4. Permutation (P): 32 bits -> 32 bits.\n     {s_box_output} -> {f_output}"
-
-    return f_output, f_step_desc
+    f_output = _apply(s_box_output, P_TABLES)
+    f_step_desc += f"\n  4. Permutation (P): 32 bits -> 32 bits.\n     {s_box_bits} -> {_bits(f_output, 32)}"
 
+    return f_output, f_step_desc, {"details": s_box_details, "full_output": s_box_bits}
 
-# --- Générateur des clés de round (Key Schedule) ---
 
-def generate_round_keys(key_bits_64: str) -> (list[str], list[dict]):
+def f_function(right_half: str, round_key: str, s_box_steps: list) -> str:
     """
-    Génère les 16 clés de round (48 bits) à partir de la clé de 64 bits.
-    Retourne la liste des clés et la trace de simulation.
+    Exécute la fonction F de Feistel.
+    (32 bits Right + 48 bits Key) -> 32 bits Output
     """
+    f_output, f_step_desc, s_box_step = _f_traced(int(right_half, 2), int(round_key, 2))
+    s_box_steps.append(s_box_step)
+    return _bits(f_output, 32), f_step_desc
+
+
+# --- Générateur des clés de round (Key Schedule) ---
+
+def _key_schedule(key_64: int, *, trace: bool) -> tuple[list[int], list[dict]]:
+    """Les 16 clés de round (entiers de 48 bits), et leur trace si demandée."""
     round_keys = []
     key_steps = []
 
     # 1. PC1 (Permuted Choice 1): 64 bits -> 56 bits
-    key_56 = permute(key_bits_64, const.PC1)
-    key_steps.append({
-        "step": "KS-1 (PC1)",
-        "description": f"Clé 64 bits permutée avec PC1 -> 56 bits.\n{key_bits_64} -> {key_56}"
-    })
+    key_56 = _apply(key_64, PC1_TABLES)
+    if trace:
+        key_steps.append({
+            "step": "KS-1 (PC1)",
+            "description": f"Clé 64 bits permutée avec PC1 -> 56 bits.\n{_bits(key_64, 64)} -> {_bits(key_56, 56)}"
+        })
 
     # 2. Séparation en C (gauche) et D (droite)
-    C = key_56[:28]
-    D = key_56[28:]
-    key_steps.append({
-        "step": "KS-2 (Split C/D)",
-        "description": f"Division en C0 (28 bits) et D0 (28 bits).\nC0 = {C}\nD0 = {D}"
-    })
+    C, D = key_56 >> 28, key_56 & _MASK_28
+    if trace:
+        key_steps.append({
+            "step": "KS-2 (Split C/D)",
+            "description": f"Division en C0 (28 bits) et D0 (28 bits).\nC0 = {_bits(C, 28)}\nD0 = {_bits(D, 28)}"
+        })
 
     # 3. 16 Rounds de décalage et PC2
-    for i in range(16):
+    for i, shift_val in enumerate(const.SHIFT):
         round_num = i + 1
 
-        # 3a. Décalage (Shift)
-        shift_val = const.SHIFT[i]
-        C = shift_left(C, shift_val)
-        D = shift_left(D, shift_val)
-
-        shift_desc = f"Round {round_num}: Décalage de {shift_val} bit(s).\nC{round_num} = {C}\nD{round_num} = {D}"
+        # 3a. Décalage circulaire (Shift) sur 28 bits
+        C = ((C << shift_val) | (C >> (28 - shift_val))) & _MASK_28
+        D = ((D << shift_val) | (D >> (28 - shift_val))) & _MASK_28
 
         # 3b. Combinaison et PC2 (Permuted Choice 2)
-        CD = C + D
-        K_i = permute(CD, const.PC2)  # Clé de round de 48 bits
+        CD = (C << 28) | D
+        K_i = _apply(CD, PC2_TABLES)  # Clé de round de 48 bits
         round_keys.append(K_i)
 
-        key_steps.append({
-            "step": f"KS-3 (Round {round_num})",
-            "description": f"{shift_desc}\nCombinaison C+D (56 bits) -> PC2 -> K{round_num} (48 bits).\n{CD} -> {K_i}"
-        })
+        if trace:
+            shift_desc = f"Round {round_num}: Décalage de {shift_val} bit(s).\nC{round_num} = {_bits(C, 28)}\nD{round_num} = {_bits(D, 28)}"
+            key_steps.append({
+                "step": f"KS-3 (Round {round_num})",
+                "description": f"{shift_desc}\nCombinaison C+D (56 bits) -> PC2 -> K{round_num} (48 bits).\n{_bits(CD, 56)} -> {_bits(K_i, 48)}"
+            })
 
     return round_keys, key_steps
 
 
+def cached_key_schedule(key: bytes, *, trace: bool) -> Schedule:
+    """`_key_schedule` d'une clé de 8 octets, servi par le cache partagé."""
+
+    def build(raw: bytes) -> Schedule:
+        round_keys, key_steps = _key_schedule(int.from_bytes(raw, "big"), trace=trace)
+        return Schedule(tuple(round_keys), tuple(key_steps))
+
+    return SCHEDULES.get("des/traced" if trace else "des", key, build)
+
+
+def generate_round_keys(key_bits_64: str) -> (list[str], list[dict]):
+    """
+    Génère les 16 clés de round (48 bits) à partir de la clé de 64 bits.
+    Retourne la liste des clés et la trace de simulation.
+    """
+    round_keys, key_steps = _key_schedule(int(key_bits_64, 2), trace=True)
+    return [_bits(k, 48) for k in round_keys], key_steps
+
+
 # --- Simulateur Principal ---
 
 def simulate_des_encrypt(plain_text_str: str, key_str: str) -> dict:
@@ -174,26 +304,28 @@ def simulate_des_encrypt(plain_text_str: str, key_str: str) -> dict:
 
     # --- Phase 1: Génération des Clés de Round ---
     steps.append({"phase": "Génération des Clés", "step": "KS-0", "description": "Démarrage du Key Schedule..."})
-    round_keys, key_steps = generate_round_keys(key_bits_64)
-    steps.extend(key_steps)  # Ajoute toutes les étapes de génération de clé
+    # Un caractère hors Latin-1 rend plus de 8 bits : seuls les 64 premiers
+    # comptent, comme dans les tables FIPS.
+    schedule = cached_key_schedule(int(key_bits_64[:64], 2).to_bytes(8, "big"), trace=True)
+    round_keys = schedule.round_keys
+    steps.extend(schedule.steps())  # Ajoute toutes les étapes de génération de clé
 
     # --- Phase 2: Chiffrement du Bloc ---
 
     # 1. Permutation Initiale (IP)
-    ip_bits = permute(plain_bits_64, const.IP)
+    ip = _apply(int(plain_bits_64[:64], 2), IP_TABLES)
     steps.append({
         "phase": "Chiffrement",
         "step": 1,
-        "description": f"Permutation Initiale (IP) sur le bloc de 64 bits.\n{plain_bits_64} -> {ip_bits}"
+        "description": f"Permutation Initiale (IP) sur le bloc de 64 bits.\n{plain_bits_64} -> {_bits(ip, 64)}"
     })
 
     # 2. Séparation en L0 (gauche) et R0 (droite)
-    L = ip_bits[:32]
-    R = ip_bits[32:]
+    L, R = ip >> 32, ip & _MASK_32
     steps.append({
         "phase": "Chiffrement",
         "step": 2,
-        "description": f"Séparation en L0 (32 bits) et R0 (32 bits).\nL0 = {L}\nR0 = {R}"
+        "description": f"Séparation en L0 (32 bits) et R0 (32 bits).\nL0 = {_bits(L, 32)}\nR0 = {_bits(R, 32)}"
     })
 
     # 3. 16 Rounds de Feistel
@@ -206,54 +338,48 @@ def simulate_des_encrypt(plain_text_str: str, key_str: str) -> dict:
 
         # Logique de Feistel: R_i = L_{i-1} XOR F(R_{i-1}, K_i)
         K_i = round_keys[i]
-
-        # Appel de la fonction F
-        s_box_trace_for_round = []
-        f_output, f_step_desc = f_function(R_prev, K_i, s_box_trace_for_round)
-
-        R = xor(L_prev, f_output)
+        f_output, f_step_desc, s_box_step = _f_traced(R_prev, K_i)
+        R = L_prev ^ f_output
 
         # Sauvegarde des traces
-        s_box_traces.append({
-            "round": round_num,
-            "trace": s_box_trace_for_round[0]  # s_box_trace_for_round est une liste avec 1 élément dict
-        })
+        s_box_traces.append({"round": round_num, "trace": s_box_step})
 
+        L_prev_bits, R_prev_bits, R_bits = _bits(L_prev, 32), _bits(R_prev, 32), _bits(R, 32)
         steps.append({
             "phase": "Chiffrement",
             "step": f"Round {round_num}",
             "description": (
-                f"L{round_num - 1} = {L_prev}\nR{round_num - 1} = {R_prev}\nK{round_num} = {K_i}\n\n"
+                f"L{round_num - 1} = {L_prev_bits}\nR{round_num - 1} = {R_prev_bits}\nK{round_num} = {_bits(K_i, 48)}\n\n"
                 f"Calcul de la Fonction F(R{round_num - 1}, K{round_num}):\n{f_step_desc}\n\n"
                 f"Calcul de L{round_num} et R{round_num}:\n"
-                f"L{round_num} = R{round_num - 1} = {R_prev}\n"
-                f"R{round_num} = L{round_num - 1} XOR F(...) = {L_prev} XOR {f_output} = {R}"
+                f"L{round_num} = R{round_num - 1} = {R_prev_bits}\n"
+                f"R{round_num} = L{round_num - 1} XOR F(...) = {L_prev_bits} XOR {_bits(f_output, 32)} = {R_bits}"
             ),
-            f"L{round_num}": L,
-            f"R{round_num}": R
+            f"L{round_num}": R_prev_bits,
+            f"R{round_num}": R_bits
         })
 
     # 4. Swap final (R16, L16)
-    final_block_before_perm = R + L  # Note: R vient avant L
+    final_block_before_perm = (R << 32) | L  # Note: R vient avant L
     steps.append({
         "phase": "Chiffrement",
         "step": "Final Swap",
-        "description": f"Fin des 16 rounds. Recombinaison finale (R16, L16).\nR16 = {R}\nL16 = {L}\nBloc (R16+L16) = {final_block_before_perm}"
+        "description": f"Fin des 16 rounds. Recombinaison finale (R16, L16).\nR16 = {_bits(R, 32)}\nL16 = {_bits(L, 32)}\nBloc (R16+L16) = {_bits(final_block_before_perm, 64)}"
     })
 
     # 5. Permutation Finale (IP-1)
-    cipher_bits = permute(final_block_before_perm, const.IP_1)
-    cipher_hex = bits_to_hex(cipher_bits)
+    cipher = _apply(final_block_before_perm, FP_TABLES)
+    cipher_bits = _bits(cipher, 64)
 
     steps.append({
         "phase": "Final",
         "step": "IP-1",
-        "description": f"Application de la Permutation Finale (IP-1).\n{final_block_before_perm} -> {cipher_bits}"
+        "description": f"Application de la Permutation Finale (IP-1).\n{_bits(final_block_before_perm, 64)} -> {cipher_bits}"
     })
 
     return {
         "final_result_bits": cipher_bits,
-        "final_result_hex": cipher_hex,
+        "final_result_hex": bits_to_hex(cipher_bits),
         "steps": steps,
         "s_box_traces": s_box_traces
     }
@@ -281,16 +407,25 @@ def pkcs7_unpad(data: bytes, block_size: int = 8) -> bytes:
 # l'ordre K1..K16 a chiffré. C'est la propriété centrale que cette fonction
 # rend visible : chiffrer et déchiffrer, c'est le même circuit.
 
-def _feistel_rounds(bits_64: str, round_keys: list[str], *, reverse: bool) -> tuple[str, list[dict], list[dict]]:
+def _feistel_rounds(
+    block: int, round_keys: list[int], *, reverse: bool, window: Window = FULL
+) -> tuple[int, list[dict], list[dict]]:
+    """
+    Un bloc de 64 bits, tracé. Seuls les rounds de `window` sont rendus en
+    bits ; IP et IP-1, qui n'ont pas de round, ne le sont que sans filtre de
+    rounds. Les autres rounds passent par `f_fast`.
+    """
     steps = []
     s_box_traces = []
+    trace_ends = window.rounds is None
 
-    ip_bits = permute(bits_64, const.IP)
-    steps.append({"phase": "Permutation Initiale (IP)",
-                  "description": f"{bits_64} -> {ip_bits}"})
+    ip = _apply(block, IP_TABLES)
+    if trace_ends:
+        steps.append({"phase": "Permutation Initiale (IP)",
+                      "description": f"{_bits(block, 64)} -> {_bits(ip, 64)}"})
 
-    L, R = ip_bits[:32], ip_bits[32:]
-    keys_in_order = list(reversed(round_keys)) if reverse else round_keys
+    L, R = ip >> 32, ip & _MASK_32
+    keys_in_order = round_keys[::-1] if reverse else round_keys
 
     for i in range(16):
         round_num = i + 1
@@ -298,27 +433,33 @@ def _feistel_rounds(bits_64: str, round_keys: list[str], *, reverse: bool) -> tu
         L = R_prev
         K_i = keys_in_order[i]
 
-        s_box_trace_for_round = []
-        f_output, f_step_desc = f_function(R_prev, K_i, s_box_trace_for_round)
-        R = xor(L_prev, f_output)
+        if not window.has_round(round_num):
+            R = L_prev ^ f_fast(R_prev, K_i)
+            continue
+
+        f_output, f_step_desc, s_box_step = _f_traced(R_prev, K_i)
+        R = L_prev ^ f_output
 
-        s_box_traces.append({"round": round_num, "trace": s_box_trace_for_round[0]})
+        s_box_traces.append({"round": round_num, "trace": s_box_step})
         steps.append({
             "phase": "Déchiffrement" if reverse else "Chiffrement",
             "round": round_num,
             "description": f"Round {round_num} : {f_step_desc}",
         })
 
-    final_block = R + L
-    cipher_bits = permute(final_block, const.IP_1)
-    steps.append({"phase": "Permutation Finale (IP-1)",
-                  "description": f"{final_block} -> {cipher_bits}"})
-    return cipher_bits, steps, s_box_traces
+    final_block = (R << 32) | L
+    result = _apply(final_block, FP_TABLES)
+    if trace_ends:
+        steps.append({"phase": "Permutation Finale (IP-1)",
+                      "description": f"{_bits(final_block, 64)} -> {_bits(result, 64)}"})
+    return result, steps, s_box_traces
 
 
 def encrypt_block_bits(bits_64: str, round_keys: list[str]) -> tuple[str, list[dict]]:
-    result, steps, _ = _feistel_rounds(bits_64, round_keys, reverse=False)
-    return result, steps
+    result, steps, _ = _feistel_rounds(
+        int(bits_64, 2), [int(k, 2) for k in round_keys], reverse=False
+    )
+    return _bits(result, 64), steps
 
 
 def decrypt_block_bits(bits_64: str, round_keys: list[str]) -> tuple[str, list[dict]]:
@@ -326,8 +467,10 @@ def decrypt_block_bits(bits_64: str, round_keys: list[str]) -> tuple[str, list[d
     Déchiffre un bloc de 64 bits : mêmes 16 rounds de Feistel, mais les clés
     de round sont appliquées dans l'ordre inverse (K16 en premier).
     """
-    result, steps, _ = _feistel_rounds(bits_64, round_keys, reverse=True)
-    return result, steps
+    result, steps, _ = _feistel_rounds(
+        int(bits_64, 2), [int(k, 2) for k in round_keys], reverse=True
+    )
+    return _bits(result, 64), steps
 
 
 # --- Simulation multi-blocs ---------------------------------------------------
@@ -336,17 +479,28 @@ def decrypt_block_bits(bits_64: str, round_keys: list[str]) -> tuple[str, list[d
 # PKCS#7 tracé, découpage en N blocs de 8 octets, chiffrement ET déchiffrement
 # pas à pas (blocs chaînés en ECB — CBC/CTR sont couverts par `modes_tool`).
 
-def simulate_des_encrypt_multiblock(plain_text: str, key_str: str) -> dict:
+def _key_bytes(key_str: str) -> bytes:
+    """La clé telle que `key_to_bits` la lit : 8 caractères, complétés par des espaces."""
     key = key_str if len(key_str) <= 8 else key_str[:8]
-    key = key.ljust(8, " ")
-    key_bits_64 = key_to_bits(key)
-    round_keys, key_steps = generate_round_keys(key_bits_64)
+    return int(key_to_bits(key.ljust(8, " "))[:64], 2).to_bytes(8, "big")
+
+
+def iter_des_encrypt_multiblock(plain_text: str, key_str: str, window: Window = FULL) -> Trace:
+    """
+    Trace du chiffrement multi-blocs, produite bloc par bloc : l'étape d'un
+    bloc est émise dès qu'il est chiffré.
+
+    `window` restreint la trace aux blocs et rounds demandés ; les autres blocs
+    passent par le cœur entier (`encrypt_block_fast`), et le chiffré reste le même.
+    """
+    schedule = cached_key_schedule(_key_bytes(key_str), trace=not window.summary)
+    round_keys = schedule.round_keys
 
     plain_bytes = plain_text.encode("utf-8")
     padded = pkcs7_pad(plain_bytes, 8)
     blocks = [padded[i:i + 8] for i in range(0, len(padded), 8)]
 
-    steps = [{
+    yield {
         "step": 0,
         "phase": "Bourrage PKCS#7",
         "description": (
@@ -356,61 +510,81 @@ def simulate_des_encrypt_multiblock(plain_text: str, key_str: str) -> dict:
             f"Découpage en {len(blocks)} bloc(s) de 8 octets."
         ),
         "block_count": len(blocks),
-    }]
-    steps.extend(key_steps)
+    }
+    step_counter = 1
+    if not window.summary:
+        yield from schedule.steps()
+        step_counter += len(schedule.trace)
 
     cipher_bytes = b""
     block_results = []
     for index, block in enumerate(blocks):
-        block_bits = "".join(format(byte, "08b") for byte in block)
-        cipher_bits, block_steps = encrypt_block_bits(block_bits, round_keys)
-        cipher_block = bytes(int(cipher_bits[i:i + 8], 2) for i in range(0, 64, 8))
+        if not window.has_block(index) or window.summary:
+            cipher_block = encrypt_block_fast(block, round_keys)
+        else:
+            cipher, block_steps, _ = _feistel_rounds(
+                int.from_bytes(block, "big"), round_keys, reverse=False, window=window
+            )
+            cipher_block = cipher.to_bytes(8, "big")
         cipher_bytes += cipher_block
-        for s in block_steps:
-            s["block"] = index
-        steps.append({
-            "step": len(steps),
+        block_results.append(cipher_block.hex().upper())
+        if not window.has_block(index):
+            continue
+
+        step = {
+            "step": step_counter,
             "phase": "Bloc",
             "block": index,
             "description": f"--- Bloc {index} ({block.hex()}) ---",
-            "block_steps": block_steps,
             "block_result_hex": cipher_block.hex().upper(),
-        })
-        block_results.append(cipher_block.hex().upper())
+        }
+        if not window.summary:
+            for s in block_steps:
+                s["block"] = index
+            step["block_steps"] = block_steps
+        yield step
+        step_counter += 1
 
     final_hex = cipher_bytes.hex().upper()
-    steps.append({
-        "step": len(steps),
+    yield {
+        "step": step_counter,
         "phase": "Final",
         "description": f"Fin du chiffrement. Résultat ({len(blocks)} bloc(s)) : {final_hex}",
         "final_result_hex": final_hex,
-    })
+    }
 
-    return {
+    summary = {
         "final_result_hex": final_hex,
         "block_count": len(blocks),
         "block_results": block_results,
-        "steps": steps,
     }
+    if not window.is_full:
+        summary["window"] = window.describe(len(blocks))
+    return summary
+
+
+def simulate_des_encrypt_multiblock(
+    plain_text: str, key_str: str, window: Window = FULL
+) -> dict:
+    return drain(iter_des_encrypt_multiblock(plain_text, key_str, window))
 
 
 def simulate_des_decrypt_multiblock(cipher_hex: str, key_str: str) -> dict:
-    key = key_str if len(key_str) <= 8 else key_str[:8]
-    key = key.ljust(8, " ")
-    key_bits_64 = key_to_bits(key)
-    round_keys, key_steps = generate_round_keys(key_bits_64)
+    schedule = cached_key_schedule(_key_bytes(key_str), trace=True)
+    round_keys = schedule.round_keys
 
     cipher_bytes = bytes.fromhex(cipher_hex)
     if len(cipher_bytes) % 8 != 0:
         raise ValueError("Le chiffré doit être un multiple de 8 octets.")
     blocks = [cipher_bytes[i:i + 8] for i in range(0, len(cipher_bytes), 8)]
 
-    steps = list(key_steps)
+    steps = schedule.steps()
     plain_padded = b""
     for index, block in enumerate(blocks):
-        block_bits = "".join(format(byte, "08b") for byte in block)
-        plain_bits, block_steps = decrypt_block_bits(block_bits, round_keys)
-        plain_block = bytes(int(plain_bits[i:i + 8], 2) for i in range(0, 64, 8))
+        plain, block_steps, _ = _feistel_rounds(
+            int.from_bytes(block, "big"), round_keys, reverse=True
+        )
+        plain_block = plain.to_bytes(8, "big")
         plain_padded += plain_block
         for s in block_steps:
             s["block"] = index
@@ -4,7 +4,7 @@ from Crypto.Cipher import DES
 from Crypto.Util.Padding import pad, unpad
 
 from registry.errors import DecryptionFailed, InvalidInput
-from utils.hash_tool import pbkdf2_derive
+from utils.kdf_cache import cached_pbkdf2
 
 KDF_ITERATIONS = 200_000
 SALT_SIZE = 16
@@ -23,7 +23,7 @@ def get_des_key(key_string: str, salt: bytes | None = None) -> tuple[bytes, byte
     """
     if salt is None:
         salt = os.urandom(SALT_SIZE)
-    key_bytes = pbkdf2_derive(key_string, salt, iterations=KDF_ITERATIONS, dklen=8)
+    key_bytes = cached_pbkdf2(key_string, salt, iterations=KDF_ITERATIONS, dklen=8)
     return key_bytes, salt
 
 
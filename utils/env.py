@@ -0,0 +1,51 @@
+"""
+Lecture tolerante des variables d'environnement de CryptoLab.
+
+Une valeur mal formee (`CRYPTOLAB_STREAM_MAX_BYTES=16MB`) ne doit pas empecher
+le serveur de demarrer : elle est signalee dans le journal, et la valeur par
+defaut s'applique. Une variable vide ou absente prend le defaut sans bruit.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _raw(name: str) -> str:
+    return os.getenv(name, "").strip()
+
+
+def env_int(name: str, default: int, *, minimum: int = 0) -> int:
+    """Entier de `name`, ramene a `minimum` au moins ; `default` s'il est absent ou invalide."""
+    raw = _raw(name)
+    if not raw:
+        return default
+    try:
+        return max(minimum, int(raw))
+    except ValueError:
+        logger.warning("%s n'est pas un entier : valeur par defaut %d.", name, default)
+        return default
+
+
+def env_float(
+    name: str, default: float, *, minimum: float = 0.0, maximum: float | None = None
+) -> float:
+    """Nombre de `name`, borne a [minimum, maximum] ; `default` s'il est absent ou invalide."""
+    raw = _raw(name)
+    if not raw:
+        return default
+    try:
+        value = max(minimum, float(raw))
+    except ValueError:
+        logger.warning("%s n'est pas un nombre : valeur par defaut %s.", name, default)
+        return default
+    return value if maximum is None else min(maximum, value)
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Interrupteur : vrai si `name` vaut `true` (casse indifferente)."""
+    raw = _raw(name).lower()
+    return raw == "true" if raw else default
@@ -25,7 +25,7 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.padding import PKCS7
 
 from registry.errors import DecryptionFailed, InvalidInput
-from utils.hash_tool import pbkdf2_derive
+from utils.kdf_cache import cached_pbkdf2
 
 KDF_ITERATIONS = 200_000
 SALT_SIZE = 16
@@ -35,7 +35,7 @@ CAMELLIA_BLOCK_SIZE = 16  # octets
 def _derive(key_string: str, key_size: int, salt: bytes | None = None) -> tuple[bytes, bytes]:
     if salt is None:
         salt = os.urandom(SALT_SIZE)
-    key_bytes = pbkdf2_derive(key_string, salt, iterations=KDF_ITERATIONS, dklen=key_size)
+    key_bytes = cached_pbkdf2(key_string, salt, iterations=KDF_ITERATIONS, dklen=key_size)
     return key_bytes, salt
 
 
@@ -2,8 +2,6 @@ import hashlib
 import hmac
 import time
 
-import bcrypt
-
 from utils.sha1_tool import sha1_from_scratch
 
 # Cout bcrypt par defaut. 12 est la recommandation OWASP courante : assez lent
@@ -31,6 +29,10 @@ def hash_bcrypt(text: str, cost: int = DEFAULT_BCRYPT_COST) -> str:
     GPU/ASIC des attaquants, malgre l'acceleration materielle qui augmente
     chaque annee.
     """
+    # Import differe, comme argon2 plus bas : bcrypt n'est charge qu'au
+    # premier hachage, pas au demarrage du serveur.
+    import bcrypt
+
     text_bytes = text.encode('utf-8')
     salt = bcrypt.gensalt(rounds=cost)
     hashed_bytes = bcrypt.hashpw(text_bytes, salt)
@@ -41,6 +43,8 @@ def verify_bcrypt(text: str, hashed_text: str) -> bool:
     """
     Vérifie si un texte en clair correspond à un hash bcrypt existant.
     """
+    import bcrypt
+
     try:
         text_bytes = text.encode('utf-8')
         hashed_bytes = hashed_text.encode('utf-8')
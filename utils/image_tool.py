@@ -0,0 +1,199 @@
+"""
+Le pingouin ECB sur une vraie image : on chiffre les pixels d'un BMP ou d'un
+PPM/PGM et on garde son en-tete intact, pour que le resultat s'ouvre encore
+dans une visionneuse.
+
+En ECB, deux blocs de pixels identiques (un aplat de couleur) donnent deux
+blocs de chiffre identiques : les contours de l'image restent visibles. En CBC
+et en CTR, l'image devient du bruit. `modes_tool.ecb_penguin_demo` le montre
+sur un bloc repete ; ici, c'est le fichier de l'etudiant.
+
+Les pixels sont lus une seule fois, morceau par morceau, au travers d'une
+`memoryview` partagee : chaque morceau passe dans les trois objets AES pendant
+qu'il est encore en cache, et chaque chiffre ecrit directement a sa place dans
+l'image de sortie. Aucune boucle Python par bloc.
+
+Le dernier bloc incomplet des pixels (moins de 16 octets) reste en clair en
+ECB et en CBC : un bourrage agrandirait le fichier que l'en-tete decrit. CTR,
+chiffrement de flot, chiffre tout.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from registry.errors import InvalidInput
+from utils.modes_tool import BLOCK_SIZE, MODES, Buffer, StreamEncryptor, new_cipher
+
+#: Octets lus par morceau ; multiple de BLOCK_SIZE.
+CHUNK = 64 * 1024
+
+#: Au-dela, l'en-tete est refuse (palette comprise, un BMP en prend ~1 Ko).
+MAX_HEADER = 64 * 1024
+
+_WHITESPACE = b" \t\n\r\x0b\x0c"
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """Ce que l'en-tete dit de l'image. `offset` : debut des pixels."""
+
+    format: str
+    offset: int
+    width: int
+    height: int
+
+    @property
+    def media_type(self) -> str:
+        return {
+            "bmp": "image/bmp",
+            "ppm": "image/x-portable-pixmap",
+            "pgm": "image/x-portable-graymap",
+        }[self.format]
+
+    @property
+    def extension(self) -> str:
+        return self.format
+
+
+def _bmp_header(data: Buffer) -> ImageHeader | None:
+    if len(data) < 26:
+        return None
+    offset = int.from_bytes(data[10:14], "little")
+    dib_size = int.from_bytes(data[14:18], "little")
+    if dib_size == 12:
+        # BITMAPCOREHEADER (OS/2) : dimensions sur 16 bits.
+        width = int.from_bytes(data[18:20], "little")
+        height = int.from_bytes(data[20:22], "little")
+    else:
+        width = int.from_bytes(data[18:22], "little", signed=True)
+        # Hauteur negative : lignes stockees de haut en bas.
+        height = abs(int.from_bytes(data[22:26], "little", signed=True))
+    if not 14 + dib_size <= offset <= MAX_HEADER:
+        raise InvalidInput(f"En-tete BMP invalide : pixels annonces a l'octet {offset}.")
+    return ImageHeader("bmp", offset, width, height)
+
+
+def _netpbm_header(data: Buffer) -> ImageHeader | None:
+    # P6 (PPM, couleur) et P5 (PGM, gris) : "P6 <largeur> <hauteur> <max>",
+    # separes par des blancs, commentaires "#" jusqu'a la fin de ligne, puis
+    # UN blanc avant les pixels.
+    raw = bytes(data[:MAX_HEADER])
+    fields: list[int] = []
+    position = 2
+    while len(fields) < 3:
+        while position < len(raw) and (raw[position] in _WHITESPACE or raw[position] == ord("#")):
+            if raw[position] == ord("#"):
+                end = raw.find(b"\n", position)
+                if end < 0:
+                    return None
+                position = end
+            position += 1
+        start = position
+        while position < len(raw) and raw[position] in b"0123456789":
+            position += 1
+        if position == len(raw):
+            return None
+        if position == start or raw[position] not in _WHITESPACE:
+            raise InvalidInput("En-tete PPM/PGM invalide : largeur, hauteur et maximum attendus.")
+        fields.append(int(raw[start:position]))
+    width, height, maximum = fields
+    if not 0 < maximum < 65536:
+        raise InvalidInput(f"En-tete PPM/PGM invalide : valeur maximale {maximum}.")
+    return ImageHeader("ppm" if raw[:2] == b"P6" else "pgm", position + 1, width, height)
+
+
+def parse_header(data: Buffer) -> ImageHeader | None:
+    """
+    En-tete d'une image BMP, PPM (P6) ou PGM (P5), lu sur le debut du fichier.
+
+    None si `data` est trop court pour conclure : un flux relit avec plus
+    d'octets. Un format inconnu leve `InvalidInput`.
+    """
+    if len(data) < 2:
+        return None
+    magic = bytes(data[:2])
+    if magic == b"BM":
+        return _bmp_header(data)
+    if magic in (b"P6", b"P5"):
+        return _netpbm_header(data)
+    raise InvalidInput("Format non reconnu : BMP, PPM (P6) ou PGM (P5) binaires attendus.")
+
+
+def encrypt_image(data: Buffer, key: Buffer, iv: Buffer) -> tuple[dict, dict[str, bytearray]]:
+    """
+    Chiffre les pixels de `data` en ECB, CBC et CTR, en une passe.
+
+    Renvoie un resume (format, dimensions, octets chiffres) et les trois images,
+    en-tete d'origine compris.
+    """
+    header = parse_header(data)
+    if header is None or header.offset > len(data):
+        raise InvalidInput("Image tronquee : l'en-tete est incomplet.")
+
+    view = memoryview(data)
+    pixels = view[header.offset:]
+    whole = len(pixels) - len(pixels) % BLOCK_SIZE
+    ciphers = {mode: new_cipher(mode, key, iv) for mode in MODES}
+    # La copie pose l'en-tete et le reste en clair ; les pixels sont ecrases.
+    images = {mode: bytearray(view) for mode in MODES}
+    targets = {mode: memoryview(image)[header.offset:] for mode, image in images.items()}
+
+    for start in range(0, whole, CHUNK):
+        end = min(start + CHUNK, whole)
+        piece = pixels[start:end]
+        for mode, cipher in ciphers.items():
+            cipher.encrypt(piece, output=targets[mode][start:end])
+    if whole < len(pixels):
+        ciphers["ctr"].encrypt(pixels[whole:], output=targets["ctr"][whole:])
+
+    summary = {
+        "format": header.format,
+        "width": header.width,
+        "height": header.height,
+        "header_bytes": header.offset,
+        "pixel_bytes": len(pixels),
+        "clear_tail_bytes": len(pixels) - whole,
+        "modes": list(MODES),
+    }
+    return summary, images
+
+
+class ImageStreamEncryptor:
+    """
+    Une image chiffree au fil de l'eau, dans un seul mode.
+
+    L'en-tete passe tel quel des qu'il est complet ; les pixels suivent par un
+    `StreamEncryptor` sans bourrage. La memoire ne depend pas de la taille de
+    l'image.
+    """
+
+    def __init__(self, mode: str, key: Buffer, iv: Buffer) -> None:
+        self._pixels = StreamEncryptor(mode, key, iv, padding=False)
+        self._head = bytearray()
+        self.header: ImageHeader | None = None
+
+    @property
+    def processed(self) -> int:
+        head = self.header.offset if self.header is not None else len(self._head)
+        return head + self._pixels.processed
+
+    def update(self, chunk: Buffer) -> bytes:
+        """Octets a envoyer : rien tant que l'en-tete est incomplet."""
+        if self.header is not None:
+            return self._pixels.update(chunk)
+        self._head += chunk
+        header = parse_header(self._head)
+        if header is None or header.offset > len(self._head):
+            if len(self._head) > MAX_HEADER:
+                raise InvalidInput("En-tete trop long.")
+            return b""
+        self.header = header
+        head, self._head = self._head, bytearray()
+        with memoryview(head) as view:
+            return bytes(view[:header.offset]) + self._pixels.update(view[header.offset:])
+
+    def finalize(self) -> bytes:
+        if self.header is None:
+            raise InvalidInput("Image tronquee : l'en-tete est incomplet.")
+        return self._pixels.finalize()
@@ -0,0 +1,149 @@
+"""
+Cache des cles derivees par PBKDF2, pour les outils symetriques.
+
+AES, DES, 3DES, ChaCha20, Blowfish et Camellia derivent leur cle d'une phrase
+secrete par 200 000 iterations de PBKDF2-HMAC-SHA256 : environ 100 ms de CPU,
+de loin le cout dominant de la famille. En TP, l'etudiant chiffre, puis
+dechiffre le meme texte quelques secondes plus tard : la seconde derivation
+(meme phrase, meme sel, qui voyage avec le chiffre) refait exactement le meme
+calcul.
+
+Ce cache garde ces cles peu de temps, dans le processus seulement :
+
+* il est **desactive par defaut** : garder des cles en memoire est un choix
+  d'exploitation, pas un comportement implicite ;
+* la phrase secrete n'y est jamais gardee en clair : l'index porte son HMAC
+  sous un secret tire au demarrage du processus ;
+* les entrees expirent apres `ttl` secondes, le nombre d'entrees est borne, et
+  une cle evincee est effacee (remise a zero) avant d'etre oubliee. Les copies
+  deja rendues aux outils restent des `bytes`, que Python ne sait pas effacer.
+
+Configuration (environnement) :
+
+    CRYPTOLAB_KDF_CACHE         "true" pour activer le cache
+    CRYPTOLAB_KDF_CACHE_TTL     duree de vie d'une entree, en secondes (300)
+    CRYPTOLAB_KDF_CACHE_SIZE    entrees gardees au plus (128)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from utils.env import env_flag, env_int
+
+KDF_CACHE_ENABLED = env_flag("CRYPTOLAB_KDF_CACHE")
+KDF_CACHE_TTL = env_int("CRYPTOLAB_KDF_CACHE_TTL", 300)
+KDF_CACHE_SIZE = env_int("CRYPTOLAB_KDF_CACHE_SIZE", 128)
+
+#: Cle d'index : (HMAC de la phrase, sel, iterations, longueur derivee).
+_Key = tuple[bytes, bytes, int, int]
+
+
+class KdfCache:
+    """Cles derivees, bornees en nombre et en age, effacees a l'eviction."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = KDF_CACHE_ENABLED,
+        ttl: float = KDF_CACHE_TTL,
+        maxsize: int = KDF_CACHE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.enabled = enabled and maxsize > 0 and ttl > 0
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._secret = secrets.token_bytes(32)
+        self._entries: OrderedDict[_Key, tuple[float, bytearray]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _index(self, password: str, salt: bytes, iterations: int, dklen: int) -> _Key:
+        tag = hmac.new(self._secret, password.encode("utf-8"), hashlib.sha256).digest()
+        return tag, bytes(salt), iterations, dklen
+
+    def _drop(self, key: _Key) -> None:
+        _, buffer = self._entries.pop(key)
+        buffer[:] = bytes(len(buffer))
+
+    def _evict(self, key: _Key) -> None:
+        self._drop(key)
+        self.evictions += 1
+
+    def _expire(self, now: float) -> None:
+        # Meme duree de vie pour toutes : l'ordre d'insertion est celui
+        # d'expiration, et les perimees sont en tete.
+        while self._entries:
+            key, (expires, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            self._evict(key)
+
+    def derive(self, password: str, salt: bytes, iterations: int, dklen: int) -> bytes:
+        """`pbkdf2_derive(password, salt, iterations, dklen)`, servi par le cache."""
+        # Import differe : hash_tool charge bcrypt, et ce module est importe au
+        # demarrage par /api/metrics.
+        from utils.hash_tool import pbkdf2_derive
+
+        if not self.enabled:
+            return pbkdf2_derive(password, salt, iterations=iterations, dklen=dklen)
+
+        key = self._index(password, salt, iterations, dklen)
+        with self._lock:
+            self._expire(self._clock())
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return bytes(entry[1])
+            self.misses += 1
+
+        derived = pbkdf2_derive(password, salt, iterations=iterations, dklen=dklen)
+        with self._lock:
+            if key in self._entries:
+                # Deux requetes simultanees sur une meme cle : garder la derniere.
+                self._drop(key)
+            self._entries[key] = (self._clock() + self.ttl, bytearray(derived))
+            while len(self._entries) > self.maxsize:
+                self._evict(next(iter(self._entries)))
+        return derived
+
+    def clear(self) -> None:
+        """Efface toutes les entrees (remises a zero) et les compteurs."""
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._expire(self._clock())
+            lookups = self.hits + self.misses
+            return {
+                "name": "pbkdf2",
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+KDF_CACHE = KdfCache()
+
+
+def cached_pbkdf2(password: str, salt: bytes, iterations: int = 200_000, dklen: int = 32) -> bytes:
+    """PBKDF2-HMAC-SHA256 des outils symetriques, via le cache du processus."""
+    return KDF_CACHE.derive(password, salt, iterations, dklen)
@@ -0,0 +1,94 @@
+"""
+Cache LRU des key schedules (clés de round), partagé par les simulateurs.
+
+En TP, un étudiant relance dix fois la même simulation avec la même clé : le
+key schedule — et surtout sa trace, rendue en texte étape par étape — était
+recalculé à chaque fois. Ce cache le garde, indexé par un espace de noms (le
+coeur qui l'utilise : « aes-128 », « des »…) et par les octets de la clé.
+
+Les entrées sont figées : clés de round en tuples, étapes de trace restituées
+en copies par `Schedule.steps()`, puisque les simulateurs annotent leurs
+étapes (numéro de bloc) avant de les renvoyer.
+
+Configuration (environnement) :
+
+    CRYPTOLAB_KEY_SCHEDULE_CACHE   entrées gardées (0 = pas de cache)
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from utils.env import env_int
+
+KEY_SCHEDULE_CACHE_SIZE = env_int("CRYPTOLAB_KEY_SCHEDULE_CACHE", 256)
+
+
+class Schedule(NamedTuple):
+    """Clés de round et, si elle a été demandée, la trace de leur calcul."""
+
+    round_keys: tuple
+    trace: tuple[dict, ...] = ()
+
+    def steps(self) -> list[dict]:
+        """Les étapes de la trace, en copies que l'appelant peut annoter."""
+        return [dict(step) for step in self.trace]
+
+
+class KeyScheduleCache:
+    """LRU borné, sûr entre threads, avec compteurs de succès et d'échecs."""
+
+    def __init__(self, name: str, maxsize: int = KEY_SCHEDULE_CACHE_SIZE) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, bytes], Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace: str, key: bytes, build: Callable[[bytes], Any]) -> Any:
+        """
+        L'entrée de `key` dans `namespace`, calculée par `build(key)` au
+        premier appel. `build` tourne hors du verrou : deux requêtes simultanées
+        sur une même clé neuve la calculent deux fois, sans se bloquer.
+        """
+        entry_key = (namespace, bytes(key))
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return self._entries[entry_key]
+            self.misses += 1
+
+        value = build(entry_key[1])
+        if self.maxsize:
+            with self._lock:
+                self._entries[entry_key] = value
+                self._entries.move_to_end(entry_key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+#: Le cache commun à `aes_simulator`, `des_simulator` et à leurs coeurs rapides.
+SCHEDULES = KeyScheduleCache("key_schedules")
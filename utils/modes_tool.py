@@ -7,6 +7,9 @@ C'est une couche strictement pedagogique : en production (`aes_tool.py`),
 l'IV/le nonce ne sont *jamais* fournis par l'appelant, ils sont toujours
 tires au hasard par le chiffre. Exposer l'IV ici serait une faute grave
 ailleurs — le but explicite de ce module est de le rendre visible.
+
+Chaque mode existe en deux formes : sur des octets (`encrypt_*_bytes`, servies
+par les routes binaires) et en hexadecimal (`encrypt_*`, routes JSON).
 """
 
 from Crypto.Cipher import AES
@@ -15,24 +18,148 @@ from Crypto.Util import Counter
 from registry.errors import InvalidInput
 
 BLOCK_SIZE = 16
+MODES = ("ecb", "cbc", "ctr")
 
 
-def _key_and_blocks(key_hex: str, plaintext_hex: str) -> tuple[bytes, bytes]:
-    try:
-        key_bytes = bytes.fromhex(key_hex)
-        plain_bytes = bytes.fromhex(plaintext_hex)
-    except ValueError as exc:
-        raise InvalidInput("key_hex et plaintext_hex doivent etre hexadecimaux.") from exc
-    if len(key_bytes) not in (16, 24, 32):
+#: Tout objet qui expose ses octets sans copie (bytes, bytearray, memoryview).
+Buffer = bytes | bytearray | memoryview
+
+
+def _check_key(key: Buffer) -> None:
+    if len(key) not in (16, 24, 32):
         raise InvalidInput("La cle doit faire 16, 24 ou 32 octets (AES-128/192/256).")
-    if len(plain_bytes) % BLOCK_SIZE != 0:
+
+
+def _check_blocks(key: Buffer, data: Buffer) -> None:
+    _check_key(key)
+    if len(data) % BLOCK_SIZE != 0:
         raise InvalidInput(
             f"Le texte doit etre un multiple de {BLOCK_SIZE} octets pour ECB/CBC "
             f"(pas de bourrage applique dans ce module pedagogique)."
         )
-    return key_bytes, plain_bytes
 
 
+def _check_iv(iv: Buffer, label: str) -> None:
+    if len(iv) != BLOCK_SIZE:
+        raise InvalidInput(f"{label} doit faire {BLOCK_SIZE} octets.")
+
+
+def new_cipher(mode: str, key: Buffer, iv: Buffer):
+    """Objet AES de `mode` ("ecb", "cbc" ou "ctr"), cle et IV verifies."""
+    _check_key(key)
+    if mode == "ecb":
+        return AES.new(key, AES.MODE_ECB)
+    if mode == "cbc":
+        _check_iv(iv, "L'IV")
+        return AES.new(key, AES.MODE_CBC, iv=iv)
+    if mode == "ctr":
+        _check_iv(iv, "Le compteur initial")
+        ctr = Counter.new(128, initial_value=int.from_bytes(iv, "big"))
+        return AES.new(key, AES.MODE_CTR, counter=ctr)
+    raise InvalidInput(f"Mode inconnu : {mode!r}. Modes disponibles : {', '.join(MODES)}.")
+
+
+def _encrypt_into(cipher, data: Buffer) -> bytearray:
+    # Le chiffre ecrit directement dans le tampon de sortie : ni copie de
+    # l'entree (une memoryview est lue telle quelle), ni bytes intermediaire.
+    out = bytearray(len(data))
+    cipher.encrypt(data, output=out)
+    return out
+
+
+def _unhex(key_hex: str, plaintext_hex: str) -> tuple[bytes, bytes]:
+    try:
+        return bytes.fromhex(key_hex), bytes.fromhex(plaintext_hex)
+    except ValueError as exc:
+        raise InvalidInput("key_hex et plaintext_hex doivent etre hexadecimaux.") from exc
+
+
+def _unhex_iv(iv_hex: str) -> bytes:
+    try:
+        return bytes.fromhex(iv_hex)
+    except ValueError as exc:
+        raise InvalidInput("iv_hex doit etre hexadecimal.") from exc
+
+
+# --- Octets bruts ---
+#
+# Le coeur de chaque mode, sur des octets. Les variantes hexadecimales plus bas
+# et les routes binaires (routers/binary.py) le partagent.
+
+def encrypt_ecb_bytes(key: Buffer, data: Buffer) -> bytearray:
+    """ECB sur des octets bruts (voir `encrypt_ecb`)."""
+    _check_blocks(key, data)
+    return _encrypt_into(new_cipher("ecb", key, b""), data)
+
+
+def encrypt_cbc_bytes(key: Buffer, data: Buffer, iv: Buffer) -> bytearray:
+    """CBC sur des octets bruts (voir `encrypt_cbc`)."""
+    _check_blocks(key, data)
+    return _encrypt_into(new_cipher("cbc", key, iv), data)
+
+
+def encrypt_ctr_bytes(key: Buffer, data: Buffer, iv: Buffer) -> bytearray:
+    """CTR sur des octets bruts (voir `encrypt_ctr`)."""
+    _check_blocks(key, data)
+    return _encrypt_into(new_cipher("ctr", key, iv), data)
+
+
+# --- Flux ---
+
+class StreamEncryptor:
+    """
+    Chiffre un flux morceau par morceau, avec un seul objet AES.
+
+    L'etat du mode (bloc de chiffre precedent en CBC, compteur en CTR) vit dans
+    cet objet d'un morceau a l'autre : le resultat est identique, octet pour
+    octet, au chiffrement du flux entier en une fois. La memoire ne depend que
+    de la taille d'un morceau, jamais de celle du fichier.
+
+    ECB et CBC ne chiffrent que des blocs entiers : un fichier quelconque n'en
+    est pas un multiple, donc `finalize` ajoute un bourrage PKCS#7 (1 a 16
+    octets, toujours present). CTR est un flot : ni bourrage, ni reste.
+
+    `padding=False` garde la taille du fichier : le dernier bloc incomplet
+    (moins de 16 octets) ressort en clair. C'est ce que veut une image, dont
+    l'en-tete annonce la taille (voir utils/image_tool.py).
+    """
+
+    def __init__(self, mode: str, key: Buffer, iv: Buffer = b"", *, padding: bool = True) -> None:
+        self.mode = mode
+        self._cipher = new_cipher(mode, key, iv)
+        self._blocks = mode != "ctr"
+        self._padding = padding
+        # Fin de morceau qui ne remplit pas un bloc : moins de 16 octets.
+        self._pending = bytearray()
+        self.processed = 0
+
+    def update(self, chunk: Buffer) -> bytes:
+        """Chiffre ce qui peut l'etre de `chunk` ; garde le bloc incomplet."""
+        self.processed += len(chunk)
+        if not self._blocks:
+            return self._cipher.encrypt(chunk)
+        self._pending += chunk
+        usable = len(self._pending) - len(self._pending) % BLOCK_SIZE
+        if not usable:
+            return b""
+        with memoryview(self._pending) as view:
+            out = self._cipher.encrypt(view[:usable])
+        del self._pending[:usable]
+        return out
+
+    def finalize(self) -> bytes:
+        """Dernier bloc, bourre en PKCS#7 pour ECB/CBC. L'objet est alors epuise."""
+        if not self._blocks:
+            return b""
+        if not self._padding:
+            return bytes(self._pending)
+        padding = BLOCK_SIZE - len(self._pending)
+        self._pending += bytes([padding]) * padding
+        return self._cipher.encrypt(self._pending)
+
+
+# --- Hexadecimal ---
+
 def encrypt_ecb(key_hex: str, plaintext_hex: str) -> dict:
     """
     ECB (Electronic Codebook) : chaque bloc de 16 octets est chiffre
@@ -40,9 +167,8 @@ def encrypt_ecb(key_hex: str, plaintext_hex: str) -> dict:
     toujours deux blocs de chiffre identiques — c'est le "pingouin ECB" : le
     motif du clair reste visible dans le chiffre.
     """
-    key_bytes, plain_bytes = _key_and_blocks(key_hex, plaintext_hex)
-    cipher = AES.new(key_bytes, AES.MODE_ECB)
-    return {"cipher_hex": cipher.encrypt(plain_bytes).hex()}
+    key_bytes, plain_bytes = _unhex(key_hex, plaintext_hex)
+    return {"cipher_hex": encrypt_ecb_bytes(key_bytes, plain_bytes).hex()}
 
 
 def encrypt_cbc(key_hex: str, plaintext_hex: str, iv_hex: str) -> dict:
@@ -52,15 +178,9 @@ def encrypt_cbc(key_hex: str, plaintext_hex: str, iv_hex: str) -> dict:
     de clair identiques donnent des blocs de chiffre differents des que leur
     contexte (bloc precedent) differe.
     """
-    key_bytes, plain_bytes = _key_and_blocks(key_hex, plaintext_hex)
-    try:
-        iv_bytes = bytes.fromhex(iv_hex)
-    except ValueError as exc:
-        raise InvalidInput("iv_hex doit etre hexadecimal.") from exc
-    if len(iv_bytes) != BLOCK_SIZE:
-        raise InvalidInput(f"L'IV doit faire {BLOCK_SIZE} octets.")
-    cipher = AES.new(key_bytes, AES.MODE_CBC, iv=iv_bytes)
-    return {"cipher_hex": cipher.encrypt(plain_bytes).hex()}
+    key_bytes, plain_bytes = _unhex(key_hex, plaintext_hex)
+    _check_blocks(key_bytes, plain_bytes)
+    return {"cipher_hex": encrypt_cbc_bytes(key_bytes, plain_bytes, _unhex_iv(iv_hex)).hex()}
 
 
 def encrypt_ctr(key_hex: str, plaintext_hex: str, iv_hex: str) -> dict:
@@ -70,17 +190,9 @@ def encrypt_ctr(key_hex: str, plaintext_hex: str, iv_hex: str) -> dict:
     CBC, deux blocs de clair identiques ne se voient plus dans le chiffre ; en
     plus, CTR ne demande pas de bourrage et est parallelisable.
     """
-    key_bytes, plain_bytes = _key_and_blocks(key_hex, plaintext_hex)
-    try:
-        iv_bytes = bytes.fromhex(iv_hex)
-    except ValueError as exc:
-        raise InvalidInput("iv_hex doit etre hexadecimal.") from exc
-    if len(iv_bytes) != BLOCK_SIZE:
-        raise InvalidInput(f"Le compteur initial doit faire {BLOCK_SIZE} octets.")
-    initial_value = int.from_bytes(iv_bytes, "big")
-    ctr = Counter.new(128, initial_value=initial_value)
-    cipher = AES.new(key_bytes, AES.MODE_CTR, counter=ctr)
-    return {"cipher_hex": cipher.encrypt(plain_bytes).hex()}
+    key_bytes, plain_bytes = _unhex(key_hex, plaintext_hex)
+    _check_blocks(key_bytes, plain_bytes)
+    return {"cipher_hex": encrypt_ctr_bytes(key_bytes, plain_bytes, _unhex_iv(iv_hex)).hex()}
 
 
 def ecb_penguin_demo(key_hex: str, block_hex: str, repeats: int) -> dict:
@@ -16,7 +16,12 @@ valeur egale leur nombre.
 
 from __future__ import annotations
 
+from collections.abc import Callable, Generator, Iterator, Sequence
+from functools import lru_cache
+from typing import Any
+
 from Crypto.Cipher import AES
+from Crypto.Util.strxor import strxor
 
 from registry.errors import InvalidInput
 
@@ -95,17 +100,121 @@ def oracle_query(key_hex: str, iv_hex: str, cipher_hex: str) -> dict:
     return {"padding_valid": has_valid_padding(key_bytes, iv_bytes, cipher_bytes)}
 
 
-def _recover_block(key_bytes: bytes, prev_block: bytes, target_block: bytes) -> bytes:
+# --- Moteur d'attaque ---
+#
+# Chaque bloc se recupere seul : il ne depend que du couple (bloc precedent,
+# bloc cible). L'attaque est donc une liste de taches independantes, qu'un
+# `fan_out` repartit comme il l'entend — dans l'ordre ici, sur le pool de
+# processus pour les routes (registry/execution.py).
+
+#: Un repartiteur : appelle `fn(*args)` pour chaque tuple de `calls` et rend
+#: les couples `(indice, resultat)`, dans l'ordre de son choix.
+FanOut = Callable[[Callable[..., Any], Sequence[tuple]], Iterator[tuple[int, Any]]]
+
+_PADDINGS = [bytes([n]) * n for n in range(BLOCK_SIZE + 1)]
+
+
+@lru_cache(maxsize=8)
+def _block_cipher(key_bytes: bytes):
+    # Le "serveur" dechiffre toujours avec la meme cle : sa table de sous-cles
+    # est calculee une fois par processus, pas une fois par requete a l'oracle.
+    return AES.new(key_bytes, AES.MODE_ECB)
+
+
+class PaddingOracle:
+    """
+    L'oracle vu par l'attaquant, pour un bloc de chiffre a la fois, et le
+    compte exact des questions qui lui sont posees.
+
+    Dechiffrer un seul bloc en CBC, c'est dechiffrer le bloc en ECB puis le
+    XORer avec l'IV : meme reponse que `has_valid_padding`, sans recreer
+    d'objet AES a chaque question.
+    """
+
+    def __init__(self, key_bytes: bytes) -> None:
+        self._cipher = _block_cipher(key_bytes)
+        self.queries = 0
+
+    def __call__(self, iv: bytes, block: bytes) -> bool:
+        self.queries += 1
+        decrypted = strxor(self._cipher.decrypt(block), iv)
+        pad_len = decrypted[-1]
+        return 0 < pad_len <= BLOCK_SIZE and decrypted[-pad_len:] == _PADDINGS[pad_len]
+
+
+# --- Ordre des essais ---
+#
+# Pour chaque octet, l'attaque essaie les 256 valeurs de l'IV forge jusqu'a
+# la bonne : dans l'ordre numerique, 128 questions en moyenne. Mais chaque
+# essai correspond a un clair candidat (clair = essai XOR bourrage XOR octet
+# du bloc precedent), et un clair n'est pas un octet au hasard : c'est du
+# texte. On essaie donc les clairs du plus probable au moins probable, comme
+# un vrai attaquant : sur du texte, une poignee de questions par octet.
+
+#: Clairs candidats, du plus probable au moins probable : espace et lettres
+#: minuscules par frequence (francais et anglais), majuscules, ponctuation et
+#: chiffres, le reste de l'ASCII imprimable, les octets UTF-8 des lettres
+#: accentuees (0xC3 puis les octets de continuation), et enfin tout le reste.
+TEXT_ORDER = bytes(dict.fromkeys(
+    b" esaitnrulodcmphvgfbqyjxzkw"
+    b"ESAITNRULODCMPHVGFBQYJXZKW"
+    b".,'\n-:;!?\"()0123456789"
+    + bytes(range(0x20, 0x7F))
+    + b"\xc3" + bytes(range(0x80, 0xC0))
+    + bytes(range(256))
+))
+
+#: Dernier octet du dernier bloc : presque toujours un octet de bourrage.
+PADDING_ORDER = bytes(dict.fromkeys(bytes(range(1, BLOCK_SIZE + 1)) + TEXT_ORDER))
+
+#: Dans le bourrage deja identifie, la valeur `n` se repete : essayee d'abord.
+_REPEAT_ORDER = {n: bytes([n]) + TEXT_ORDER.replace(bytes([n]), b"") for n in range(1, BLOCK_SIZE + 1)}
+
+#: `order.translate(_XOR[m])` XORe chaque octet de `order` avec `m`.
+_XOR = [bytes(i ^ mask for i in range(256)) for mask in range(256)]
+
+_NUMERIC = bytes(range(256))
+
+STRATEGIES = ("frequency", "numeric")
+
+
+def _candidates(plain: bytearray, pos: int, last: bool) -> bytes:
+    """Clairs candidats pour l'octet `pos`, les octets suivants etant connus."""
+    if last and pos == BLOCK_SIZE - 1:
+        return PADDING_ORDER
+    if last and BLOCK_SIZE - plain[-1] <= pos and 1 <= plain[-1] <= BLOCK_SIZE:
+        return _REPEAT_ORDER[plain[-1]]
+    return TEXT_ORDER
+
+
+def recover_block(
+    key_bytes: bytes,
+    prev_block: bytes,
+    target_block: bytes,
+    last: bool = False,
+    strategy: str = "frequency",
+) -> tuple[bytes, int, int]:
     """
     Recupere le clair d'UN bloc en n'interrogeant que l'oracle de bourrage.
 
+    Renvoie le clair, le nombre exact de questions posees, et celui que
+    l'ordre numerique aurait pose pour les memes octets (`_numeric_queries`).
+    `last` signale le dernier bloc, qui finit par le bourrage ;
+    `strategy="numeric"` essaie les valeurs dans l'ordre, 0 a 255.
+
     Principe (Vaudenay) : dechiffrer(target_block) XOR IV_modifie = clair.
     Pour l'octet de poids le plus faible (position 16), on essaie les 256
     valeurs d'un IV forge jusqu'a ce que le bourrage soit valide (bourrage
     `\\x01` le plus souvent) ; cela revele l'octet intermediaire
     D = dechiffrer(target_block)[15], d'ou clair[15] = D XOR prev_block[15].
     On repete en forcant un bourrage `\\x02\\x02`, etc., jusqu'a l'octet 0.
+
+    Fonction de module, et non methode : le pool de processus la transporte
+    par son nom.
     """
+    if strategy not in STRATEGIES:
+        raise InvalidInput(f"Strategie inconnue : {strategy!r}. Disponibles : {', '.join(STRATEGIES)}.")
+    oracle = PaddingOracle(key_bytes)
     intermediate = bytearray(BLOCK_SIZE)
     plain = bytearray(BLOCK_SIZE)
 
@@ -115,17 +224,23 @@ def _recover_block(key_bytes: bytes, prev_block: bytes, target_block: bytes) ->
         for i in range(pos + 1, BLOCK_SIZE):
             forged_iv[i] = intermediate[i] ^ pad_value
 
+        if strategy == "numeric":
+            guesses = _NUMERIC
+        else:
+            # Essai = clair candidat XOR bourrage vise XOR octet precedent.
+            guesses = _candidates(plain, pos, last).translate(_XOR[pad_value ^ prev_block[pos]])
+
         found = False
-        for guess in range(256):
+        for guess in guesses:
             forged_iv[pos] = guess
-            if has_valid_padding(key_bytes, bytes(forged_iv), target_block):
+            if oracle(bytes(forged_iv), target_block):
                 # Cas limite : si pos == 15, un faux positif existe quand le
                 # bourrage naturel `\x02` deux octets avant la fin coincide.
                 # On le leve en perturbant l'octet precedent et en revalidant.
                 if pos == BLOCK_SIZE - 1:
                     probe_iv = bytearray(forged_iv)
                     probe_iv[pos - 1] ^= 0xFF
-                    if not has_valid_padding(key_bytes, bytes(probe_iv), target_block):
+                    if not oracle(bytes(probe_iv), target_block):
                         continue
                 intermediate[pos] = guess ^ pad_value
                 plain[pos] = intermediate[pos] ^ prev_block[pos]
@@ -134,17 +249,42 @@ def _recover_block(key_bytes: bytes, prev_block: bytes, target_block: bytes) ->
         if not found:
             raise InvalidInput("L'attaque a echoue a retrouver un octet : oracle incoherent.")
 
-    return bytes(plain)
+    return bytes(plain), oracle.queries, _numeric_queries(intermediate)
 
 
-def padding_oracle_attack(key_hex: str, iv_hex: str, cipher_hex: str) -> dict:
+def _numeric_queries(intermediate: bytes) -> int:
     """
-    Dechiffre entierement un texte AES-CBC en n'utilisant QUE l'oracle de
-    bourrage — jamais la cle directement, bien qu'elle soit passee ici pour
-    simuler les requetes repetees a un serveur reel (l'attaquant, lui, ne la
-    connait jamais). Illustre pourquoi un mode non authentifie qui distingue
-    "bourrage invalide" de "dechiffrement reussi" est une faille exploitable
-    a distance, meme sans jamais casser AES lui-meme.
+    Questions que l'ordre numerique pose pour un bloc dont on connait les
+    octets intermediaires : le rang de chaque bonne valeur, le sondage qui
+    confirme l'octet 15, et celui d'un faux positif essaye avant lui.
+    """
+    queries = sum((byte ^ (BLOCK_SIZE - pos)) + 1 for pos, byte in enumerate(intermediate)) + 1
+    # Le faux positif de l'octet 15 : un bourrage `k` deja en place sur les
+    # octets 16-k a 14 (l'IV forge y est nul), complete par le dernier octet.
+    k, last = intermediate[-2], intermediate[-1]
+    if 2 <= k <= BLOCK_SIZE and intermediate[BLOCK_SIZE - k:-1] == bytes([k]) * (k - 1):
+        queries += last ^ k < last ^ 1
+    return queries
+
+
+def in_order(fn: Callable[..., Any], calls: Sequence[tuple]) -> Iterator[tuple[int, Any]]:
+    """Le repartiteur par defaut : un appel apres l'autre, dans le processus courant."""
+    for index, args in enumerate(calls):
+        yield index, fn(*args)
+
+
+def iter_attack(
+    key_hex: str,
+    iv_hex: str,
+    cipher_hex: str,
+    *,
+    strategy: str = "frequency",
+    fan_out: FanOut = in_order,
+) -> Generator[dict, None, dict]:
+    """
+    L'attaque bloc par bloc : rend un evenement par bloc retrouve, dans
+    l'ordre ou `fan_out` les termine, puis (valeur de retour) le resultat
+    complet de `padding_oracle_attack`.
     """
     try:
         key_bytes = bytes.fromhex(key_hex)
@@ -152,14 +292,67 @@ def padding_oracle_attack(key_hex: str, iv_hex: str, cipher_hex: str) -> dict:
         cipher_bytes = bytes.fromhex(cipher_hex)
     except ValueError as exc:
         raise InvalidInput("key_hex, iv_hex et cipher_hex doivent etre hexadecimaux.") from exc
+    if len(key_bytes) not in (16, 24, 32):
+        raise InvalidInput("La cle doit faire 16, 24 ou 32 octets.")
     if len(iv_bytes) != BLOCK_SIZE or len(cipher_bytes) % BLOCK_SIZE != 0 or not cipher_bytes:
         raise InvalidInput("iv_hex doit faire 16 octets, cipher_hex un multiple non vide de 16.")
 
     blocks = [cipher_bytes[i:i + BLOCK_SIZE] for i in range(0, len(cipher_bytes), BLOCK_SIZE)]
     prev_blocks = [iv_bytes] + blocks[:-1]
+    if strategy not in STRATEGIES:
+        raise InvalidInput(f"Strategie inconnue : {strategy!r}. Disponibles : {', '.join(STRATEGIES)}.")
+    calls = [
+        (key_bytes, prev, block, index == len(blocks) - 1, strategy)
+        for index, (prev, block) in enumerate(zip(prev_blocks, blocks, strict=True))
+    ]
+
+    recovered = [b""] * len(blocks)
+    queries = numeric_queries = 0
+    for index, (plain, count, numeric_count) in fan_out(recover_block, calls):
+        recovered[index] = plain
+        queries += count
+        numeric_queries += numeric_count
+        yield {
+            "block": index,
+            "of": len(blocks),
+            "plain_hex": plain.hex(),
+            "queries": count,
+            "queries_saved": numeric_count - count,
+        }
+
+    plain_bytes = pkcs7_unpad(b"".join(recovered), BLOCK_SIZE)
+    return {
+        "plain": plain_bytes.decode("utf-8", errors="replace"),
+        "blocks": len(blocks),
+        "strategy": strategy,
+        "queries": queries,
+        "queries_saved": numeric_queries - queries,
+    }
+
 
-    recovered = b"".join(
-        _recover_block(key_bytes, prev, block) for prev, block in zip(prev_blocks, blocks, strict=True)
-    )
-    plain_bytes = pkcs7_unpad(recovered, BLOCK_SIZE)
-    return {"plain": plain_bytes.decode("utf-8", errors="replace"), "queries_estimate": 256 * BLOCK_SIZE * len(blocks)}
+def padding_oracle_attack(
+    key_hex: str,
+    iv_hex: str,
+    cipher_hex: str,
+    *,
+    strategy: str = "frequency",
+    fan_out: FanOut = in_order,
+) -> dict:
+    """
+    Dechiffre entierement un texte AES-CBC en n'utilisant QUE l'oracle de
+    bourrage — jamais la cle directement, bien qu'elle soit passee ici pour
+    simuler les requetes repetees a un serveur reel (l'attaquant, lui, ne la
+    connait jamais). Illustre pourquoi un mode non authentifie qui distingue
+    "bourrage invalide" de "dechiffrement reussi" est une faille exploitable
+    a distance, meme sans jamais casser AES lui-meme.
+
+    `queries` est le nombre exact de questions posees a l'oracle ;
+    `queries_saved`, celles que l'ordre des essais (`strategy`) a evitees
+    par rapport a l'ordre numerique.
+    """
+    attack = iter_attack(key_hex, iv_hex, cipher_hex, strategy=strategy, fan_out=fan_out)
+    while True:
+        try:
+            next(attack)
+        except StopIteration as stop:
+            return stop.value
@@ -16,7 +16,7 @@ RC4 est un XOR involutif : la meme fonction chiffre et dechiffre.
 from registry.errors import InvalidInput
 
 
-def ksa(key: bytes) -> list[int]:
+def ksa(key: bytes | memoryview) -> list[int]:
     """Key-Scheduling Algorithm : initialise la permutation S de 256 octets."""
     if not key:
         raise InvalidInput("La cle RC4 ne peut pas etre vide.")
@@ -42,8 +42,12 @@ def prga(s: list[int], length: int) -> bytes:
     return bytes(keystream)
 
 
-def rc4_crypt(data: bytes, key: bytes) -> bytes:
-    """Chiffre ou dechiffre `data` : XOR avec le flux de cle genere par KSA+PRGA."""
+def rc4_crypt(data: bytes | memoryview, key: bytes | memoryview) -> bytes:
+    """
+    Chiffre ou dechiffre `data` : XOR avec le flux de cle genere par KSA+PRGA.
+
+    Accepte une memoryview, lue sans copie (routes binaires, routers/binary.py).
+    """
     s = ksa(key)
     keystream = prga(s, len(data))
     return bytes(d ^ k for d, k in zip(data, keystream, strict=True))
@@ -52,8 +52,13 @@ def _round_function(t: int, b: int, c: int, d: int) -> tuple[int, int]:
     return b ^ c ^ d, 0xCA62C1D6
 
 
-def compress(h: tuple[int, ...], w: list[int]) -> tuple[tuple[int, ...], list[dict]]:
-    """Les 80 tours de la fonction de compression sur un bloc."""
+def compress(
+    h: tuple[int, ...], w: list[int], *, trace: bool = True
+) -> tuple[tuple[int, ...], list[dict]]:
+    """
+    Les 80 tours de la fonction de compression sur un bloc. Sans `trace`, la
+    liste des tours reste vide (chemin rapide des blocs hors fenetre).
+    """
     a, b, c, d, e = h
     rounds = []
     for t in range(80):
@@ -61,12 +66,13 @@ def compress(h: tuple[int, ...], w: list[int]) -> tuple[tuple[int, ...], list[di
         temp = (_rotl(a, 5) + f + e + k + w[t]) & MASK32
         e, d, c, b, a = d, c, _rotl(b, 30), a, temp
 
-        rounds.append({
-            "round": t,
-            "w": w[t],
-            "k": k,
-            "state": {"a": a, "b": b, "c": c, "d": d, "e": e},
-        })
+        if trace:
+            rounds.append({
+                "round": t,
+                "w": w[t],
+                "k": k,
+                "state": {"a": a, "b": b, "c": c, "d": d, "e": e},
+            })
     new_h = (
         (h[0] + a) & MASK32, (h[1] + b) & MASK32,
         (h[2] + c) & MASK32, (h[3] + d) & MASK32,
@@ -86,5 +92,5 @@ def sha1_from_scratch(data: bytes) -> str:
     h = H0
     for block in blocks:
         w = message_schedule(block)
-        h, _ = compress(h, w)
+        h, _ = compress(h, w, trace=False)
     return digest_hex(h)
@@ -55,10 +55,13 @@ def message_schedule(block: bytes) -> list[int]:
     return w
 
 
-def compress(h: tuple[int, ...], w: list[int]) -> tuple[tuple[int, ...], list[dict]]:
+def compress(
+    h: tuple[int, ...], w: list[int], *, trace: bool = True
+) -> tuple[tuple[int, ...], list[dict]]:
     """
     Les 64 tours de la fonction de compression sur un bloc, en partant de
-    l'etat `h`. Retourne le nouvel etat et la trace de chaque tour.
+    l'etat `h`. Retourne le nouvel etat et la trace de chaque tour (vide si
+    `trace` est faux : chemin rapide des blocs hors fenetre).
     """
     a, b, c, d, e, f, g, hh = h
     rounds = []
@@ -73,15 +76,16 @@ def compress(h: tuple[int, ...], w: list[int]) -> tuple[tuple[int, ...], list[di
         hh, g, f, e = g, f, e, (d + temp1) & MASK32
         d, c, b, a = c, b, a, (temp1 + temp2) & MASK32
 
-        rounds.append({
-            "round": t,
-            "w": w[t],
-            "k": K[t],
-            "state": {
-                "a": a, "b": b, "c": c, "d": d,
-                "e": e, "f": f, "g": g, "h": hh,
-            },
-        })
+        if trace:
+            rounds.append({
+                "round": t,
+                "w": w[t],
+                "k": K[t],
+                "state": {
+                    "a": a, "b": b, "c": c, "d": d,
+                    "e": e, "f": f, "g": g, "h": hh,
+                },
+            })
     new_h = (
         (h[0] + a) & MASK32, (h[1] + b) & MASK32,
         (h[2] + c) & MASK32, (h[3] + d) & MASK32,
@@ -3,6 +3,7 @@
 from typing import Any, TypedDict
 
 from . import columnar, playfair, rail_fence, sha1_tool, sha256_tool
+from .tracing import FULL, Trace, Window, drain
 
 
 class StructuredStep(TypedDict, total=False):
@@ -434,7 +435,7 @@ def simulate_columnar_encrypt(text: str, key: str) -> dict:
 
 
 # --- SIMULATE SHA-256 ---
-def simulate_sha256(text: str) -> dict:
+def iter_sha256(text: str, window: Window = FULL) -> Trace:
     """
     Trace étape par étape de SHA-256 (FIPS 180-4) : bourrage, découpage en
     blocs de 512 bits, extension du planning des messages (W[0..63]) et les
@@ -442,15 +443,17 @@ def simulate_sha256(text: str) -> dict:
 
     Contrairement à `hash_tool.hash_sha256` (hashlib, chemin de production),
     cette fonction recalcule tout depuis zéro pour exposer chaque tour.
+
+    `window` restreint la trace aux blocs et tours demandés ; les autres blocs
+    sont compressés sans trace, et l'empreinte reste la même.
     """
-    steps = []
     step_counter = 0
 
     data = text.encode("utf-8")
     padded = sha256_tool.pad_message(data)
     blocks = [padded[i:i + 64] for i in range(0, len(padded), 64)]
 
-    steps.append({
+    yield {
         "step": step_counter,
         "phase": "Bourrage",
         "description": (
@@ -469,90 +472,98 @@ def simulate_sha256(text: str) -> dict:
             state_after={"padded_bits": len(padded) * 8, "block_count": len(blocks)},
             formula="len(data) + 1 bit + zero-padding + longueur sur 64 bits, jusqu'a un multiple de 512 bits",
         ),
-    })
+    }
     step_counter += 1
 
     h = sha256_tool.H0
     for block_index, block in enumerate(blocks):
         w = sha256_tool.message_schedule(block)
-        steps.append({
-            "step": step_counter,
-            "phase": "Planning des messages",
-            "description": (
-                f"Bloc {block_index} : les 16 premiers mots W[0..15] viennent "
-                f"directement du bloc. W[16..63] sont dérivés par rotations et "
-                f"décalages des mots précédents (formule σ0/σ1, FIPS 180-4 §4.1.2)."
-            ),
-            "block": block_index,
-            "schedule": [f"{word:08x}" for word in w],
-            "structured": structured_step(
-                step_counter,
-                "message-schedule",
-                state_after={"W": [f"{word:08x}" for word in w]},
-                highlight=[f"W[{i}]" for i in range(16)],
-                formula="W[t] = sigma1(W[t-2]) + W[t-7] + sigma0(W[t-15]) + W[t-16], pour t >= 16",
-            ),
-        })
-        step_counter += 1
+        if not window.has_block(block_index):
+            # Hors fenetre : meme calcul, sans trace.
+            h, _ = sha256_tool.compress(h, w, trace=False)
+            continue
 
         h_before = h
-        new_h, rounds = sha256_tool.compress(h, w)
+        new_h, rounds = sha256_tool.compress(h, w, trace=not window.summary)
 
-        steps.append({
-            "step": step_counter,
-            "phase": "État initial",
-            "description": (
-                f"Bloc {block_index} : variables de travail a..h initialisées "
-                f"à l'état courant du condensé."
-            ),
-            "block": block_index,
-            "state": {
-                name: f"{value:08x}"
-                for name, value in zip("abcdefgh", h_before, strict=True)
-            },
-            "structured": structured_step(
-                step_counter,
-                "init-working-variables",
-                state_after={
-                    name: f"{value:08x}"
-                    for name, value in zip("abcdefgh", h_before, strict=True)
-                },
-                highlight=list("abcdefgh"),
-            ),
-        })
-        step_counter += 1
+        if not window.summary:
+            yield {
+                "step": step_counter,
+                "phase": "Planning des messages",
+                "description": (
+                    f"Bloc {block_index} : les 16 premiers mots W[0..15] viennent "
+                    f"directement du bloc. W[16..63] sont dérivés par rotations et "
+                    f"décalages des mots précédents (formule σ0/σ1, FIPS 180-4 §4.1.2)."
+                ),
+                "block": block_index,
+                "schedule": [f"{word:08x}" for word in w],
+                "structured": structured_step(
+                    step_counter,
+                    "message-schedule",
+                    state_after={"W": [f"{word:08x}" for word in w]},
+                    highlight=[f"W[{i}]" for i in range(16)],
+                    formula="W[t] = sigma1(W[t-2]) + W[t-7] + sigma0(W[t-15]) + W[t-16], pour t >= 16",
+                ),
+            }
+            step_counter += 1
 
-        for round_info in rounds:
-            state_hex = {k: f"{v:08x}" for k, v in round_info["state"].items()}
-            steps.append({
+            yield {
                 "step": step_counter,
-                "phase": "Compression",
+                "phase": "État initial",
                 "description": (
-                    f"Bloc {block_index}, tour {round_info['round']} : "
-                    f"Ch(e,f,g) et Maj(a,b,c) combinent W[{round_info['round']}] "
-                    f"({round_info['w']:08x}) et la constante K[{round_info['round']}] "
-                    f"({round_info['k']:08x}) pour produire les nouvelles "
-                    f"variables de travail."
+                    f"Bloc {block_index} : variables de travail a..h initialisées "
+                    f"à l'état courant du condensé."
                 ),
                 "block": block_index,
-                "round": round_info["round"],
-                "state": state_hex,
+                "state": {
+                    name: f"{value:08x}"
+                    for name, value in zip("abcdefgh", h_before, strict=True)
+                },
                 "structured": structured_step(
                     step_counter,
-                    "compression-round",
-                    state_after=state_hex,
-                    highlight=["e", "f", "g", "a", "b", "c"],
-                    formula=(
-                        f"T1 = h + Ch(e,f,g) + Sigma1(e) + K[{round_info['round']}] + "
-                        f"W[{round_info['round']}] ; T2 = Sigma0(a) + Maj(a,b,c)"
-                    ),
+                    "init-working-variables",
+                    state_after={
+                        name: f"{value:08x}"
+                        for name, value in zip("abcdefgh", h_before, strict=True)
+                    },
+                    highlight=list("abcdefgh"),
                 ),
-            })
+            }
             step_counter += 1
 
+            for round_info in rounds:
+                if not window.has_round(round_info["round"]):
+                    continue
+                state_hex = {k: f"{v:08x}" for k, v in round_info["state"].items()}
+                yield {
+                    "step": step_counter,
+                    "phase": "Compression",
+                    "description": (
+                        f"Bloc {block_index}, tour {round_info['round']} : "
+                        f"Ch(e,f,g) et Maj(a,b,c) combinent W[{round_info['round']}] "
+                        f"({round_info['w']:08x}) et la constante K[{round_info['round']}] "
+                        f"({round_info['k']:08x}) pour produire les nouvelles "
+                        f"variables de travail."
+                    ),
+                    "block": block_index,
+                    "round": round_info["round"],
+                    "state": state_hex,
+                    "structured": structured_step(
+                        step_counter,
+                        "compression-round",
+                        state_after=state_hex,
+                        highlight=["e", "f", "g", "a", "b", "c"],
+                        formula=(
+                            f"T1 = h + Ch(e,f,g) + Sigma1(e) + K[{round_info['round']}] + "
+                            f"W[{round_info['round']}] ; T2 = Sigma0(a) + Maj(a,b,c)"
+                        ),
+                    ),
+                }
+                step_counter += 1
+
         h = new_h
         digest_hex = [f"{word:08x}" for word in h]
-        steps.append({
+        yield {
             "step": step_counter,
             "phase": "Mise à jour du condensé",
             "description": (
@@ -571,11 +582,11 @@ def simulate_sha256(text: str) -> dict:
                 state_after={"H": digest_hex},
                 formula="H[i] = (H[i] + working_variable[i]) mod 2^32",
             ),
-        })
+        }
         step_counter += 1
 
     result = sha256_tool.digest_hex(h)
-    steps.append({
+    yield {
         "step": step_counter,
         "phase": "Final",
         "description": f"Fin du processus. Empreinte : '{result}'.",
@@ -585,13 +596,21 @@ def simulate_sha256(text: str) -> dict:
             "final-digest",
             state_after={"digest": result},
         ),
-    })
+    }
+
+    summary = {"final_result": result, "block_count": len(blocks)}
+    if not window.is_full:
+        summary["window"] = window.describe(len(blocks))
+    return summary
 
-    return {"final_result": result, "steps": steps, "block_count": len(blocks)}
+
+def simulate_sha256(text: str, window: Window = FULL) -> dict:
+    """Trace complète de SHA-256, étapes rassemblées dans `steps`."""
+    return drain(iter_sha256(text, window))
 
 
 # --- SIMULATE SHA-1 ---
-def simulate_sha1(text: str) -> dict:
+def iter_sha1(text: str, window: Window = FULL) -> Trace:
     """
     Trace étape par étape de SHA-1 (FIPS 180-1 / RFC 3174) : même structure que
     `simulate_sha256`, avec 80 tours par bloc au lieu de 64 et un état sur cinq
@@ -600,15 +619,16 @@ def simulate_sha1(text: str) -> dict:
     SHA-1 est CASSÉ (attaque SHAttered, 2017) : cette trace sert à comprendre
     la construction Merkle-Damgård qu'il partage avec SHA-256, jamais à
     justifier son usage en production.
+
+    `window` : même fenêtrage que `iter_sha256`.
     """
-    steps = []
     step_counter = 0
 
     data = text.encode("utf-8")
     padded = sha1_tool.pad_message(data)
     blocks = [padded[i:i + 64] for i in range(0, len(padded), 64)]
 
-    steps.append({
+    yield {
         "step": step_counter,
         "phase": "Bourrage",
         "description": (
@@ -622,63 +642,71 @@ def simulate_sha1(text: str) -> dict:
         ),
         "input_text": text,
         "block_count": len(blocks),
-    })
+    }
     step_counter += 1
 
     h = sha1_tool.H0
     for block_index, block in enumerate(blocks):
         w = sha1_tool.message_schedule(block)
-        steps.append({
-            "step": step_counter,
-            "phase": "Planning des messages",
-            "description": (
-                f"Bloc {block_index} : les 16 premiers mots W[0..15] viennent "
-                f"du bloc. W[16..79] sont dérivés par XOR et rotation gauche "
-                f"de 1 bit des mots précédents (RFC 3174 §6.1)."
-            ),
-            "block": block_index,
-            "schedule": [f"{word:08x}" for word in w],
-        })
-        step_counter += 1
+        if not window.has_block(block_index):
+            # Hors fenetre : meme calcul, sans trace.
+            h, _ = sha1_tool.compress(h, w, trace=False)
+            continue
 
         h_before = h
-        new_h, rounds = sha1_tool.compress(h, w)
+        new_h, rounds = sha1_tool.compress(h, w, trace=not window.summary)
 
-        steps.append({
-            "step": step_counter,
-            "phase": "État initial",
-            "description": (
-                f"Bloc {block_index} : variables de travail a..e initialisées "
-                f"à l'état courant du condensé."
-            ),
-            "block": block_index,
-            "state": {
-                name: f"{value:08x}"
-                for name, value in zip("abcde", h_before, strict=True)
-            },
-        })
-        step_counter += 1
+        if not window.summary:
+            yield {
+                "step": step_counter,
+                "phase": "Planning des messages",
+                "description": (
+                    f"Bloc {block_index} : les 16 premiers mots W[0..15] viennent "
+                    f"du bloc. W[16..79] sont dérivés par XOR et rotation gauche "
+                    f"de 1 bit des mots précédents (RFC 3174 §6.1)."
+                ),
+                "block": block_index,
+                "schedule": [f"{word:08x}" for word in w],
+            }
+            step_counter += 1
 
-        for round_info in rounds:
-            state_hex = {k: f"{v:08x}" for k, v in round_info["state"].items()}
-            steps.append({
+            yield {
                 "step": step_counter,
-                "phase": "Compression",
+                "phase": "État initial",
                 "description": (
-                    f"Bloc {block_index}, tour {round_info['round']} : la "
-                    f"fonction f (Ch, Parity ou Maj selon la plage du tour) "
-                    f"combine W[{round_info['round']}] "
-                    f"({round_info['w']:08x}) et la constante K "
-                    f"({round_info['k']:08x})."
+                    f"Bloc {block_index} : variables de travail a..e initialisées "
+                    f"à l'état courant du condensé."
                 ),
                 "block": block_index,
-                "round": round_info["round"],
-                "state": state_hex,
-            })
+                "state": {
+                    name: f"{value:08x}"
+                    for name, value in zip("abcde", h_before, strict=True)
+                },
+            }
             step_counter += 1
 
+            for round_info in rounds:
+                if not window.has_round(round_info["round"]):
+                    continue
+                state_hex = {k: f"{v:08x}" for k, v in round_info["state"].items()}
+                yield {
+                    "step": step_counter,
+                    "phase": "Compression",
+                    "description": (
+                        f"Bloc {block_index}, tour {round_info['round']} : la "
+                        f"fonction f (Ch, Parity ou Maj selon la plage du tour) "
+                        f"combine W[{round_info['round']}] "
+                        f"({round_info['w']:08x}) et la constante K "
+                        f"({round_info['k']:08x})."
+                    ),
+                    "block": block_index,
+                    "round": round_info["round"],
+                    "state": state_hex,
+                }
+                step_counter += 1
+
         h = new_h
-        steps.append({
+        yield {
             "step": step_counter,
             "phase": "Mise à jour du condensé",
             "description": (
@@ -687,15 +715,23 @@ def simulate_sha1(text: str) -> dict:
             ),
             "block": block_index,
             "digest_state": [f"{word:08x}" for word in h],
-        })
+        }
         step_counter += 1
 
     result = sha1_tool.digest_hex(h)
-    steps.append({
+    yield {
         "step": step_counter,
         "phase": "Final",
         "description": f"Fin du processus. Empreinte : '{result}'.",
         "final_result": result,
-    })
+    }
+
+    summary = {"final_result": result, "block_count": len(blocks)}
+    if not window.is_full:
+        summary["window"] = window.describe(len(blocks))
+    return summary
+
 
-    return {"final_result": result, "steps": steps, "block_count": len(blocks)}
+def simulate_sha1(text: str, window: Window = FULL) -> dict:
+    """Trace complète de SHA-1, étapes rassemblées dans `steps`."""
+    return drain(iter_sha1(text, window))
@@ -0,0 +1,123 @@
+"""
+Traces pas a pas sous forme de generateurs.
+
+Un simulateur « iter_* » produit ses etapes une a une (`yield`) et rend, a la
+fin, le resume de la simulation (`return`) : empreinte, chiffre, nombre de
+blocs. Le routeur de simulation peut ainsi envoyer l'etape 0 au navigateur
+pendant que le bloc 300 est encore en calcul, sans jamais tenir la liste
+complete en memoire.
+
+`drain` reconstruit la forme historique `{..., "steps": [...]}` a partir d'un
+tel generateur : les fonctions `simulate_*` ne sont plus que `drain(iter_*())`.
+
+Une `Window` (fenetre) restreint la trace aux blocs et aux tours qu'un etudiant
+inspecte vraiment. Les blocs hors fenetre passent par le chemin rapide, sans
+trace : le resultat final est identique, la reponse et le calcul fondent.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Generator
+from dataclasses import dataclass
+from typing import Any, Literal
+
+#: Une trace : des etapes (dict), puis un resume rendu par `return`.
+Trace = Generator[dict, None, dict]
+
+
+def drain(trace: Trace) -> dict:
+    """Consomme une trace et renvoie son resume, augmente de la liste `steps`."""
+    steps: list[dict] = []
+    while True:
+        try:
+            steps.append(next(trace))
+        except StopIteration as stop:
+            return {**stop.value, "steps": steps}
+
+
+def replay(result: dict) -> Trace:
+    """
+    Trace d'un resultat deja calcule : ses etapes, puis le reste du resultat.
+
+    Sert aux simulateurs courts, qui n'ont pas de version generatrice : le
+    routeur les diffuse avec le meme protocole que les autres.
+    """
+    yield from result.get("steps", ())
+    return {key: value for key, value in result.items() if key != "steps"}
+
+
+# --- Fenetre de trace ---
+
+_RANGE = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+)\s*)?$")
+
+
+def parse_range(text: str | None) -> range | None:
+    """
+    « 3 » -> le seul indice 3 ; « 2-5 » -> les indices 2 a 5 inclus.
+
+    Leve ValueError sur une plage mal formee ou renversee.
+    """
+    if text is None or not text.strip():
+        return None
+    match = _RANGE.match(text)
+    if match is None:
+        raise ValueError(f"Plage invalide : '{text}' (attendu « n » ou « debut-fin »).")
+    start = int(match.group(1))
+    stop = int(match.group(2)) if match.group(2) is not None else start
+    if stop < start:
+        raise ValueError(f"Plage renversee : '{text}' (la fin precede le debut).")
+    return range(start, stop + 1)
+
+
+@dataclass(frozen=True)
+class Window:
+    """
+    Ce qu'une trace materialise. Sans argument : tout, comme avant.
+
+    `blocks` et `rounds` sont des plages d'indices (None = tous). `detail`
+    vaut « full » (etapes de chaque tour) ou « summary » (une etape par bloc,
+    avec son resultat).
+    """
+
+    blocks: range | None = None
+    rounds: range | None = None
+    detail: Literal["full", "summary"] = "full"
+
+    @classmethod
+    def parse(
+        cls,
+        block_range: str | None = None,
+        round_range: str | None = None,
+        detail: Literal["full", "summary"] = "full",
+    ) -> Window:
+        return cls(parse_range(block_range), parse_range(round_range), detail)
+
+    @property
+    def is_full(self) -> bool:
+        return self == FULL
+
+    @property
+    def summary(self) -> bool:
+        return self.detail == "summary"
+
+    def has_block(self, index: int) -> bool:
+        return self.blocks is None or index in self.blocks
+
+    def has_round(self, index: int) -> bool:
+        return self.rounds is None or index in self.rounds
+
+    def describe(self, block_count: int) -> dict[str, Any]:
+        """Champ `window` du resultat : ce qui a ete trace, et sur combien."""
+        traced = sum(1 for index in range(block_count) if self.has_block(index))
+        return {
+            "blocks": [self.blocks.start, self.blocks.stop - 1] if self.blocks else None,
+            "rounds": [self.rounds.start, self.rounds.stop - 1] if self.rounds else None,
+            "detail": self.detail,
+            "traced_blocks": traced,
+            "block_count": block_count,
+        }
+
+
+#: Fenetre par defaut : la trace complete.
+FULL = Window()